@@ -1,10 +1,21 @@
 """Game API endpoints"""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.services.game_service import GameService
-from app.schemas.game import GameSession, GameSessionCreate, HighScore, GameStats
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_async_db, get_async_write_db
+from app.services.async_game_service import AsyncGameService
+from app.services.ingest import ingest_queue
+from app.services.leaderboard_read_model import leaderboard_read_model
+from app.services.client_state import client_states
+from app.services.export import ExportEncoder, ExportRange, MEDIA_TYPES, last_session_id_statement, stream_export
+from app.services.batch_ingest import batch_ingestor, iter_ndjson, iter_rows, parse_json_array, NDJSON_CONTENT_TYPES
+from app.schemas.game import GameSession, GameSessionCreate, HighScore, HighScorePage, GameStats, IngestMetrics, RankInfo, LeaderboardWindow, BatchIngestResult, ExportFormat, PlayerDayStats, StatsDistribution, ClientStateMetrics
+from app.core.config import settings
+from app.core.pagination import decode_cursor
+from app.core.response_cache import response_cache, HIGH_SCORES_TAG, STATS_TAG, WINDOWS_TAG
+from app.services.windowed_leaderboard import seconds_until_rollover, utc_now
 from app.core.logging import app_logger
 
 router = APIRouter()
@@ -12,12 +23,14 @@ router = APIRouter()
 @router.post("/session", response_model=GameSession, status_code=status.HTTP_201_CREATED)
 async def create_game_session(
     session_data: GameSessionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_write_db)
 ):
     """Create a new game session and save score"""
     try:
-        game_service = GameService(db)
-        session = game_service.create_game_session(session_data)
+        if ingest_queue.is_running:
+            return await ingest_queue.submit(session_data)
+        game_service = AsyncGameService(db)
+        session = await game_service.create_game_session(session_data)
         return session
     except Exception as e:
         app_logger.error(f"Error creating game session: {e}")
@@ -26,16 +39,45 @@ async def create_game_session(
             detail="Failed to save game session"
         )
 
+@router.post("/sessions/batch", response_model=BatchIngestResult)
+async def create_game_sessions_batch(request: Request):
+    """Save many game sessions from a JSON array or a streamed NDJSON body"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        rows = iter_ndjson(request.stream())
+    else:
+        try:
+            rows = iter_rows(parse_json_array(await request.body()))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid batch body: {e}"
+            )
+    try:
+        return await batch_ingestor.ingest(rows)
+    except Exception as e:
+        app_logger.error(f"Error ingesting game session batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save game sessions"
+        )
+
 @router.get("/high-scores", response_model=List[HighScore])
 async def get_high_scores(
-    limit: int = 10,
-    db: Session = Depends(get_db)
+    request: Request,
+    limit: int = Query(10, ge=1, le=settings.LEADERBOARD_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get top high scores"""
+    cached = response_cache.lookup(request, HIGH_SCORES_TAG)
+    if cached is not None:
+        return cached
     try:
-        game_service = GameService(db)
-        high_scores = game_service.get_high_scores(limit)
-        return high_scores
+        if leaderboard_read_model.is_warm:
+            high_scores = leaderboard_read_model.top(limit)
+        else:
+            high_scores = await AsyncGameService(db).get_high_scores(limit)
+        return response_cache.store(request, HIGH_SCORES_TAG, high_scores, List[HighScore])
     except Exception as e:
         app_logger.error(f"Error getting high scores: {e}")
         raise HTTPException(
@@ -43,16 +85,194 @@ async def get_high_scores(
             detail="Failed to get high scores"
         )
 
+@router.get("/high-scores/page", response_model=HighScorePage)
+async def get_high_score_page(
+    request: Request,
+    limit: int = Query(10, ge=1, le=settings.LEADERBOARD_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get one page of the leaderboard; follow next_cursor for the next page"""
+    cached = response_cache.lookup(request, HIGH_SCORES_TAG)
+    if cached is not None:
+        return cached
+    after = None
+    if cursor:
+        try:
+            score, last_id = decode_cursor(cursor, 2)
+            after = (int(score), int(last_id))
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    try:
+        game_service = AsyncGameService(db)
+        page = await game_service.get_high_score_page(limit, after)
+        return response_cache.store(request, HIGH_SCORES_TAG, page, HighScorePage)
+    except Exception as e:
+        app_logger.error(f"Error getting high score page: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get high scores"
+        )
+
+@router.get("/high-scores/{window}", response_model=List[GameSession])
+async def get_window_high_scores(
+    request: Request,
+    window: LeaderboardWindow,
+    limit: int = Query(10, ge=1, le=settings.LEADERBOARD_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the best game sessions of today, this week or all time (UTC)"""
+    cached = response_cache.lookup(request, WINDOWS_TAG)
+    if cached is not None:
+        return cached
+    try:
+        game_service = AsyncGameService(db)
+        sessions = await game_service.get_window_high_scores(window, limit)
+        # Expire with the window so a new day doesn't serve yesterday's board
+        ttl = min(seconds_until_rollover(window), settings.RESPONSE_CACHE_TTL_S)
+        return response_cache.store(request, WINDOWS_TAG, sessions, List[GameSession], ttl=ttl)
+    except Exception as e:
+        app_logger.error(f"Error getting {window.value} high scores: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get high scores"
+        )
+
 @router.get("/stats", response_model=GameStats)
-async def get_game_stats(db: Session = Depends(get_db)):
+async def get_game_stats(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get overall game statistics"""
+    cached = response_cache.lookup(request, STATS_TAG)
+    if cached is not None:
+        return cached
     try:
-        game_service = GameService(db)
-        stats = game_service.get_game_stats()
-        return stats
+        game_service = AsyncGameService(db)
+        stats = await game_service.get_game_stats()
+        return response_cache.store(request, STATS_TAG, stats, GameStats)
     except Exception as e:
         app_logger.error(f"Error getting game stats: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get game statistics"
-        )
\ No newline at end of file
+        )
+
+@router.get("/stats/distribution", response_model=StatsDistribution)
+async def get_stats_distribution(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get p50/p90/p99 and histograms of score, distance and duration"""
+    cached = response_cache.lookup(request, STATS_TAG)
+    if cached is not None:
+        return cached
+    try:
+        game_service = AsyncGameService(db)
+        distribution = await game_service.get_stats_distribution()
+        return response_cache.store(request, STATS_TAG, distribution, StatsDistribution)
+    except Exception as e:
+        app_logger.error(f"Error getting stats distribution: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get game statistics"
+        )
+
+@router.get("/rank", response_model=RankInfo)
+async def get_score_rank(
+    score: int = Query(ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the global rank a score would take among all game sessions"""
+    try:
+        game_service = AsyncGameService(db)
+        return await game_service.get_score_rank(score)
+    except Exception as e:
+        app_logger.error(f"Error getting score rank: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get rank"
+        )
+
+@router.get("/rank/player/{player_name}", response_model=RankInfo)
+async def get_player_rank(
+    player_name: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the global rank of a player's best game session"""
+    try:
+        game_service = AsyncGameService(db)
+        rank = await game_service.get_player_rank(player_name)
+    except Exception as e:
+        app_logger.error(f"Error getting player rank: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get rank"
+        )
+    if rank is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Player has no game sessions"
+        )
+    return rank
+
+@router.get("/history/{player_name}", response_model=List[PlayerDayStats])
+async def get_player_history(
+    player_name: str,
+    days: int = Query(30, ge=1, le=3660),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a player's daily totals for the last ``days`` days (UTC), newest first"""
+    try:
+        game_service = AsyncGameService(db)
+        since = (utc_now() - timedelta(days=days - 1)).date()
+        return await game_service.get_player_history(player_name, since)
+    except Exception as e:
+        app_logger.error(f"Error getting player history: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get player history"
+        )
+
+@router.get("/ingest/metrics", response_model=IngestMetrics)
+async def get_ingest_metrics():
+    """Get session ingest queue depth and batching metrics"""
+    return ingest_queue.metrics()
+
+@router.get("/clients/metrics", response_model=ClientStateMetrics)
+async def get_client_metrics():
+    """Get connected game page counts and the memory held by their state"""
+    return client_states.metrics()
+
+@router.get("/export")
+async def export_game_sessions(
+    format: ExportFormat = ExportFormat.NDJSON,
+    gzip: bool = False,
+    after_id: int = Query(0, ge=0),
+    until_id: Optional[int] = Query(None, ge=0),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream game sessions in id order as NDJSON or CSV"""
+    try:
+        if until_id is None:
+            # Pin the export to the rows that exist now so it can be resumed
+            until_id = (await db.execute(last_session_id_statement())).scalar_one()
+    except Exception as e:
+        app_logger.error(f"Error starting game session export: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to export game sessions"
+        )
+    export_range = ExportRange(after_id=after_id, until_id=until_id, start=start, end=end)
+    filename = f"game_sessions.{format.value}" + (".gz" if gzip else "")
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Export-Until-Id": str(until_id)
+    }
+    if gzip:
+        # The .gz file is the payload: keep GZipMiddleware from compressing it again
+        headers["Content-Encoding"] = "identity"
+    return StreamingResponse(
+        stream_export(export_range, ExportEncoder(format, compress=gzip)),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers=headers
+    )
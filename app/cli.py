@@ -0,0 +1,118 @@
+"""Maintenance commands, e.g. ``python -m app.cli stats verify``"""
+import argparse
+import sys
+from contextlib import nullcontext
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.core.database import create_tables, engine, write_engine
+from app.schemas.game import ExportFormat
+from app.services.export import ExportEncoder, ExportRange, last_session_id_statement, write_export
+from app.services.game_service import GameService
+from app.services.retention import RetentionService, retention_cutoff
+from app.core.config import settings
+from app.core.static_bundle import brotli, static_bundle
+
+def stats_rebuild(args: argparse.Namespace) -> int:
+    """Recompute the running game stats from game_sessions"""
+    with Session(write_engine) as db:
+        stats = GameService(db).rebuild_game_stats()
+    print(stats.model_dump_json(indent=2))
+    return 0
+
+def stats_verify(args: argparse.Namespace) -> int:
+    """Check the running game stats against a fresh scan"""
+    with Session(write_engine) as db:
+        mismatches = GameService(db).verify_game_stats()
+    if not mismatches:
+        print("Game stats OK")
+        return 0
+    for field, values in mismatches.items():
+        print(f"{field}: expected {values['expected']}, stored {values['actual']}")
+    print("Run 'python -m app.cli stats rebuild' to repair")
+    return 1
+
+def export_sessions(args: argparse.Namespace) -> int:
+    """Export game sessions as NDJSON or CSV"""
+    with Session(engine) as db:
+        until_id = args.until_id
+        if until_id is None:
+            until_id = db.execute(last_session_id_statement()).scalar_one()
+            db.commit()
+        export_range = ExportRange(after_id=args.after_id, until_id=until_id, start=args.start, end=args.end)
+        encoder = ExportEncoder(ExportFormat(args.format), compress=args.gzip)
+        with open(args.output, "wb") if args.output else nullcontext(sys.stdout.buffer) as output:
+            exported = write_export(db, export_range, encoder, output)
+    print(f"Exported {exported} game sessions (resume with --after-id <last id> --until-id {until_id})", file=sys.stderr)
+    return 0
+
+def high_scores_compact(args: argparse.Namespace) -> int:
+    """Trim high_scores to HIGH_SCORE_BOARD_SIZE rows"""
+    with Session(write_engine) as db:
+        removed = GameService(db).compact_high_scores()
+    print(f"Removed {removed} high scores; {settings.HIGH_SCORE_BOARD_SIZE} kept at most")
+    return 0
+
+def retention_run(args: argparse.Namespace) -> int:
+    """Roll up game sessions past the retention age"""
+    if args.days <= 0:
+        print("Retention is disabled; set RETENTION_DAYS or pass --days")
+        return 1
+    cutoff = retention_cutoff(args.days)
+    with Session(write_engine) as db:
+        compacted = RetentionService(db).compact(cutoff)
+    print(f"Rolled up {compacted} game sessions created before {cutoff.isoformat()}")
+    return 0
+
+def static_build(args: argparse.Namespace) -> int:
+    """Write the content-hashed game bundle and its gzip/brotli variants"""
+    for source, url in static_bundle.build().items():
+        print(f"{source} -> {url}")
+    if brotli is None:
+        print("brotli is not installed; only gzip variants were written", file=sys.stderr)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    stats = commands.add_parser("stats", help="Running game statistics")
+    stats_commands = stats.add_subparsers(dest="action", required=True)
+    stats_commands.add_parser("rebuild", help=stats_rebuild.__doc__).set_defaults(handler=stats_rebuild)
+    stats_commands.add_parser("verify", help=stats_verify.__doc__).set_defaults(handler=stats_verify)
+    
+    high_scores = commands.add_parser("high-scores", help="High score board")
+    high_scores_commands = high_scores.add_subparsers(dest="action", required=True)
+    high_scores_commands.add_parser("compact", help=high_scores_compact.__doc__).set_defaults(handler=high_scores_compact)
+    
+    export = commands.add_parser("export", help=export_sessions.__doc__)
+    export.add_argument("--format", choices=[f.value for f in ExportFormat], default=ExportFormat.NDJSON.value)
+    export.add_argument("--gzip", action="store_true", help="Gzip the output")
+    export.add_argument("--output", "-o", help="Output file (default: stdout)")
+    export.add_argument("--after-id", type=int, default=0, help="Export sessions with a higher id")
+    export.add_argument("--until-id", type=int, help="Export sessions up to this id (default: the current highest)")
+    export.add_argument("--start", type=datetime.fromisoformat, help="Earliest created_at (ISO 8601, UTC)")
+    export.add_argument("--end", type=datetime.fromisoformat, help="created_at before this (ISO 8601, UTC)")
+    export.set_defaults(handler=export_sessions)
+    
+    retention = commands.add_parser("retention", help="Roll old game sessions into daily rollups")
+    retention_commands = retention.add_subparsers(dest="action", required=True)
+    retention_run_parser = retention_commands.add_parser("run", help=retention_run.__doc__)
+    retention_run_parser.add_argument("--days", type=int, default=settings.RETENTION_DAYS, help="Retention age in days")
+    retention_run_parser.set_defaults(handler=retention_run)
+    
+    static = commands.add_parser("static", help="Static game bundle")
+    static_commands = static.add_subparsers(dest="action", required=True)
+    static_commands.add_parser("build", help=static_build.__doc__).set_defaults(handler=static_build, database=False)
+    
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "database", True):
+        create_tables()
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
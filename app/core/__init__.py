@@ -3,6 +3,7 @@ from app.core.config import settings
 from app.core.logging import app_logger
 from app.core.middleware import setup_middleware
 from app.core.routers import setup_routers
+from app.core.static_bundle import setup_static_bundle
 from app.core.errors import setup_error_handlers
 from app.core.health import HealthCheck, is_healthy
 
@@ -11,6 +12,7 @@ __all__ = [
     "app_logger", 
     "setup_middleware",
     "setup_routers",
+    "setup_static_bundle",
     "setup_error_handlers",
     "HealthCheck",
     "is_healthy"
@@ -21,12 +21,69 @@ class Settings(BaseSettings):
     # Server
     HOST: str = Field(default="0.0.0.0")
     PORT: int = Field(default=8080)
+    WORKERS: int = Field(default=1, ge=1)  # >1 runs one process per worker behind a sticky proxy
+    WORKER_BASE_PORT: int = Field(default=8081)  # Worker i listens on WORKER_BASE_PORT + i
+    WORKER_INDEX: int = Field(default=0, ge=0)  # Set by the supervisor for each worker
+    CHANGE_FEED_POLL_MS: float = Field(default=250.0, gt=0.0)
+    CHANGE_FEED_RETENTION_S: float = Field(default=600.0, gt=0.0)
     
     # Security
     SECRET_KEY: str = Field(default="subway-surfers-secret-key-change-in-production")
     
     # Database
     DATABASE_URL: str = Field(default="sqlite:///./data/game.db")
+    ASYNC_DATABASE_URL: Optional[str] = Field(default=None)  # Derived from DATABASE_URL when unset
+    DATABASE_PROFILE: str = Field(default="default")  # "default" or "high_concurrency" (SQLite WAL)
+    SQLITE_SYNCHRONOUS: str = Field(default="NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, ge=0)
+    SQLITE_CACHE_SIZE: int = Field(default=-65536)  # Negative values are KiB
+    SQLITE_MMAP_SIZE: int = Field(default=268435456, ge=0)
+    SQLITE_READ_POOL_SIZE: int = Field(default=8, ge=1)
+    SQLITE_CHECKPOINT_INTERVAL_S: float = Field(default=60.0, ge=0.0)
+    
+    # Leaderboard
+    HIGH_SCORE_BOARD_SIZE: int = Field(default=10, ge=1)  # Rows kept in high_scores
+    LEADERBOARD_MAX_PAGE_SIZE: int = Field(default=100, ge=1)
+    LEADERBOARD_WINDOW_SIZE: int = Field(default=100, ge=1)  # Entries kept per daily/weekly/all-time board
+    
+    # HTTP response cache for leaderboard and stats endpoints
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=512, ge=1)
+    RESPONSE_CACHE_TTL_S: float = Field(default=300.0, gt=0.0)
+    
+    # Global rank index (scores per Fenwick bucket; 1 gives exact ranks)
+    RANK_BUCKET_WIDTH: int = Field(default=1, ge=1)  # 1 = exact ranks; wider buckets treat nearby scores as ties
+    RANK_MAX_BUCKETS: int = Field(default=1048576, ge=1024)
+    
+    # Session ingestion (group commit)
+    INGEST_BATCH_SIZE: int = Field(default=64, ge=1)
+    INGEST_MAX_LATENCY_MS: float = Field(default=20.0, ge=0.0)
+    INGEST_QUEUE_SIZE: int = Field(default=10000, ge=1)
+    BATCH_INGEST_CHUNK_SIZE: int = Field(default=500, ge=1)  # Rows per transaction
+    BATCH_INGEST_MAX_ROWS: int = Field(default=10000, ge=1)  # Rows read per request
+    
+    # Export
+    EXPORT_PAGE_SIZE: int = Field(default=5000, ge=1)  # Rows read per short read transaction
+    EXPORT_YIELD_PER: int = Field(default=500, ge=1)  # Rows fetched from the cursor at a time
+    
+    # Score/distance/duration distributions
+    DISTRIBUTION_RELATIVE_ACCURACY: float = Field(default=0.01, gt=0.0, lt=1.0)  # Percentile error bound
+    DISTRIBUTION_MAX_BINS: int = Field(default=2048, ge=16)
+    SKETCH_PERSIST_INTERVAL_S: float = Field(default=60.0, ge=0.0)
+    UNIQUE_PLAYERS_PRECISION: int = Field(default=12, ge=4, le=16)  # 2**p bytes per HyperLogLog
+    HISTOGRAM_BUCKETS: int = Field(default=20, ge=1)
+    SCORE_HISTOGRAM_WIDTH: float = Field(default=1000.0, gt=0.0)
+    DISTANCE_HISTOGRAM_WIDTH: float = Field(default=500.0, gt=0.0)
+    DURATION_HISTOGRAM_WIDTH: float = Field(default=30.0, gt=0.0)  # Seconds
+    
+    # Retention
+    RETENTION_DAYS: int = Field(default=0, ge=0)  # Roll up sessions older than this; 0 disables
+    RETENTION_INTERVAL_S: float = Field(default=3600.0, ge=0.0)  # 0 disables the background job
+    RETENTION_BATCH_SIZE: int = Field(default=5000, ge=1)  # Sessions rolled up per transaction
+    RETENTION_ARCHIVE_DIR: str = Field(default="")  # Write rolled-up sessions here as .ndjson.gz first
+    
+    # Per-client game page state
+    CLIENT_STATE_GRACE_S: float = Field(default=5.0, ge=0.0)  # Longer than NiceGUI's reconnect timeout (3 s)
+    LIVE_SCORE_RATE_HZ: float = Field(default=4.0, gt=0.0, le=60.0)  # Game page stats panel updates per second
     
     # Game Settings
     GAME_SPEED: float = Field(default=5.0)
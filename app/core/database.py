@@ -1,15 +1,87 @@
 """SQLAlchemy V2 database setup"""
+from typing import AsyncIterator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
 from app.core.logging import app_logger
+from app.core.sqlite import HIGH_CONCURRENCY_PROFILE, WalCheckpointer, high_concurrency_enabled, install_pragmas
 
-# Create engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=300
+# Async drivers for the sync URLs we support
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Derive the async driver URL from a sync DATABASE_URL"""
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+HIGH_CONCURRENCY = high_concurrency_enabled(settings.DATABASE_URL)
+
+if HIGH_CONCURRENCY:
+    # WAL lets a pool of readers run alongside exactly one writer connection,
+    # so writers queue in the pool instead of failing with "database is locked".
+    # Pre-ping and recycling only add round-trips on a local file.
+    # The running server writes only through async_write_engine. write_engine
+    # serves sync code outside the event loop: startup before requests are
+    # served, and app.cli commands, which are separate processes anyway and
+    # wait on busy_timeout like any other SQLite client.
+    engine = create_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        poolclass=QueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0
+    )
+    write_engine = create_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0
+    )
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=settings.DEBUG,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0
+    )
+    async_write_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=settings.DEBUG,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0
+    )
+    for sync_engine in (engine, write_engine, async_engine.sync_engine, async_write_engine.sync_engine):
+        install_pragmas(sync_engine)
+    app_logger.info(f"Database profile: {HIGH_CONCURRENCY_PROFILE}")
+else:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_recycle=300
+    )
+    write_engine = engine
+    # Async engine used by the API so queries don't block the event loop
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=settings.DEBUG)
+    async_write_engine = async_engine
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+AsyncWriteSessionLocal = async_sessionmaker(async_write_engine, expire_on_commit=False)
+wal_checkpointer = WalCheckpointer(
+    async_write_engine,
+    settings.SQLITE_CHECKPOINT_INTERVAL_S if HIGH_CONCURRENCY else 0
 )
 
 class Base(DeclarativeBase):
@@ -18,17 +90,45 @@ class Base(DeclarativeBase):
 
 def create_tables():
     """Create all database tables."""
+    import app.models.game  # noqa: F401  Registers the tables on Base.metadata
     try:
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=write_engine)
+        # create_all skips existing tables, so add indexes introduced later
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=write_engine, checkfirst=True)
         app_logger.info("Database tables created successfully")
     except Exception as e:
         app_logger.error(f"Error creating database tables: {e}")
         raise
 
+def begin_read_snapshot(db: Session) -> None:
+    """Make every following read in ``db``'s transaction see one snapshot.
+
+    Call it before the transaction's first statement. pysqlite and aiosqlite
+    only open a transaction for writes, so each SELECT would otherwise see
+    the latest commit; other backends get REPEATABLE READ.
+    """
+    connection = db.connection()
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("BEGIN")
+    else:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
 def get_db() -> Session:
-    """Database session dependency."""
+    """Database session dependency (reads)."""
     with Session(engine) as session:
         try:
             yield session
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async database session dependency."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+async def get_async_write_db() -> AsyncIterator[AsyncSession]:
+    """Async database session dependency for writes (single writer connection)."""
+    async with AsyncWriteSessionLocal() as session:
+        yield session
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""Application startup and shutdown hooks"""
+from fastapi import FastAPI
+from app.core.database import async_engine, async_write_engine, wal_checkpointer
+from app.services.ingest import ingest_queue
+from app.services.retention import retention_worker
+from app.services.sketch_store import sketch_persister
+from app.services.change_feed import change_feed_tailer
+from app.services.leaderboard_hub import leaderboard_hub
+from app.frontend.live_scores import live_score_flusher
+
+def setup_lifecycle(app: FastAPI):
+    """Start background services with the application and drain them on shutdown"""
+    app.add_event_handler("startup", ingest_queue.start)
+    app.add_event_handler("startup", wal_checkpointer.start)
+    app.add_event_handler("startup", retention_worker.start)
+    app.add_event_handler("startup", sketch_persister.start)
+    app.add_event_handler("startup", change_feed_tailer.start)
+    app.add_event_handler("startup", leaderboard_hub.start)
+    app.add_event_handler("startup", live_score_flusher.start)
+    app.add_event_handler("shutdown", live_score_flusher.stop)
+    app.add_event_handler("shutdown", leaderboard_hub.stop)
+    app.add_event_handler("shutdown", change_feed_tailer.stop)
+    app.add_event_handler("shutdown", sketch_persister.stop)
+    app.add_event_handler("shutdown", retention_worker.stop)
+    app.add_event_handler("shutdown", ingest_queue.stop)
+    app.add_event_handler("shutdown", wal_checkpointer.stop)
+    app.add_event_handler("shutdown", async_engine.dispose)
+    if async_write_engine is not async_engine:
+        app.add_event_handler("shutdown", async_write_engine.dispose)
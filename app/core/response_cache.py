@@ -0,0 +1,113 @@
+"""Cache of serialized, pre-compressed API responses with ETag revalidation"""
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.core.config import settings
+from app.core.static_bundle import accepted_encodings
+
+# Tags bumped by GameService writes
+HIGH_SCORES_TAG = "high-scores"
+STATS_TAG = "stats"
+WINDOWS_TAG = "windows"
+
+class CachedResponse:
+    """JSON body of one response, its gzip variant and ETag"""
+
+    __slots__ = ("tag", "version", "etag", "body", "gzip_body", "expires_at")
+
+    def __init__(self, tag: str, version: int, body: bytes, expires_at: float):
+        self.tag = tag
+        self.version = version
+        # Derived from the body, so a bump that changes nothing still revalidates
+        self.etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6)
+        self.expires_at = expires_at
+
+class ResponseCache:
+    """Serialized responses keyed by URL and invalidated by per-tag versions.
+
+    Writers call ``bump(tag)`` after committing; every cached response under
+    that tag is then stale. Until the next bump, requests are answered from
+    the stored bytes, and clients presenting the current ETag get a 304.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._adapters: Dict[Any, TypeAdapter] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *tags: str) -> None:
+        """Invalidate every response cached under ``tags``"""
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def version(self, tag: str) -> int:
+        return self._versions.get(tag, 0)
+
+    @staticmethod
+    def _key(request: Request) -> str:
+        return f"{request.url.path}?{'&'.join(sorted(request.url.query.split('&')))}"
+
+    def lookup(self, request: Request, tag: str) -> Optional[Response]:
+        """Response for ``request`` if a current one is cached"""
+        key = self._key(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != self.version(tag) or entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return self._respond(request, entry)
+
+    def store(self, request: Request, tag: str, content: Any, model: Any, ttl: Optional[float] = None) -> Response:
+        """Serialize ``content`` as ``model``, cache it and return the response.
+
+        Entries live until their tag is bumped, or at most ``ttl`` seconds
+        (RESPONSE_CACHE_TTL_S by default) so a degraded answer never sticks.
+        """
+        ttl = settings.RESPONSE_CACHE_TTL_S if ttl is None else ttl
+        adapter = self._adapters.get(model)
+        if adapter is None:
+            adapter = self._adapters.setdefault(model, TypeAdapter(model))
+        # Read the version before serializing so a concurrent bump makes this entry stale
+        version = self.version(tag)
+        body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+        entry = CachedResponse(tag, version, body, time.monotonic() + ttl)
+        with self._lock:
+            self._entries[self._key(request)] = entry
+            self._entries.move_to_end(self._key(request))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self._respond(request, entry)
+
+    @staticmethod
+    def _etag_matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        candidates = [value.strip() for value in header.split(",")]
+        # Weak comparison: W/"x" and "x" match
+        return "*" in candidates or any(c.removeprefix("W/") == etag.removeprefix("W/") for c in candidates)
+
+    def _respond(self, request: Request, entry: CachedResponse) -> Response:
+        # Vary on the 304 too, so shared caches key the revalidated entry by encoding
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if self._etag_matches(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        if "gzip" in accepted_encodings(request.headers.get("accept-encoding", "")):
+            headers["Content-Encoding"] = "gzip"
+            return Response(entry.gzip_body, media_type="application/json", headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+response_cache = ResponseCache(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
@@ -1,7 +1,8 @@
 """FastAPI router setup"""
 from fastapi import FastAPI
-from app.api import api_router
 
 def setup_routers(app: FastAPI, api_prefix: str = "/api"):
     """Setup application routers"""
-    app.include_router(api_router, prefix=api_prefix)
\ No newline at end of file
+    # Imported here: the API pulls in the services, which import app.core
+    from app.api import api_router
+    app.include_router(api_router, prefix=api_prefix)
@@ -0,0 +1,99 @@
+"""SQLite storage profiles: connection pragmas and WAL checkpointing"""
+import asyncio
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+from app.core.logging import app_logger
+
+DEFAULT_PROFILE = "default"
+HIGH_CONCURRENCY_PROFILE = "high_concurrency"
+PROFILES = (DEFAULT_PROFILE, HIGH_CONCURRENCY_PROFILE)
+
+def is_sqlite(url: str) -> bool:
+    """Whether a database URL points at SQLite"""
+    return make_url(url).get_backend_name() == "sqlite"
+
+def high_concurrency_enabled(url: str) -> bool:
+    """Whether the high-concurrency profile applies to this database"""
+    if settings.DATABASE_PROFILE not in PROFILES:
+        app_logger.warning(
+            f"Unknown DATABASE_PROFILE '{settings.DATABASE_PROFILE}', using '{DEFAULT_PROFILE}'"
+        )
+        return False
+    return settings.DATABASE_PROFILE == HIGH_CONCURRENCY_PROFILE and is_sqlite(url)
+
+def connection_pragmas() -> Dict[str, Any]:
+    """Pragmas applied to every new connection in the high-concurrency profile"""
+    return {
+        "journal_mode": "WAL",
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": "MEMORY",
+    }
+
+def install_pragmas(engine: Engine) -> None:
+    """Apply connection_pragmas() whenever the engine opens a connection"""
+    pragmas = connection_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+class WalCheckpointer:
+    """Background task that checkpoints the WAL through the writer connection.
+
+    SQLite's automatic checkpoints run inside whichever commit crosses the
+    threshold; running them on a timer keeps the WAL short and moves that
+    work off the request path.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start checkpointing on the running event loop"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="sqlite-wal-checkpoint")
+            app_logger.info(f"WAL checkpoints every {self.interval:.0f}s")
+
+    async def stop(self) -> None:
+        """Stop checkpointing and run a final truncating checkpoint"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.checkpoint("TRUNCATE")
+
+    async def checkpoint(self, mode: str = "PASSIVE") -> None:
+        """Run one checkpoint and log it if it could not complete"""
+        try:
+            async with self.engine.connect() as conn:
+                busy, log_frames, checkpointed = (
+                    await conn.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})")
+                ).one()
+            if busy:
+                app_logger.warning(
+                    f"WAL checkpoint incomplete: {checkpointed}/{log_frames} frames (readers busy)"
+                )
+        except Exception as e:
+            app_logger.error(f"WAL checkpoint failed: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.checkpoint()
@@ -0,0 +1,142 @@
+"""Content-hashed, precompressed static game bundle"""
+import gzip
+import hashlib
+import os
+from typing import Dict, List
+from fastapi import FastAPI, Request, Response, status
+from app.core.logging import app_logger
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip variants are built
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+STATIC_URL = "/static"
+BUNDLE_SOURCES = ("game.css", "game.js")
+MEDIA_TYPES = {".css": "text/css; charset=utf-8", ".js": "text/javascript; charset=utf-8"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+def accepted_encodings(header: str) -> List[str]:
+    """Codings from an Accept-Encoding header, skipping any sent with q=0"""
+    codings = []
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in {"q=0", "q=0.0", "q=0.00", "q=0.000"}:
+            continue
+        if coding:
+            codings.append(coding.strip().lower())
+    return codings
+
+class StaticAsset:
+    """One bundle file and its precompressed variants"""
+
+    def __init__(self, name: str, media_type: str, variants: Dict[str, bytes]):
+        self.name = name
+        self.media_type = media_type
+        self.variants = variants  # Content-Encoding ("" for identity) -> body
+        self.etag = f'"{name}"'
+
+class StaticBundle:
+    """Game client files served under names that change with their contents.
+
+    ``build()`` names each source after a hash of its bytes, writes it with
+    gzip and brotli variants to ``dist/`` once per version and keeps them in
+    memory. Pages link the hashed names, so responses can be cached as
+    immutable and a repeat visit downloads nothing until the code changes.
+    """
+
+    def __init__(self, source_dir: str, sources=BUNDLE_SOURCES):
+        self.source_dir = source_dir
+        self.dist_dir = os.path.join(source_dir, "dist")
+        self.sources = sources
+        self.urls: Dict[str, str] = {}
+        self._assets: Dict[str, StaticAsset] = {}
+
+    def build(self) -> Dict[str, str]:
+        """Hash and compress every source; returns source name -> URL"""
+        assets: Dict[str, StaticAsset] = {}
+        urls: Dict[str, str] = {}
+        for source in self.sources:
+            with open(os.path.join(self.source_dir, source), "rb") as f:
+                data = f.read()
+            stem, ext = os.path.splitext(source)
+            name = f"{stem}.{hashlib.sha256(data).hexdigest()[:16]}{ext}"
+            variants = {"": data, "gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants["br"] = brotli.compress(data, quality=11)
+            assets[name] = StaticAsset(name, MEDIA_TYPES.get(ext, "application/octet-stream"), variants)
+            urls[source] = f"{STATIC_URL}/{name}"
+            self._write(stem, ext, assets[name])
+        self._assets = assets
+        self.urls = urls
+        app_logger.info(f"Static bundle built: {', '.join(sorted(assets))}")
+        return urls
+
+    def _write(self, stem: str, ext: str, asset: StaticAsset) -> None:
+        """Write the files for proxies and CDNs, removing older versions of the same source"""
+        try:
+            os.makedirs(self.dist_dir, exist_ok=True)
+            current = {asset.name + ENCODING_SUFFIXES.get(encoding, "") for encoding in asset.variants}
+            for existing in os.listdir(self.dist_dir):
+                parts = existing.split(".")
+                if parts[0] == stem and parts[2:3] == [ext[1:]] and existing not in current:
+                    os.remove(os.path.join(self.dist_dir, existing))
+            for encoding, body in asset.variants.items():
+                path = os.path.join(self.dist_dir, asset.name + ENCODING_SUFFIXES.get(encoding, ""))
+                if os.path.exists(path):
+                    continue
+                with open(f"{path}.tmp", "wb") as f:
+                    f.write(body)
+                os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            # Read-only deployments still serve the in-memory variants
+            app_logger.warning(f"Could not write static bundle to {self.dist_dir}: {e}")
+
+    def url(self, source: str) -> str:
+        if not self.urls:
+            self.build()
+        return self.urls[source]
+
+    def head_html(self, *sources: str) -> str:
+        """Tags linking the given sources (default: all) by hash"""
+        tags = []
+        for source in sources or self.sources:
+            if source.endswith(".css"):
+                tags.append(f'<link rel="stylesheet" href="{self.url(source)}">')
+            else:
+                tags.append(f'<script defer src="{self.url(source)}"></script>')
+        return "".join(tags)
+
+    def response(self, name: str, request: Request) -> Response:
+        """Serve the best variant the client accepts"""
+        asset = self._assets.get(name)
+        if asset is None:
+            return Response(status_code=status.HTTP_404_NOT_FOUND)
+        headers = {"Cache-Control": IMMUTABLE, "ETag": asset.etag, "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == asset.etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        encoding = self._negotiate(asset, request.headers.get("accept-encoding", ""))
+        if encoding:
+            # Already compressed: GZipMiddleware passes responses with a Content-Encoding through
+            headers["Content-Encoding"] = encoding
+        return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+    @staticmethod
+    def _negotiate(asset: StaticAsset, accept_encoding: str) -> str:
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in asset.variants and encoding in accepted:
+                return encoding
+        return ""
+
+static_bundle = StaticBundle(STATIC_DIR)
+
+def setup_static_bundle(app: FastAPI):
+    """Build the bundle and serve it under /static"""
+    static_bundle.build()
+
+    @app.get(f"{STATIC_URL}/{{name}}", include_in_schema=False)
+    async def get_static_asset(name: str, request: Request):
+        return static_bundle.response(name, request)
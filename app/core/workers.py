@@ -0,0 +1,77 @@
+"""Multi-worker mode: pre-forked processes behind a sticky proxy"""
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from typing import Dict
+from fastapi import FastAPI
+from app.core.config import settings
+from app.core.logging import app_logger
+
+def worker_id() -> str:
+    """Identifies this process in the change feed"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def multi_worker_enabled() -> bool:
+    return settings.WORKERS > 1
+
+def is_primary_worker() -> bool:
+    """Whether this process runs the once-per-deployment jobs (retention, feed pruning)"""
+    return settings.WORKER_INDEX == 0
+
+def run_worker(app: FastAPI, index: int) -> None:
+    """Serve the API and the NiceGUI pages from one forked worker"""
+    import uvicorn
+    from app.core.database import engine, write_engine, async_engine, async_write_engine
+    from app.core.nicegui_setup import setup_nicegui
+    settings.WORKER_INDEX = index
+    # Connections opened by the supervisor must not be shared across processes
+    for sync_engine in {engine, write_engine, async_engine.sync_engine, async_write_engine.sync_engine}:
+        sync_engine.dispose(close=False)
+    setup_nicegui(app)
+    uvicorn.run(
+        app,
+        host=settings.HOST,
+        port=settings.WORKER_BASE_PORT + index,
+        log_level='info' if settings.DEBUG else 'warning'
+    )
+
+def run_workers(app: FastAPI) -> None:
+    """Fork WORKERS processes and restart any that exit until stopped.
+
+    The caller has already created the schema and warmed the in-memory
+    indexes, which the workers inherit. NiceGUI keeps each page's state in
+    the process that rendered it, so every worker listens on its own port
+    and the proxy in front must send a client's page and websocket
+    requests to the same worker (see deploy/nginx.conf).
+    """
+    context = multiprocessing.get_context("fork")
+    workers: Dict[int, multiprocessing.Process] = {}
+    stopping = False
+
+    def start(index: int) -> None:
+        process = context.Process(target=run_worker, args=(app, index), name=f"worker-{index}")
+        process.start()
+        workers[index] = process
+        app_logger.info(f"Worker {index} (pid {process.pid}) on port {settings.WORKER_BASE_PORT + index}")
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(settings.WORKERS):
+        start(index)
+    while not stopping:
+        time.sleep(1)
+        for index, process in list(workers.items()):
+            if not process.is_alive() and not stopping:
+                app_logger.error(f"Worker {index} exited with code {process.exitcode}, restarting")
+                start(index)
+    for process in workers.values():
+        process.terminate()
+    for process in workers.values():
+        process.join(timeout=10)
+    app_logger.info("All workers stopped")
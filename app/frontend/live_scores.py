@@ -0,0 +1,59 @@
+"""Batched updates of the game page stats panels from game client progress"""
+import asyncio
+from typing import Optional
+from app.core.config import settings
+from app.services.client_state import ClientGameState, client_states
+from app.core.logging import app_logger
+
+def update_labels(state: ClientGameState) -> None:
+    """Show the state's score, coins and distance on its page"""
+    if state.labels is not None:
+        score_label, coins_label, distance_label = state.labels
+        score_label.text = f"Score: {state.score:,}"
+        coins_label.text = f"Coins: {state.coins:,}"
+        distance_label.text = f"Distance: {state.distance:.1f}m"
+
+class LiveScoreFlusher:
+    """Applies queued progress to the stats panels every ``interval`` seconds.
+
+    Game clients send at most one coalesced progress message per interval;
+    the handler only records it, and this task updates the labels of every
+    changed page in one pass, so each page gets at most one update per tick.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start flushing on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="live-score-flush")
+
+    async def stop(self) -> None:
+        """Stop flushing"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def flush(self) -> int:
+        """Update the labels of every changed page; returns how many"""
+        states = client_states.take_dirty()
+        for state in states:
+            try:
+                update_labels(state)
+            except Exception as e:
+                app_logger.error(f"Error updating stats panel of client {state.client_id}: {e}")
+        return len(states)
+
+    async def _run(self) -> None:
+        while True:
+            self.flush()
+            await asyncio.sleep(self.interval)
+
+live_score_flusher = LiveScoreFlusher(interval=1 / settings.LIVE_SCORE_RATE_HZ)
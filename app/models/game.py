@@ -1,7 +1,7 @@
 """Game-related SQLAlchemy models"""
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, Float, DateTime, func
-from datetime import datetime
+from sqlalchemy import String, Integer, Float, Date, DateTime, Text, Index, func
+from datetime import date, datetime
 from app.core.database import Base
 
 class GameSession(Base):
@@ -14,11 +14,14 @@ class GameSession(Base):
     coins_collected: Mapped[int] = mapped_column(Integer, default=0)
     distance: Mapped[float] = mapped_column(Float, default=0.0)
     duration: Mapped[float] = mapped_column(Float, default=0.0)  # Game duration in seconds
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), index=True)
     
     def __repr__(self) -> str:
         return f"<GameSession(id={self.id}, player='{self.player_name}', score={self.score})>"
 
+# Per-player lookups over the raw tail (player bests, daily history)
+Index("ix_game_sessions_player_created", GameSession.player_name, GameSession.created_at)
+
 class HighScore(Base):
     """High score model for leaderboard"""
     __tablename__ = "high_scores"
@@ -31,4 +34,77 @@ class HighScore(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     
     def __repr__(self) -> str:
-        return f"<HighScore(id={self.id}, player='{self.player_name}', score={self.score})>"
\ No newline at end of file
+        return f"<HighScore(id={self.id}, player='{self.player_name}', score={self.score})>"
+
+# Leaderboard order (score DESC, id ASC), used for keyset pagination
+Index("ix_high_scores_score_desc_id", HighScore.score.desc(), HighScore.id)
+
+class GameStatsTotals(Base):
+    """Running aggregates over game_sessions, kept in a single row"""
+    __tablename__ = "game_stats"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    total_games: Mapped[int] = mapped_column(Integer, default=0)
+    total_score: Mapped[int] = mapped_column(Integer, default=0)
+    total_coins: Mapped[int] = mapped_column(Integer, default=0)
+    total_distance: Mapped[float] = mapped_column(Float, default=0.0)
+    best_score: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    
+    def __repr__(self) -> str:
+        return f"<GameStatsTotals(total_games={self.total_games}, best_score={self.best_score})>"
+
+class DailyPlayerRollup(Base):
+    """Aggregates of one player's game sessions on one day (UTC), kept after retention"""
+    __tablename__ = "daily_player_rollups"
+    
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    player_name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    games: Mapped[int] = mapped_column(Integer, default=0)
+    total_score: Mapped[int] = mapped_column(Integer, default=0)
+    total_coins: Mapped[int] = mapped_column(Integer, default=0)
+    total_distance: Mapped[float] = mapped_column(Float, default=0.0)
+    best_score: Mapped[int] = mapped_column(Integer, default=0)
+    
+    def __repr__(self) -> str:
+        return f"<DailyPlayerRollup(day={self.day}, player='{self.player_name}', games={self.games})>"
+
+Index("ix_daily_player_rollups_player_day", DailyPlayerRollup.player_name, DailyPlayerRollup.day)
+
+class ArchivedScoreCount(Base):
+    """Number of rolled-up game sessions per score, so global ranks still count them"""
+    __tablename__ = "archived_score_counts"
+    
+    score: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sessions: Mapped[int] = mapped_column(Integer, default=0)
+    
+    def __repr__(self) -> str:
+        return f"<ArchivedScoreCount(score={self.score}, sessions={self.sessions})>"
+
+class StatsSketch(Base):
+    """Serialized in-memory summary (JSON), and the game session id up to which it includes every session"""
+    __tablename__ = "stats_sketches"
+    
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    state: Mapped[str] = mapped_column(Text)
+    through_id: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    
+    def __repr__(self) -> str:
+        return f"<StatsSketch(name='{self.name}', through_id={self.through_id})>"
+
+class ChangeFeedEntry(Base):
+    """A committed change that other worker processes apply to their in-memory state"""
+    __tablename__ = "change_feed"
+    # Never reuse ids after pruning, or tailers would skip new entries
+    __table_args__ = {"sqlite_autoincrement": True}
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    origin: Mapped[str] = mapped_column(String(100))  # Worker that made the change
+    kind: Mapped[str] = mapped_column(String(20))  # "sessions", "stats" or "reload"
+    session_ids: Mapped[str] = mapped_column(Text, default="[]")  # JSON [first, last] id runs
+    high_score_ids: Mapped[str] = mapped_column(Text, default="[]")
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), index=True)
+    
+    def __repr__(self) -> str:
+        return f"<ChangeFeedEntry(id={self.id}, kind='{self.kind}', origin='{self.origin}')>"
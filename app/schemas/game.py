@@ -1,7 +1,8 @@
 """Game-related Pydantic schemas"""
 from pydantic import BaseModel, Field, ConfigDict
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from enum import Enum
+from typing import Dict, List, Optional
 
 class GameSessionBase(BaseModel):
     """Base game session schema"""
@@ -40,6 +41,42 @@ class HighScore(HighScoreBase):
     id: int
     created_at: datetime
 
+class LeaderboardWindow(str, Enum):
+    """Time windows served by the rolling leaderboards"""
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    ALL_TIME = "all-time"
+
+class ExportFormat(str, Enum):
+    """Row formats produced by the game session export"""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class LeaderboardRow(BaseModel):
+    """One high score formatted for display"""
+    rank: int
+    id: int
+    player_name: str
+    score: str
+    coins: str
+    distance: str
+    date: str
+
+class LeaderboardRankChange(BaseModel):
+    """New occupant of one leaderboard rank; row is None when the rank is now empty"""
+    rank: int
+    row: Optional[LeaderboardRow] = None
+
+class LeaderboardDiff(BaseModel):
+    """Ranks of the high score board that changed in one update"""
+    version: int
+    changes: List[LeaderboardRankChange]
+
+class HighScorePage(BaseModel):
+    """One page of the leaderboard"""
+    items: List[HighScore]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to get the next page
+
 class GameStats(BaseModel):
     """Game statistics schema"""
     total_games: int
@@ -47,4 +84,94 @@ class GameStats(BaseModel):
     total_coins: int
     average_score: float
     best_score: int
-    total_distance: float
\ No newline at end of file
+    total_distance: float
+    # Approximate (HyperLogLog), UTC days and weeks
+    unique_players_today: int = 0
+    unique_players_week: int = 0
+    unique_players_all_time: int = 0
+
+class PlayerDayStats(BaseModel):
+    """One player's totals for one day (UTC)"""
+    day: date
+    games: int
+    total_score: int
+    total_coins: int
+    total_distance: float
+    best_score: int
+
+class HistogramBucket(BaseModel):
+    """Count of values in [lower, upper); upper is None for the last bucket"""
+    lower: float
+    upper: Optional[float] = None
+    count: int
+
+class MetricDistribution(BaseModel):
+    """Percentiles and histogram of one game session metric"""
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    histogram: List[HistogramBucket]
+
+class StatsDistribution(BaseModel):
+    """Distributions of score, distance and duration over all game sessions"""
+    relative_accuracy: float
+    score: MetricDistribution
+    distance: MetricDistribution
+    duration: MetricDistribution
+
+class RankInfo(BaseModel):
+    """Global rank of a score among all game sessions.
+
+    Exact with the default RANK_BUCKET_WIDTH of 1. Wider buckets, or scores
+    past RANK_MAX_BUCKETS, rank scores sharing a bucket as ties.
+    """
+    score: int
+    rank: int
+    total_sessions: int
+    percentile: float  # Share of sessions scoring at or below this score
+    player_name: Optional[str] = None
+
+class BatchRowResult(BaseModel):
+    """Outcome of one row of a batch upload"""
+    index: int
+    status: str  # "created", "invalid" or "failed"
+    id: Optional[int] = None
+    errors: List[str] = []
+
+class BatchIngestResult(BaseModel):
+    """Outcome of a batch upload"""
+    created: int
+    invalid: int
+    failed: int
+    truncated: bool = False  # True if rows past BATCH_INGEST_MAX_ROWS were not read
+    results: List[BatchRowResult]
+
+class IngestMetrics(BaseModel):
+    """Session ingest queue metrics"""
+    running: bool
+    queue_depth: int
+    max_queue_depth: int
+    queue_capacity: int
+    batch_size: int
+    max_latency_ms: float
+    submitted: int
+    committed: int
+    failed: int
+    batches: int
+    average_batch_size: float
+    last_batch_size: int
+    last_flush_ms: float
+
+class ClientStateMetrics(BaseModel):
+    """Per-client game state store metrics"""
+    clients: int
+    peak_clients: int
+    created: int
+    evicted: int
+    record_bytes: int  # Fixed size of one state record
+    total_bytes: int  # Records plus the player name strings they hold
+    bytes_per_client: float
+    render_quality: Dict[str, int] = {}  # Open game pages per render quality tier
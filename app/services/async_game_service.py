@@ -0,0 +1,348 @@
+"""Async game service used by the API endpoints"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, func, desc, or_, and_
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date
+from app.core.database import AsyncWriteSessionLocal
+from app.models.game import GameSession, HighScore, GameStatsTotals, DailyPlayerRollup, ArchivedScoreCount
+from app.schemas.game import GameSessionCreate, GameStats, RankInfo, HighScorePage, LeaderboardWindow, PlayerDayStats, StatsDistribution
+from app.services.game_service import (
+    STATS_ROW_ID,
+    high_score_from_session,
+    change_feed_entry,
+    board_cutoff_statement,
+    evict_statement,
+    stats_update_statement,
+    stats_scan_statement,
+    rollup_stats_statement,
+    stats_values,
+    stats_mismatches,
+    stats_to_schema,
+    empty_stats,
+    index_committed_sessions,
+)
+from app.services.leaderboard import leaderboard
+from app.services.rank_index import rank_index
+from app.services.windowed_leaderboard import windowed_leaderboards, window_start, utc_now
+from app.services.distribution import session_distributions
+from app.services.unique_players import unique_players
+from app.services.retention import rollup_history_statement, raw_history_statement, merge_history
+from app.core.pagination import encode_cursor
+from app.core.response_cache import response_cache, STATS_TAG
+from app.core.logging import app_logger
+
+class AsyncGameService:
+    """AsyncSession counterpart of GameService.
+
+    Scripts and the CLI keep using the synchronous GameService; both share
+    the statements defined in app.services.game_service.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_game_session(self, session_data: GameSessionCreate) -> GameSession:
+        """Create a new game session"""
+        return (await self.create_game_sessions([session_data]))[0]
+
+    async def create_game_sessions(self, sessions_data: List[GameSessionCreate]) -> List[GameSession]:
+        """Create several game sessions, their stats and high scores in one transaction"""
+        try:
+            db_sessions = [GameSession(**data.model_dump()) for data in sessions_data]
+            self.db.add_all(db_sessions)
+            await self.db.flush()
+            await self._record_session_stats(db_sessions)
+
+            # Check which sessions are high scores, counting the ones queued in this batch
+            db_high_scores = []
+            for db_session in db_sessions:
+                if await self._qualifies(db_session.score, [h.score for h in db_high_scores]):
+                    db_high_score = high_score_from_session(db_session)
+                    self.db.add(db_high_score)
+                    db_high_scores.append(db_high_score)
+
+            await self.db.flush()
+            if db_high_scores:
+                await self._evict_high_scores()
+            self._announce("sessions", db_sessions, db_high_scores)
+            await self.db.commit()
+            index_committed_sessions(db_sessions, db_high_scores)
+
+            if len(db_sessions) == 1:
+                app_logger.info(f"Game session created: {db_sessions[0].id}")
+            else:
+                app_logger.info(
+                    f"Game sessions created: {len(db_sessions)} "
+                    f"({db_sessions[0].id}..{db_sessions[-1].id}), {len(db_high_scores)} high scores"
+                )
+            return db_sessions
+        except Exception as e:
+            app_logger.error(f"Error creating game sessions: {e}")
+            await self.db.rollback()
+            raise
+
+    async def bulk_create_game_sessions(self, sessions_data: List[GameSessionCreate]) -> List[GameSession]:
+        """Insert a chunk of sessions with executemany INSERTs and a single commit.
+
+        Returns transient GameSession objects carrying the generated ids,
+        without loading rows into the session's identity map.
+        """
+        try:
+            rows = [data.model_dump() for data in sessions_data]
+            result = await self.db.execute(
+                insert(GameSession).returning(
+                    GameSession.id, GameSession.created_at, sort_by_parameter_order=True
+                ),
+                rows
+            )
+            db_sessions = [
+                GameSession(id=session_id, created_at=created_at, **row)
+                for (session_id, created_at), row in zip(result.all(), rows)
+            ]
+            await self._record_session_stats(db_sessions)
+
+            # High scores are checked once for the whole chunk, best first, so
+            # every high score already picked ranks ahead of the next candidate
+            db_high_scores = []
+            for db_session in sorted(db_sessions, key=lambda s: s.score, reverse=True):
+                ahead = await self._count_high_scores_at_least(db_session.score) + len(db_high_scores)
+                if ahead >= leaderboard.size:
+                    break
+                db_high_scores.append(high_score_from_session(db_session))
+            if db_high_scores:
+                high_score_rows = [
+                    {
+                        "player_name": h.player_name,
+                        "score": h.score,
+                        "coins_collected": h.coins_collected,
+                        "distance": h.distance
+                    }
+                    for h in db_high_scores
+                ]
+                result = await self.db.execute(
+                    insert(HighScore).returning(
+                        HighScore.id, HighScore.created_at, sort_by_parameter_order=True
+                    ),
+                    high_score_rows
+                )
+                for db_high_score, (high_score_id, created_at) in zip(db_high_scores, result.all()):
+                    db_high_score.id = high_score_id
+                    db_high_score.created_at = created_at
+                await self._evict_high_scores()
+
+            self._announce("sessions", db_sessions, db_high_scores)
+            await self.db.commit()
+            index_committed_sessions(db_sessions, db_high_scores)
+            app_logger.info(
+                f"Bulk inserted {len(db_sessions)} game sessions, {len(db_high_scores)} high scores"
+            )
+            return db_sessions
+        except Exception as e:
+            app_logger.error(f"Error bulk inserting game sessions: {e}")
+            await self.db.rollback()
+            raise
+
+    def _announce(
+        self,
+        kind: str,
+        db_sessions: Iterable[GameSession] = (),
+        db_high_scores: Iterable[HighScore] = ()
+    ) -> None:
+        """Add a change feed row to the current transaction in multi-worker mode"""
+        entry = change_feed_entry(kind, db_sessions, db_high_scores)
+        if entry is not None:
+            self.db.add(entry)
+
+    async def _evict_high_scores(self) -> int:
+        """Delete high scores pushed off the board (caller commits); returns how many"""
+        cutoff = (await self.db.execute(board_cutoff_statement(leaderboard.size))).first()
+        if cutoff is None:
+            return 0
+        return (await self.db.execute(evict_statement(*cutoff))).rowcount
+
+    async def _count_high_scores_at_least(self, score: int) -> int:
+        """Number of stored high scores greater than or equal to ``score``"""
+        if leaderboard.is_warm:
+            return leaderboard.count_at_least(score)
+        stmt = select(func.count(HighScore.id)).where(HighScore.score >= score)
+        return (await self.db.execute(stmt)).scalar()
+
+    async def _qualifies(self, score: int, pending_scores: List[int]) -> bool:
+        """Check a score against the board plus high scores not yet committed"""
+        if leaderboard.is_warm:
+            return leaderboard.qualifies(score, pending_scores)
+        # Pending rows belong to this transaction and are autoflushed into the count
+        return await self.is_high_score(score)
+
+    async def get_high_scores(self, limit: int = 10) -> List[HighScore]:
+        """Get top high scores"""
+        try:
+            if leaderboard.is_warm:
+                return leaderboard.top(limit)
+            stmt = select(HighScore).order_by(desc(HighScore.score), HighScore.id).limit(limit)
+            result = await self.db.execute(stmt)
+            return result.scalars().all()
+        except Exception as e:
+            app_logger.error(f"Error getting high scores: {e}")
+            return []
+
+    async def get_high_score_page(self, limit: int, after: Optional[Tuple[int, int]] = None) -> HighScorePage:
+        """Get the leaderboard page following the ``(score, id)`` key ``after``"""
+        # Fetch one extra row to learn whether another page exists
+        if leaderboard.is_warm:
+            rows = leaderboard.page(after, limit + 1)
+        else:
+            stmt = select(HighScore).order_by(desc(HighScore.score), HighScore.id).limit(limit + 1)
+            if after is not None:
+                score, last_id = after
+                stmt = stmt.where(or_(
+                    HighScore.score < score,
+                    and_(HighScore.score == score, HighScore.id > last_id)
+                ))
+            rows = (await self.db.execute(stmt)).scalars().all()
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(items[-1].score, items[-1].id)
+        return HighScorePage(items=items, next_cursor=next_cursor)
+
+    async def is_high_score(self, score: int) -> bool:
+        """Check if score qualifies as a high score"""
+        try:
+            if leaderboard.is_warm:
+                return leaderboard.qualifies(score)
+            stmt = select(func.count(HighScore.id)).where(HighScore.score >= score)
+            count = (await self.db.execute(stmt)).scalar()
+            return count < leaderboard.size
+        except Exception as e:
+            app_logger.error(f"Error checking high score: {e}")
+            return False
+
+    async def get_window_high_scores(self, window: LeaderboardWindow, limit: int = 10) -> List[GameSession]:
+        """Get the best sessions of the current day, week or all time"""
+        try:
+            if windowed_leaderboards.is_warm and limit <= windowed_leaderboards.size:
+                return windowed_leaderboards.top(window, limit)
+            stmt = select(GameSession).order_by(desc(GameSession.score), GameSession.id).limit(limit)
+            if window != LeaderboardWindow.ALL_TIME:
+                stmt = stmt.where(GameSession.created_at >= window_start(window, utc_now()))
+            return (await self.db.execute(stmt)).scalars().all()
+        except Exception as e:
+            app_logger.error(f"Error getting {window.value} high scores: {e}")
+            return []
+
+    async def get_score_rank(self, score: int, player_name: Optional[str] = None) -> RankInfo:
+        """Rank a score among all sessions"""
+        if rank_index.is_warm:
+            above, total = rank_index.count_above(score), rank_index.total
+        else:
+            # Rolled-up sessions still count towards ranks
+            above = (await self.db.execute(
+                select(func.count(GameSession.id)).where(GameSession.score > score)
+            )).scalar() + (await self.db.execute(
+                select(func.coalesce(func.sum(ArchivedScoreCount.sessions), 0))
+                .where(ArchivedScoreCount.score > score)
+            )).scalar()
+            total = (await self.db.execute(select(func.count(GameSession.id)))).scalar() + (await self.db.execute(
+                select(func.coalesce(func.sum(ArchivedScoreCount.sessions), 0))
+            )).scalar()
+        return RankInfo(
+            score=score,
+            rank=above + 1,
+            total_sessions=total,
+            percentile=(total - above) / total * 100 if total else 100.0,
+            player_name=player_name
+        )
+
+    async def get_player_rank(self, player_name: str) -> Optional[RankInfo]:
+        """Rank of a player's best session, or None if they have not played"""
+        if rank_index.is_warm:
+            best = rank_index.player_best(player_name)
+        else:
+            bests = [
+                (await self.db.execute(
+                    select(func.max(GameSession.score)).where(GameSession.player_name == player_name)
+                )).scalar(),
+                (await self.db.execute(
+                    select(func.max(DailyPlayerRollup.best_score)).where(DailyPlayerRollup.player_name == player_name)
+                )).scalar()
+            ]
+            best = max((b for b in bests if b is not None), default=None)
+        if best is None:
+            return None
+        return await self.get_score_rank(best, player_name)
+
+    async def get_stats_distribution(self) -> StatsDistribution:
+        """Percentiles and histograms of score, distance and duration"""
+        if not session_distributions.is_warm:
+            await self.db.run_sync(session_distributions.warm)
+        return session_distributions.summary()
+
+    async def get_player_history(self, player_name: str, since: date) -> List[PlayerDayStats]:
+        """Daily totals for a player from ``since``, newest first"""
+        try:
+            rollups = (await self.db.execute(rollup_history_statement(player_name, since))).scalars().all()
+            raw_days = (await self.db.execute(raw_history_statement(player_name, since))).all()
+            return merge_history(rollups, raw_days)
+        except Exception as e:
+            app_logger.error(f"Error getting history for {player_name}: {e}")
+            raise
+
+    async def _record_session_stats(self, db_sessions: List[GameSession]) -> None:
+        """Fold flushed sessions into the running aggregates (caller commits)"""
+        result = await self.db.execute(stats_update_statement(db_sessions))
+        if result.rowcount == 0:
+            await self._write_stats_row(await self._compute_stats())
+
+    async def _compute_stats(self) -> Dict[str, float]:
+        """Recompute the aggregates from the retention rollups plus one scan of game_sessions"""
+        return stats_values(
+            (await self.db.execute(stats_scan_statement())).one(),
+            (await self.db.execute(rollup_stats_statement())).one()
+        )
+
+    async def _write_stats_row(self, values: Dict[str, float]) -> GameStatsTotals:
+        """Insert or overwrite the aggregates row (caller commits)"""
+        totals = await self.db.get(GameStatsTotals, STATS_ROW_ID)
+        if totals is None:
+            totals = GameStatsTotals(id=STATS_ROW_ID)
+            self.db.add(totals)
+        for field, value in values.items():
+            setattr(totals, field, value)
+        await self.db.flush()
+        return totals
+
+    async def rebuild_game_stats(self) -> GameStats:
+        """Recompute the running aggregates from scratch"""
+        try:
+            totals = await self._write_stats_row(await self._compute_stats())
+            self._announce("stats")
+            await self.db.commit()
+            response_cache.bump(STATS_TAG)
+            app_logger.info(f"Game stats rebuilt: {totals.total_games} sessions")
+            return stats_to_schema(totals)
+        except Exception as e:
+            app_logger.error(f"Error rebuilding game stats: {e}")
+            await self.db.rollback()
+            raise
+
+    async def verify_game_stats(self) -> Dict[str, Dict[str, float]]:
+        """Compare the running aggregates with a fresh scan; returns mismatches"""
+        expected = await self._compute_stats()
+        return stats_mismatches(expected, await self.db.get(GameStatsTotals, STATS_ROW_ID))
+
+    async def get_game_stats(self) -> GameStats:
+        """Get overall game statistics"""
+        try:
+            if not unique_players.is_warm:
+                await self.db.run_sync(unique_players.warm)
+            totals = await self.db.get(GameStatsTotals, STATS_ROW_ID)
+            if totals is None:
+                # Seeded at startup; if it went missing, rebuild through the
+                # writer rather than writing on this (read) session
+                async with AsyncWriteSessionLocal() as write_db:
+                    return await AsyncGameService(write_db).rebuild_game_stats()
+            return stats_to_schema(totals)
+        except Exception as e:
+            app_logger.error(f"Error getting game stats: {e}")
+            return empty_stats()
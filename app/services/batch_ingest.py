@@ -0,0 +1,107 @@
+"""Batch (JSON array or streamed NDJSON) ingestion of game sessions"""
+import json
+from typing import Any, AsyncIterator, Iterable, List, Tuple
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.database import AsyncWriteSessionLocal
+from app.schemas.game import GameSessionCreate, BatchRowResult, BatchIngestResult
+from app.services.async_game_service import AsyncGameService
+from app.core.logging import app_logger
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+async def iter_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield non-blank lines of an NDJSON body as they arrive"""
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+def parse_json_array(body: bytes) -> List[Any]:
+    """Decode a JSON array body; raises ValueError for anything else"""
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of game sessions")
+    return rows
+
+async def iter_rows(rows: Iterable[Any]) -> AsyncIterator[Any]:
+    for row in rows:
+        yield row
+
+def _format_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e['loc'] else e['msg']
+        for e in error.errors()
+    ]
+
+class BatchIngestor:
+    """Validate rows one at a time and store them in chunked transactions.
+
+    Rows may be raw JSON text (NDJSON lines) or decoded objects. Each chunk
+    is one executemany INSERT and one commit, with stats and high scores
+    updated once per chunk.
+    """
+
+    def __init__(self, chunk_size: int, max_rows: int):
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
+
+    async def ingest(self, rows: AsyncIterator[Any]) -> BatchIngestResult:
+        results: List[BatchRowResult] = []
+        chunk: List[Tuple[int, GameSessionCreate]] = []
+        truncated = False
+        index = 0
+        async for row in rows:
+            if index >= self.max_rows:
+                truncated = True
+                break
+            try:
+                if isinstance(row, (bytes, str)):
+                    session_data = GameSessionCreate.model_validate_json(row)
+                else:
+                    session_data = GameSessionCreate.model_validate(row)
+                chunk.append((index, session_data))
+            except ValidationError as e:
+                results.append(BatchRowResult(index=index, status="invalid", errors=_format_errors(e)))
+            index += 1
+            if len(chunk) >= self.chunk_size:
+                results.extend(await self._flush(chunk))
+                chunk = []
+        if chunk:
+            results.extend(await self._flush(chunk))
+
+        results.sort(key=lambda r: r.index)
+        counts = {status: 0 for status in ("created", "invalid", "failed")}
+        for result in results:
+            counts[result.status] += 1
+        app_logger.info(
+            f"Batch ingest: {counts['created']} created, {counts['invalid']} invalid, "
+            f"{counts['failed']} failed{' (truncated)' if truncated else ''}"
+        )
+        return BatchIngestResult(**counts, truncated=truncated, results=results)
+
+    async def _flush(self, chunk: List[Tuple[int, GameSessionCreate]]) -> List[BatchRowResult]:
+        try:
+            async with AsyncWriteSessionLocal() as db:
+                db_sessions = await AsyncGameService(db).bulk_create_game_sessions(
+                    [session_data for _, session_data in chunk]
+                )
+        except Exception as e:
+            return [
+                BatchRowResult(index=index, status="failed", errors=[str(e)])
+                for index, _ in chunk
+            ]
+        return [
+            BatchRowResult(index=index, status="created", id=db_session.id)
+            for (index, _), db_session in zip(chunk, db_sessions)
+        ]
+
+batch_ingestor = BatchIngestor(
+    chunk_size=settings.BATCH_INGEST_CHUNK_SIZE,
+    max_rows=settings.BATCH_INGEST_MAX_ROWS
+)
@@ -0,0 +1,133 @@
+"""Change feed tailing: keeps every worker's in-memory state coherent"""
+import asyncio
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, AsyncWriteSessionLocal, begin_read_snapshot
+from app.core.response_cache import response_cache, HIGH_SCORES_TAG, STATS_TAG, WINDOWS_TAG
+from app.core.workers import is_primary_worker, multi_worker_enabled, worker_id
+from app.models.game import ChangeFeedEntry, GameSession, HighScore
+from app.services.game_service import decode_id_runs, index_committed_sessions, warm_indexes
+from app.services.windowed_leaderboard import utc_now
+from app.core.logging import app_logger
+
+class ChangeFeedTailer:
+    """Polls change_feed and applies other workers' commits locally.
+
+    Writers append a feed row in the same transaction as their change, so
+    a worker that has applied everything up to ``cursor`` holds the same
+    leaderboards, rank index, sketches and cache versions as the database.
+    A worker that falls behind the pruned part of the feed re-warms.
+    """
+
+    def __init__(self, poll_interval: float, retention: float):
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def mark(self, db: Session) -> None:
+        """Record the feed position; call in the same read snapshot that warms the indexes"""
+        self.cursor = db.execute(select(func.coalesce(func.max(ChangeFeedEntry.id), 0))).scalar_one()
+
+    def warm(self, db: Session) -> None:
+        """Warm the in-memory indexes and the cursor from one read snapshot.
+
+        ``db`` must not have run a statement yet. Without the snapshot, an
+        entry committed between the two reads would be both in the indexes
+        and past the cursor, and applied twice.
+        """
+        begin_read_snapshot(db)
+        self.mark(db)
+        warm_indexes(db)
+
+    async def start(self) -> None:
+        """Start tailing on the running event loop (multi-worker mode only)"""
+        if self._task is None and multi_worker_enabled():
+            self._task = asyncio.create_task(self._run(), name="change-feed-tailer")
+            app_logger.info(f"Tailing the change feed from entry {self.cursor}")
+
+    async def stop(self) -> None:
+        """Stop tailing"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def poll(self) -> int:
+        """Apply new feed entries; returns how many were read"""
+        async with AsyncSessionLocal() as db:
+            entries = (await db.execute(
+                select(ChangeFeedEntry).where(ChangeFeedEntry.id > self.cursor).order_by(ChangeFeedEntry.id)
+            )).scalars().all()
+            if not entries:
+                return 0
+            oldest = (await db.execute(select(func.min(ChangeFeedEntry.id)))).scalar_one()
+            # Entries we never saw were pruned: start over from the database
+            rewarm = oldest > self.cursor + 1
+            if rewarm:
+                app_logger.warning("Change feed gap, re-warming in-memory state")
+            else:
+                me = worker_id()
+                for entry in entries:
+                    if entry.origin != me and entry.kind == "reload":
+                        # Re-warming also moves the cursor past whatever follows
+                        rewarm = True
+                        break
+                    if entry.origin != me:
+                        await self._apply(db, entry)
+                    self.cursor = entry.id
+        if rewarm:
+            await self._rewarm()
+        return len(entries)
+
+    async def _rewarm(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(self.warm)
+        response_cache.bump(HIGH_SCORES_TAG, STATS_TAG, WINDOWS_TAG)
+
+    async def _apply(self, db, entry: ChangeFeedEntry) -> None:
+        if entry.kind == "stats":
+            response_cache.bump(STATS_TAG)
+        else:
+            session_ids = decode_id_runs(entry.session_ids)
+            high_score_ids = decode_id_runs(entry.high_score_ids)
+            db_sessions = (await db.execute(
+                select(GameSession).where(GameSession.id.in_(session_ids)).order_by(GameSession.id)
+            )).scalars().all() if session_ids else []
+            # High scores evicted since are skipped; the local board trims itself the same way
+            db_high_scores = (await db.execute(
+                select(HighScore).where(HighScore.id.in_(high_score_ids)).order_by(HighScore.id)
+            )).scalars().all() if high_score_ids else []
+            index_committed_sessions(db_sessions, db_high_scores)
+
+    async def prune(self) -> None:
+        """Delete entries every worker has had time to read (primary worker only)"""
+        cutoff = utc_now() - timedelta(seconds=self.retention)
+        async with AsyncWriteSessionLocal() as db:
+            await db.execute(delete(ChangeFeedEntry).where(ChangeFeedEntry.created_at < cutoff))
+            await db.commit()
+
+    async def _run(self) -> None:
+        last_prune = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self.poll()
+                if is_primary_worker() and loop.time() - last_prune > self.retention / 2:
+                    await self.prune()
+                    last_prune = loop.time()
+            except Exception as e:
+                app_logger.error(f"Change feed poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+change_feed_tailer = ChangeFeedTailer(
+    poll_interval=settings.CHANGE_FEED_POLL_MS / 1000,
+    retention=settings.CHANGE_FEED_RETENTION_S
+)
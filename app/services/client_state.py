@@ -0,0 +1,121 @@
+"""Game state of each connected browser tab"""
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.schemas.game import ClientStateMetrics
+
+class ClientGameState:
+    """State of one game page; ``__slots__`` keeps every record the same small size"""
+
+    __slots__ = (
+        "client_id", "player_name", "score", "coins", "distance",
+        "is_playing", "is_paused", "labels", "render_quality", "connected_at"
+    )
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+        self.player_name = "Anonymous"
+        self.labels: Optional[Tuple] = None  # (score, coins, distance) labels of this tab's page
+        self.render_quality: Optional[str] = None  # Tier the game client picked for its frame budget
+        self.connected_at = time.time()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a new run, keeping the player name"""
+        self.score = 0
+        self.coins = 0
+        self.distance = 0.0
+        self.is_playing = False
+        self.is_paused = False
+
+class ClientStateStore:
+    """Game state keyed by NiceGUI client id.
+
+    Each browser tab gets its own record, so concurrent players no longer
+    share one score or one set of labels. Records are evicted once their
+    client is gone, keeping memory proportional to the open tabs. States
+    changed by the game client are queued so their labels can be updated
+    in batches.
+    """
+
+    def __init__(self):
+        self._states: Dict[str, ClientGameState] = {}
+        self._dirty: Dict[str, ClientGameState] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._evicted = 0
+        self._peak = 0
+
+    def get(self, client_id: str) -> ClientGameState:
+        """State of ``client_id``, created on first use"""
+        with self._lock:
+            state = self._states.get(client_id)
+            if state is None:
+                state = self._states[client_id] = ClientGameState(client_id)
+                self._created += 1
+                self._peak = max(self._peak, len(self._states))
+            return state
+
+    def evict(self, client_id: str) -> bool:
+        """Drop the state of ``client_id``; returns whether there was any"""
+        with self._lock:
+            self._dirty.pop(client_id, None)
+            if self._states.pop(client_id, None) is None:
+                return False
+            self._evicted += 1
+            return True
+
+    def retain(self, client_ids: Iterable[str]) -> int:
+        """Evict every client not in ``client_ids``; returns how many"""
+        live = set(client_ids)
+        with self._lock:
+            gone = [client_id for client_id in self._states if client_id not in live]
+            for client_id in gone:
+                del self._states[client_id]
+                self._dirty.pop(client_id, None)
+            self._evicted += len(gone)
+            return len(gone)
+
+    def mark_dirty(self, state: ClientGameState) -> None:
+        """Queue ``state`` for the next label update"""
+        with self._lock:
+            if state.client_id in self._states:
+                self._dirty[state.client_id] = state
+
+    def take_dirty(self) -> List[ClientGameState]:
+        """States changed since the last call"""
+        with self._lock:
+            dirty = list(self._dirty.values())
+            self._dirty.clear()
+            return dirty
+
+    def metrics(self) -> ClientStateMetrics:
+        """Client counts and approximate memory held by the records"""
+        with self._lock:
+            states = list(self._states.values())
+            created, evicted, peak = self._created, self._evicted, self._peak
+        record_bytes = sys.getsizeof(ClientGameState(""))
+        render_quality: Dict[str, int] = {}
+        for state in states:
+            if state.render_quality is not None:
+                render_quality[state.render_quality] = render_quality.get(state.render_quality, 0) + 1
+        total_bytes = sum(
+            sys.getsizeof(state) + sys.getsizeof(state.client_id) + sys.getsizeof(state.player_name)
+            for state in states
+        )
+        return ClientStateMetrics(
+            clients=len(states),
+            peak_clients=peak,
+            created=created,
+            evicted=evicted,
+            record_bytes=record_bytes,
+            total_bytes=total_bytes,
+            bytes_per_client=total_bytes / len(states) if states else 0.0,
+            render_quality=render_quality
+        )
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+client_states = ClientStateStore()
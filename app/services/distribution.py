@@ -0,0 +1,136 @@
+"""Score, distance and duration distributions kept as in-memory sketches"""
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.game import GameSession, ArchivedScoreCount
+from app.schemas.game import HistogramBucket, MetricDistribution, StatsDistribution
+from app.services.sketches import QuantileSketch, FixedHistogram
+from app.services.sketch_store import SketchStore, sketch_persister
+from app.core.logging import app_logger
+
+METRICS = ("score", "distance", "duration")
+
+class SessionDistributions(SketchStore):
+    """Quantile sketch and fixed histogram per metric, fed by committed sessions.
+
+    Memory is bounded by the sketch and histogram sizes, not by the number
+    of sessions.
+    """
+
+    name = "session_distributions"
+
+    def __init__(self, relative_accuracy: float, max_bins: int, buckets: int, widths: Dict[str, float]):
+        super().__init__()
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.buckets = buckets
+        self.widths = widths
+        self._metrics = self._empty()
+        self._summary: Optional[StatsDistribution] = None
+
+    def _empty(self) -> Dict[str, Tuple[QuantileSketch, FixedHistogram]]:
+        return {
+            name: (
+                QuantileSketch(self.relative_accuracy, self.max_bins),
+                FixedHistogram(self.widths[name], self.buckets)
+            )
+            for name in METRICS
+        }
+
+    def add(self, db_session: GameSession) -> None:
+        """Record one committed session"""
+        with self._lock:
+            if not self._include(db_session.id):
+                return
+            for name, (sketch, histogram) in self._metrics.items():
+                value = getattr(db_session, name)
+                sketch.add(value)
+                histogram.add(value)
+            self._dirty = True
+            self._summary = None
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            name: {"sketch": sketch.to_dict(), "histogram": histogram.to_dict()}
+            for name, (sketch, histogram) in self._metrics.items()
+        }
+
+    def _load(self, state: Dict) -> Dict[str, Tuple[QuantileSketch, FixedHistogram]]:
+        metrics = self._empty()
+        for name, (sketch, histogram) in metrics.items():
+            saved = state.get(name)
+            # Settings changed since the save: start that metric over
+            if saved is None or saved["sketch"]["relative_accuracy"] != self.relative_accuracy:
+                continue
+            sketch.merge(QuantileSketch.from_dict(saved["sketch"], self.max_bins))
+            try:
+                histogram.merge(FixedHistogram.from_dict(saved["histogram"]))
+            except ValueError:
+                pass
+        return metrics
+
+    def warm(self, db: Session) -> None:
+        """Load the saved state and replay game sessions stored after it"""
+        saved, through_id, ahead = self._saved(db)
+        if saved is not None:
+            metrics = self._load(saved)
+        else:
+            metrics = self._empty()
+            # First build: scores of rolled-up sessions are still known per score
+            sketch, histogram = metrics["score"]
+            for score, count in db.execute(select(ArchivedScoreCount.score, ArchivedScoreCount.sessions)):
+                sketch.add(score, count)
+                histogram.add(score, count)
+        columns = (GameSession.score, GameSession.distance, GameSession.duration)
+        last_id = replayed = 0
+        for row in self._replay(db, columns, through_id, ahead):
+            for name, (sketch, histogram) in metrics.items():
+                sketch.add(getattr(row, name))
+                histogram.add(getattr(row, name))
+            last_id = row.id
+            replayed += 1
+        with self._lock:
+            self._metrics = metrics
+            self._summary = None
+            self._warmed(through_id, ahead, last_id, replayed, saved is not None)
+        app_logger.info(f"Session distributions warmed ({replayed} sessions replayed)")
+
+    def summary(self) -> StatsDistribution:
+        """Percentiles and histograms of every metric, recomputed only after new sessions"""
+        with self._lock:
+            if self._summary is not None:
+                return self._summary
+            metrics = {}
+            for name, (sketch, histogram) in self._metrics.items():
+                width = histogram.bucket_width
+                metrics[name] = MetricDistribution(
+                    count=sketch.count,
+                    min=sketch.min,
+                    max=sketch.max,
+                    p50=sketch.quantile(0.5),
+                    p90=sketch.quantile(0.9),
+                    p99=sketch.quantile(0.99),
+                    histogram=[
+                        HistogramBucket(
+                            lower=i * width,
+                            upper=(i + 1) * width if i < len(histogram.counts) - 1 else None,
+                            count=count
+                        )
+                        for i, count in enumerate(histogram.counts)
+                    ]
+                )
+            self._summary = StatsDistribution(relative_accuracy=self.relative_accuracy, **metrics)
+            return self._summary
+
+session_distributions = SessionDistributions(
+    relative_accuracy=settings.DISTRIBUTION_RELATIVE_ACCURACY,
+    max_bins=settings.DISTRIBUTION_MAX_BINS,
+    buckets=settings.HISTOGRAM_BUCKETS,
+    widths={
+        "score": settings.SCORE_HISTOGRAM_WIDTH,
+        "distance": settings.DISTANCE_HISTOGRAM_WIDTH,
+        "duration": settings.DURATION_HISTOGRAM_WIDTH,
+    }
+)
+sketch_persister.register(session_distributions)
@@ -0,0 +1,138 @@
+"""Streaming export of game_sessions as NDJSON or CSV, optionally gzipped"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, BinaryIO, Iterable, Optional, Sequence
+from sqlalchemy import Select, select, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.game import GameSession
+from app.schemas.game import ExportFormat
+from app.services.windowed_leaderboard import as_naive_utc
+from app.core.logging import app_logger
+
+EXPORT_COLUMNS = ("id", "player_name", "score", "coins_collected", "distance", "duration", "created_at")
+MEDIA_TYPES = {ExportFormat.NDJSON: "application/x-ndjson", ExportFormat.CSV: "text/csv"}
+
+class ExportRange:
+    """Rows to export: ``after_id < id <= until_id`` within ``[start, end)``.
+
+    Rows are read in id order, so an interrupted export resumes with
+    ``after_id`` set to the last id received and the same ``until_id``.
+    """
+
+    def __init__(
+        self,
+        after_id: int = 0,
+        until_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ):
+        self.after_id = after_id
+        self.until_id = until_id
+        # created_at is stored as naive UTC
+        self.start = as_naive_utc(start) if start is not None else None
+        self.end = as_naive_utc(end) if end is not None else None
+
+    def statement(self, after_id: int, limit: int) -> Select:
+        """One keyset page of the range, starting after ``after_id``"""
+        table = GameSession.__table__
+        stmt = select(*(table.c[name] for name in EXPORT_COLUMNS)).where(table.c.id > after_id)
+        if self.until_id is not None:
+            stmt = stmt.where(table.c.id <= self.until_id)
+        if self.start is not None:
+            stmt = stmt.where(table.c.created_at >= self.start)
+        if self.end is not None:
+            stmt = stmt.where(table.c.created_at < self.end)
+        return stmt.order_by(table.c.id).limit(limit).execution_options(yield_per=settings.EXPORT_YIELD_PER)
+
+def last_session_id_statement() -> Select:
+    """Highest game session id, used to pin an export to a fixed set of rows"""
+    return select(func.coalesce(func.max(GameSession.id), 0))
+
+class ExportEncoder:
+    """Turns batches of rows into output bytes, compressing them if asked"""
+
+    def __init__(self, export_format: ExportFormat, compress: bool = False):
+        self.export_format = export_format
+        # wbits=31 writes a gzip container, so the output is a plain .gz file
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def _output(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) if self._compressor else data
+
+    def header(self) -> bytes:
+        if self.export_format == ExportFormat.CSV:
+            return self._output((",".join(EXPORT_COLUMNS) + "\r\n").encode())
+        return b""
+
+    def encode(self, rows: Iterable[Sequence]) -> bytes:
+        if self.export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+            return self._output(buffer.getvalue().encode())
+        lines = [
+            json.dumps(
+                {name: value.isoformat() if isinstance(value, datetime) else value
+                 for name, value in zip(EXPORT_COLUMNS, row)},
+                separators=(",", ":")
+            )
+            for row in rows
+        ]
+        return self._output(("\n".join(lines) + "\n").encode()) if lines else b""
+
+    def finish(self) -> bytes:
+        return self._compressor.flush() if self._compressor else b""
+
+async def stream_export(export_range: ExportRange, encoder: ExportEncoder) -> AsyncIterator[bytes]:
+    """Yield the export in chunks, one keyset page per short read transaction.
+
+    Each page is fetched ``EXPORT_YIELD_PER`` rows at a time through a
+    server-side cursor and its connection goes back to the pool before the
+    page is sent, so memory stays flat and writers are never held up by a
+    long-running read.
+    """
+    yield encoder.header()
+    after_id = export_range.after_id
+    exported = 0
+    while True:
+        page_rows = 0
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(export_range.statement(after_id, settings.EXPORT_PAGE_SIZE))
+            chunks = []
+            async for partition in result.partitions():
+                chunks.append(encoder.encode(partition))
+                page_rows += len(partition)
+                after_id = partition[-1][0]
+        for chunk in chunks:
+            if chunk:
+                yield chunk
+        exported += page_rows
+        if page_rows < settings.EXPORT_PAGE_SIZE:
+            break
+    yield encoder.finish()
+    app_logger.info(f"Exported {exported} game sessions up to id {after_id}")
+
+def write_export(db: Session, export_range: ExportRange, encoder: ExportEncoder, output: BinaryIO) -> int:
+    """Write the export to a file; returns the number of rows written"""
+    output.write(encoder.header())
+    after_id = export_range.after_id
+    exported = 0
+    while True:
+        page_rows = 0
+        for partition in db.execute(export_range.statement(after_id, settings.EXPORT_PAGE_SIZE)).partitions():
+            output.write(encoder.encode(partition))
+            page_rows += len(partition)
+            after_id = partition[-1][0]
+        # End the read transaction between pages
+        db.commit()
+        exported += page_rows
+        if page_rows < settings.EXPORT_PAGE_SIZE:
+            break
+    output.write(encoder.finish())
+    return exported
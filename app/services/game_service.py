@@ -1,11 +1,184 @@
 """Game service for business logic"""
+import json
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, desc
-from typing import List, Optional
-from app.models.game import GameSession, HighScore
+from sqlalchemy import select, update, delete, func, desc, case, or_, and_, Row, Select, Update, Delete
+from typing import Dict, Iterable, List, Optional
+from app.core.workers import multi_worker_enabled, worker_id
+from app.models.game import GameSession, HighScore, GameStatsTotals, DailyPlayerRollup, ChangeFeedEntry
 from app.schemas.game import GameSessionCreate, HighScoreCreate, GameStats
+from app.services.leaderboard import leaderboard
+from app.services.leaderboard_hub import leaderboard_hub
+from app.services.rank_index import rank_index
+from app.services.windowed_leaderboard import windowed_leaderboards
+from app.services.distribution import session_distributions
+from app.services.unique_players import unique_players
+from app.core.response_cache import response_cache, HIGH_SCORES_TAG, STATS_TAG, WINDOWS_TAG
 from app.core.logging import app_logger
 
+STATS_ROW_ID = 1
+
+def high_score_from_session(db_session: GameSession) -> HighScore:
+    """Build the high score row for a stored game session"""
+    return HighScore(
+        player_name=db_session.player_name,
+        score=db_session.score,
+        coins_collected=db_session.coins_collected,
+        distance=db_session.distance
+    )
+
+def board_cutoff_statement(size: int) -> Select:
+    """SELECT the (score, id) of the last high score that stays on the board"""
+    return (
+        select(HighScore.score, HighScore.id)
+        .order_by(desc(HighScore.score), HighScore.id)
+        .offset(size - 1)
+        .limit(1)
+    )
+
+def evict_statement(score: int, high_score_id: int) -> Delete:
+    """DELETE every high score ranked below ``(score, high_score_id)``"""
+    return (
+        delete(HighScore)
+        .where(or_(
+            HighScore.score < score,
+            and_(HighScore.score == score, HighScore.id > high_score_id)
+        ))
+        .execution_options(synchronize_session=False)
+    )
+
+def encode_id_runs(ids: Iterable[int]) -> str:
+    """Compact JSON of ids as [first, last] runs of consecutive values"""
+    runs: List[List[int]] = []
+    for id_ in sorted(ids):
+        if runs and id_ == runs[-1][1] + 1:
+            runs[-1][1] = id_
+        else:
+            runs.append([id_, id_])
+    return json.dumps(runs, separators=(",", ":"))
+
+def decode_id_runs(data: str) -> List[int]:
+    return [id_ for first, last in json.loads(data) for id_ in range(first, last + 1)]
+
+def change_feed_entry(
+    kind: str,
+    db_sessions: Iterable[GameSession] = (),
+    db_high_scores: Iterable[HighScore] = ()
+) -> Optional[ChangeFeedEntry]:
+    """Feed row announcing a commit to the other workers (None in single-worker mode)"""
+    if not multi_worker_enabled():
+        return None
+    return ChangeFeedEntry(
+        origin=worker_id(),
+        kind=kind,
+        session_ids=encode_id_runs(s.id for s in db_sessions),
+        high_score_ids=encode_id_runs(h.id for h in db_high_scores)
+    )
+
+def stats_update_statement(db_sessions: List[GameSession]) -> Update:
+    """UPDATE folding a batch of sessions into the running aggregates row"""
+    batch_best = max(s.score for s in db_sessions)
+    return (
+        update(GameStatsTotals)
+        .where(GameStatsTotals.id == STATS_ROW_ID)
+        .values(
+            total_games=GameStatsTotals.total_games + len(db_sessions),
+            total_score=GameStatsTotals.total_score + sum(s.score for s in db_sessions),
+            total_coins=GameStatsTotals.total_coins + sum(s.coins_collected for s in db_sessions),
+            total_distance=GameStatsTotals.total_distance + sum(s.distance for s in db_sessions),
+            best_score=case(
+                (GameStatsTotals.best_score < batch_best, batch_best),
+                else_=GameStatsTotals.best_score
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def stats_scan_statement() -> Select:
+    """SELECT computing every aggregate over game_sessions in one scan"""
+    return select(
+        func.count(GameSession.id),
+        func.sum(GameSession.score),
+        func.sum(GameSession.coins_collected),
+        func.sum(GameSession.distance),
+        func.max(GameSession.score)
+    )
+
+def rollup_stats_statement() -> Select:
+    """SELECT computing the same aggregates over the retention rollups"""
+    return select(
+        func.sum(DailyPlayerRollup.games),
+        func.sum(DailyPlayerRollup.total_score),
+        func.sum(DailyPlayerRollup.total_coins),
+        func.sum(DailyPlayerRollup.total_distance),
+        func.max(DailyPlayerRollup.best_score)
+    )
+
+def stats_values(*rows: Row) -> Dict[str, float]:
+    """Map stats_scan_statement() / rollup_stats_statement() rows onto GameStatsTotals fields"""
+    return {
+        'total_games': sum(row[0] or 0 for row in rows),
+        'total_score': sum(row[1] or 0 for row in rows),
+        'total_coins': sum(row[2] or 0 for row in rows),
+        'total_distance': sum(row[3] or 0.0 for row in rows),
+        'best_score': max((row[4] or 0 for row in rows), default=0)
+    }
+
+def stats_mismatches(expected: Dict[str, float], totals: Optional[GameStatsTotals]) -> Dict[str, Dict[str, float]]:
+    """Fields where the stored aggregates differ from a fresh scan"""
+    mismatches = {}
+    for field, value in expected.items():
+        actual = getattr(totals, field) if totals is not None else None
+        if actual is None or abs(actual - value) > 1e-6 * max(1.0, abs(value)):
+            mismatches[field] = {'expected': value, 'actual': actual}
+    return mismatches
+
+def stats_to_schema(totals: GameStatsTotals) -> GameStats:
+    """Convert the aggregates row to the API schema"""
+    return GameStats(
+        total_games=totals.total_games,
+        total_score=totals.total_score,
+        total_coins=totals.total_coins,
+        average_score=totals.total_score / totals.total_games if totals.total_games > 0 else 0.0,
+        best_score=totals.best_score,
+        total_distance=totals.total_distance,
+        **unique_players.counts()
+    )
+
+def index_committed_sessions(db_sessions: List[GameSession], db_high_scores: List[HighScore]) -> None:
+    """Feed committed rows into the in-memory indexes and invalidate cached responses"""
+    for db_high_score in db_high_scores:
+        leaderboard.add(db_high_score)
+    for db_session in db_sessions:
+        rank_index.add(db_session.player_name, db_session.score)
+        windowed_leaderboards.add(db_session)
+        session_distributions.add(db_session)
+        unique_players.add(db_session)
+    response_cache.bump(STATS_TAG, WINDOWS_TAG)
+    if db_high_scores:
+        # Refresh the read model before the cache tag so no stale board is cached
+        leaderboard_hub.publish()
+        response_cache.bump(HIGH_SCORES_TAG)
+
+def warm_indexes(db: Session) -> None:
+    """Load the in-memory indexes from the database"""
+    leaderboard.warm(db)
+    leaderboard_hub.publish()
+    rank_index.warm(db)
+    windowed_leaderboards.warm(db)
+    session_distributions.warm(db)
+    unique_players.warm(db)
+
+def empty_stats() -> GameStats:
+    """Stats returned when the aggregates cannot be read"""
+    return GameStats(
+        total_games=0,
+        total_score=0,
+        total_coins=0,
+        average_score=0.0,
+        best_score=0,
+        total_distance=0.0
+    )
+
 class GameService:
     """Service layer for game operations"""
     
@@ -14,35 +187,66 @@ class GameService:
     
     def create_game_session(self, session_data: GameSessionCreate) -> GameSession:
         """Create a new game session"""
+        return self.create_game_sessions([session_data])[0]
+    
+    def create_game_sessions(self, sessions_data: List[GameSessionCreate]) -> List[GameSession]:
+        """Create several game sessions, their stats and high scores in one transaction"""
         try:
-            db_session = GameSession(**session_data.model_dump())
-            self.db.add(db_session)
-            self.db.commit()
-            self.db.refresh(db_session)
+            db_sessions = [GameSession(**data.model_dump()) for data in sessions_data]
+            self.db.add_all(db_sessions)
+            self.db.flush()
+            self._record_session_stats(db_sessions)
+            
+            # Check which sessions are high scores, counting the ones queued in this batch
+            db_high_scores = []
+            for db_session in db_sessions:
+                if self._qualifies(db_session.score, [h.score for h in db_high_scores]):
+                    db_high_score = high_score_from_session(db_session)
+                    self.db.add(db_high_score)
+                    db_high_scores.append(db_high_score)
             
-            # Check if this is a high score
-            if self.is_high_score(session_data.score):
-                self.create_high_score(HighScoreCreate(
-                    player_name=session_data.player_name,
-                    score=session_data.score,
-                    coins_collected=session_data.coins_collected,
-                    distance=session_data.distance
-                ))
+            self.db.flush()
+            if db_high_scores:
+                self._evict_high_scores()
+            self._announce("sessions", db_sessions, db_high_scores)
+            self.db.commit()
+            index_committed_sessions(db_sessions, db_high_scores)
             
-            app_logger.info(f"Game session created: {db_session.id}")
-            return db_session
+            if len(db_sessions) == 1:
+                app_logger.info(f"Game session created: {db_sessions[0].id}")
+            else:
+                app_logger.info(
+                    f"Game sessions created: {len(db_sessions)} "
+                    f"({db_sessions[0].id}..{db_sessions[-1].id}), {len(db_high_scores)} high scores"
+                )
+            return db_sessions
         except Exception as e:
-            app_logger.error(f"Error creating game session: {e}")
+            app_logger.error(f"Error creating game sessions: {e}")
             self.db.rollback()
             raise
     
+    def _qualifies(self, score: int, pending_scores: List[int]) -> bool:
+        """Check a score against the board plus high scores not yet committed"""
+        if leaderboard.is_warm:
+            return leaderboard.qualifies(score, pending_scores)
+        # Pending rows belong to this transaction and are autoflushed into the count
+        return self.is_high_score(score)
+    
     def create_high_score(self, high_score_data: HighScoreCreate) -> HighScore:
         """Create a new high score entry"""
         try:
             db_high_score = HighScore(**high_score_data.model_dump())
             self.db.add(db_high_score)
-            self.db.commit()
+            self.db.flush()
             self.db.refresh(db_high_score)
+            self._evict_high_scores()
+            # Keep the loaded row even if the eviction just pushed it off the board
+            self.db.expunge(db_high_score)
+            self._announce("sessions", db_high_scores=[db_high_score])
+            self.db.commit()
+            leaderboard.add(db_high_score)
+            leaderboard_hub.publish()
+            response_cache.bump(HIGH_SCORES_TAG)
             app_logger.info(f"High score created: {db_high_score.id}")
             return db_high_score
         except Exception as e:
@@ -53,7 +257,9 @@ class GameService:
     def get_high_scores(self, limit: int = 10) -> List[HighScore]:
         """Get top high scores"""
         try:
-            stmt = select(HighScore).order_by(desc(HighScore.score)).limit(limit)
+            if leaderboard.is_warm:
+                return leaderboard.top(limit)
+            stmt = select(HighScore).order_by(desc(HighScore.score), HighScore.id).limit(limit)
             result = self.db.execute(stmt)
             return result.scalars().all()
         except Exception as e:
@@ -63,40 +269,107 @@ class GameService:
     def is_high_score(self, score: int) -> bool:
         """Check if score qualifies as a high score"""
         try:
+            if leaderboard.is_warm:
+                return leaderboard.qualifies(score)
             stmt = select(func.count(HighScore.id)).where(HighScore.score >= score)
             count = self.db.execute(stmt).scalar()
-            return count < 10  # Top 10 high scores
+            return count < leaderboard.size
         except Exception as e:
             app_logger.error(f"Error checking high score: {e}")
             return False
     
+    def _announce(
+        self,
+        kind: str,
+        db_sessions: Iterable[GameSession] = (),
+        db_high_scores: Iterable[HighScore] = ()
+    ) -> None:
+        """Add a change feed row to the current transaction in multi-worker mode"""
+        entry = change_feed_entry(kind, db_sessions, db_high_scores)
+        if entry is not None:
+            self.db.add(entry)
+    
+    def _evict_high_scores(self) -> int:
+        """Delete high scores pushed off the board (caller commits); returns how many"""
+        cutoff = self.db.execute(board_cutoff_statement(leaderboard.size)).first()
+        if cutoff is None:
+            return 0
+        return self.db.execute(evict_statement(*cutoff)).rowcount
+    
+    def compact_high_scores(self) -> int:
+        """Trim high_scores to the configured board size; returns rows removed"""
+        try:
+            removed = self._evict_high_scores()
+            self._announce("reload")
+            self.db.commit()
+            leaderboard.warm(self.db)
+            leaderboard_hub.publish()
+            response_cache.bump(HIGH_SCORES_TAG)
+            app_logger.info(f"High scores compacted: {removed} removed")
+            return removed
+        except Exception as e:
+            app_logger.error(f"Error compacting high scores: {e}")
+            self.db.rollback()
+            raise
+    
+    def _record_session_stats(self, db_sessions: List[GameSession]) -> None:
+        """Fold flushed sessions into the running aggregates (caller commits)"""
+        if self.db.execute(stats_update_statement(db_sessions)).rowcount == 0:
+            # Row missing (fresh or damaged database): seed it from the table,
+            # which already contains the flushed sessions.
+            self._write_stats_row(self._compute_stats())
+    
+    def _compute_stats(self) -> Dict[str, float]:
+        """Recompute the aggregates from the retention rollups plus one scan of game_sessions"""
+        return stats_values(
+            self.db.execute(stats_scan_statement()).one(),
+            self.db.execute(rollup_stats_statement()).one()
+        )
+    
+    def _write_stats_row(self, values: Dict[str, float]) -> GameStatsTotals:
+        """Insert or overwrite the aggregates row (caller commits)"""
+        totals = self.db.get(GameStatsTotals, STATS_ROW_ID)
+        if totals is None:
+            totals = GameStatsTotals(id=STATS_ROW_ID)
+            self.db.add(totals)
+        for field, value in values.items():
+            setattr(totals, field, value)
+        self.db.flush()
+        return totals
+    
+    def rebuild_game_stats(self) -> GameStats:
+        """Recompute the running aggregates from scratch"""
+        try:
+            totals = self._write_stats_row(self._compute_stats())
+            self._announce("stats")
+            self.db.commit()
+            response_cache.bump(STATS_TAG)
+            app_logger.info(f"Game stats rebuilt: {totals.total_games} sessions")
+            return stats_to_schema(totals)
+        except Exception as e:
+            app_logger.error(f"Error rebuilding game stats: {e}")
+            self.db.rollback()
+            raise
+    
+    def verify_game_stats(self) -> Dict[str, Dict[str, float]]:
+        """Compare the running aggregates with a fresh scan; returns mismatches"""
+        expected = self._compute_stats()
+        return stats_mismatches(expected, self.db.get(GameStatsTotals, STATS_ROW_ID))
+    
+    def ensure_game_stats(self) -> None:
+        """Seed the aggregates row if it does not exist yet"""
+        if self.db.get(GameStatsTotals, STATS_ROW_ID) is None:
+            self.rebuild_game_stats()
+    
     def get_game_stats(self) -> GameStats:
         """Get overall game statistics"""
         try:
-            # Get basic stats
-            total_games = self.db.execute(select(func.count(GameSession.id))).scalar() or 0
-            total_score = self.db.execute(select(func.sum(GameSession.score))).scalar() or 0
-            total_coins = self.db.execute(select(func.sum(GameSession.coins_collected))).scalar() or 0
-            total_distance = self.db.execute(select(func.sum(GameSession.distance))).scalar() or 0.0
-            best_score = self.db.execute(select(func.max(GameSession.score))).scalar() or 0
-            
-            average_score = total_score / total_games if total_games > 0 else 0.0
-            
-            return GameStats(
-                total_games=total_games,
-                total_score=total_score,
-                total_coins=total_coins,
-                average_score=average_score,
-                best_score=best_score,
-                total_distance=total_distance
-            )
+            if not unique_players.is_warm:
+                unique_players.warm(self.db)
+            totals = self.db.get(GameStatsTotals, STATS_ROW_ID)
+            if totals is None:
+                return self.rebuild_game_stats()
+            return stats_to_schema(totals)
         except Exception as e:
             app_logger.error(f"Error getting game stats: {e}")
-            return GameStats(
-                total_games=0,
-                total_score=0,
-                total_coins=0,
-                average_score=0.0,
-                best_score=0,
-                total_distance=0.0
-            )
\ No newline at end of file
+            return empty_stats()
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""Group-commit ingestion queue for finished game sessions"""
+import asyncio
+import time
+from typing import List, Optional, Tuple
+from app.core.config import settings
+from app.core.database import AsyncWriteSessionLocal
+from app.schemas.game import GameSessionCreate, GameSession as GameSessionSchema, IngestMetrics
+from app.services.async_game_service import AsyncGameService
+from app.core.logging import app_logger
+
+_Item = Tuple[GameSessionCreate, asyncio.Future]
+
+class SessionIngestQueue:
+    """Queue of validated sessions drained by a single writer task.
+
+    The writer collects up to ``batch_size`` payloads, or whatever arrived
+    within ``max_latency`` seconds of the first one, and stores them in one
+    transaction. Each submitter is resolved only after that commit.
+    """
+
+    def __init__(self, batch_size: int, max_latency: float, max_queue: int):
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._submitted = 0
+        self._committed = 0
+        self._failed = 0
+        self._batches = 0
+        self._last_batch_size = 0
+        self._last_flush_ms = 0.0
+        self._max_queue_depth = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._writer is not None and not self._writer.done()
+
+    async def start(self) -> None:
+        """Start the writer task on the running event loop"""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._writer = asyncio.create_task(self._run(), name="session-ingest-writer")
+        app_logger.info(
+            f"Session ingest queue started (batch_size={self.batch_size}, "
+            f"max_latency={self.max_latency * 1000:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the writer"""
+        if not self.is_running:
+            return
+        await self._queue.join()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+        app_logger.info("Session ingest queue stopped")
+
+    async def submit(self, session_data: GameSessionCreate) -> GameSessionSchema:
+        """Queue a session and wait until the batch containing it is committed"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((session_data, future))
+        self._submitted += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return await future
+
+    def metrics(self) -> IngestMetrics:
+        """Snapshot of queue depth and throughput counters"""
+        return IngestMetrics(
+            running=self.is_running,
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            max_queue_depth=self._max_queue_depth,
+            queue_capacity=self.max_queue,
+            batch_size=self.batch_size,
+            max_latency_ms=self.max_latency * 1000,
+            submitted=self._submitted,
+            committed=self._committed,
+            failed=self._failed,
+            batches=self._batches,
+            average_batch_size=self._committed / self._batches if self._batches else 0.0,
+            last_batch_size=self._last_batch_size,
+            last_flush_ms=self._last_flush_ms
+        )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_latency
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        started = time.perf_counter()
+        payloads = [session_data for session_data, _ in batch]
+        try:
+            results = await self._write(payloads)
+        except Exception as e:
+            if len(batch) == 1:
+                self._failed += 1
+                self._resolve(batch[0][1], exception=e)
+                return
+            # Retry one by one so a single bad row does not fail its neighbours
+            app_logger.warning(f"Ingest batch of {len(batch)} failed ({e}), retrying individually")
+            for item in batch:
+                await self._flush([item])
+            return
+
+        self._batches += 1
+        self._committed += len(results)
+        self._last_batch_size = len(results)
+        self._last_flush_ms = (time.perf_counter() - started) * 1000
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, result=result)
+
+    @staticmethod
+    async def _write(payloads: List[GameSessionCreate]) -> List[GameSessionSchema]:
+        async with AsyncWriteSessionLocal() as db:
+            db_sessions = await AsyncGameService(db).create_game_sessions(payloads)
+            return [GameSessionSchema.model_validate(s) for s in db_sessions]
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result=None, exception: Optional[Exception] = None) -> None:
+        # The submitter may have gone away (client disconnect) in the meantime
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+ingest_queue = SessionIngestQueue(
+    batch_size=settings.INGEST_BATCH_SIZE,
+    max_latency=settings.INGEST_MAX_LATENCY_MS / 1000,
+    max_queue=settings.INGEST_QUEUE_SIZE
+)
@@ -0,0 +1,78 @@
+"""In-memory leaderboard index for high scores"""
+import threading
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from app.core.config import settings
+from app.models.game import HighScore
+from app.schemas.game import HighScore as HighScoreSchema
+from app.core.logging import app_logger
+
+class LeaderboardIndex:
+    """Process-resident, score-ordered copy of the high_scores table.
+
+    Entries are kept sorted by ``(-score, id)`` so the best score comes first,
+    qualification checks are a binary search and top-N reads are a slice.
+    Like the table, it holds at most ``size`` entries.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._keys: List[Tuple[int, int]] = []
+        self._entries: List[HighScoreSchema] = []
+        self._lock = threading.Lock()
+        self.is_warm = False
+
+    @staticmethod
+    def _key(entry: HighScoreSchema) -> Tuple[int, int]:
+        return (-entry.score, entry.id)
+
+    def warm(self, db: Session) -> None:
+        """Load every high score from the database, replacing the current contents"""
+        rows = db.execute(select(HighScore)).scalars().all()
+        entries = sorted((HighScoreSchema.model_validate(row) for row in rows), key=self._key)[:self.size]
+        with self._lock:
+            self._entries = entries
+            self._keys = [self._key(entry) for entry in entries]
+            self.is_warm = True
+        app_logger.info(f"Leaderboard warmed with {len(entries)} high scores")
+
+    def add(self, high_score: HighScore) -> None:
+        """Insert a freshly committed high score row, dropping any pushed off the board"""
+        entry = HighScoreSchema.model_validate(high_score)
+        key = self._key(entry)
+        with self._lock:
+            index = bisect_right(self._keys, key)
+            if index >= self.size:
+                return
+            self._keys.insert(index, key)
+            self._entries.insert(index, entry)
+            del self._keys[self.size:]
+            del self._entries[self.size:]
+
+    def count_at_least(self, score: int) -> int:
+        """Number of high scores greater than or equal to ``score``"""
+        with self._lock:
+            return bisect_right(self._keys, (-score, float("inf")))
+
+    def qualifies(self, score: int, pending_scores: Iterable[int] = ()) -> bool:
+        """Whether ``score`` makes the top board, counting not-yet-indexed scores too"""
+        ahead = self.count_at_least(score) + sum(1 for s in pending_scores if s >= score)
+        return ahead < self.size
+
+    def top(self, limit: int = 10) -> List[HighScoreSchema]:
+        """Best ``limit`` high scores, highest first"""
+        with self._lock:
+            return self._entries[:max(limit, 0)]
+
+    def page(self, after: Optional[Tuple[int, int]], limit: int) -> List[HighScoreSchema]:
+        """Up to ``limit`` entries ranked below ``after`` (a ``(score, id)`` pair)"""
+        with self._lock:
+            start = bisect_right(self._keys, (-after[0], after[1])) if after else 0
+            return self._entries[start:start + max(limit, 0)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+leaderboard = LeaderboardIndex(size=settings.HIGH_SCORE_BOARD_SIZE)
@@ -0,0 +1,78 @@
+"""Publish/subscribe hub pushing high score board changes to open pages"""
+import asyncio
+import threading
+from typing import Callable, List, Optional
+from app.schemas.game import LeaderboardDiff, LeaderboardRankChange
+from app.services.leaderboard_read_model import LeaderboardReadModel, leaderboard_read_model
+from app.core.logging import app_logger
+
+LeaderboardSubscriber = Callable[[LeaderboardDiff], None]
+
+class LeaderboardHub:
+    """Broadcasts the ranks of the board that changed since the last publish.
+
+    Writers call ``publish()`` after updating the in-memory board, from any
+    thread; the read model is refreshed once and the diff handed to every
+    subscriber on the event loop, so open leaderboard pages only receive
+    the rows that moved.
+    """
+
+    def __init__(self, read_model: LeaderboardReadModel):
+        self.read_model = read_model
+        self._subscribers: List[LeaderboardSubscriber] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """Deliver diffs on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        """Stop delivering and drop every subscriber"""
+        with self._lock:
+            self._loop = None
+            self._subscribers = []
+
+    def subscribe(self, callback: LeaderboardSubscriber) -> LeaderboardDiff:
+        """Register ``callback`` for future diffs; returns the whole board to start from"""
+        with self._lock:
+            self._subscribers.append(callback)
+            version, rows = self.read_model.rows()
+        return LeaderboardDiff(
+            version=version,
+            changes=[LeaderboardRankChange(rank=row.rank, row=row) for row in rows]
+        )
+
+    def unsubscribe(self, callback: LeaderboardSubscriber) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self) -> Optional[LeaderboardDiff]:
+        """Refresh the read model and broadcast the changed ranks"""
+        with self._lock:
+            version, changes = self.read_model.refresh()
+            if not changes:
+                return None
+            diff = LeaderboardDiff(
+                version=version,
+                changes=[LeaderboardRankChange(rank=rank, row=row) for rank, row in changes]
+            )
+            subscribers = list(self._subscribers)
+            loop = self._loop
+        if subscribers and loop is not None:
+            loop.call_soon_threadsafe(self._deliver, diff, subscribers)
+        return diff
+
+    def _deliver(self, diff: LeaderboardDiff, subscribers: List[LeaderboardSubscriber]) -> None:
+        for callback in subscribers:
+            try:
+                callback(diff)
+            except Exception as e:
+                app_logger.error(f"Error pushing leaderboard update: {e}")
+                self.unsubscribe(callback)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+leaderboard_hub = LeaderboardHub(leaderboard_read_model)
@@ -0,0 +1,69 @@
+"""Versioned, display-ready snapshot of the high score board"""
+import threading
+from typing import List, Optional, Tuple
+from app.schemas.game import HighScore as HighScoreSchema, LeaderboardRow
+from app.services.leaderboard import LeaderboardIndex, leaderboard
+
+def leaderboard_row(rank: int, entry: HighScoreSchema) -> LeaderboardRow:
+    return LeaderboardRow(
+        rank=rank,
+        id=entry.id,
+        player_name=entry.player_name,
+        score=f"{entry.score:,}",
+        coins=f"{entry.coins_collected:,}",
+        distance=f"{entry.distance:.1f}m",
+        date=entry.created_at.strftime('%Y-%m-%d')
+    )
+
+class LeaderboardReadModel:
+    """The board as the API and the UI serve it, rebuilt only when it changes.
+
+    ``refresh()`` takes a new snapshot of the in-memory board and formats
+    just the ranks whose entry changed, so every page view and every
+    ``/high-scores`` request reads the same prebuilt lists without a
+    database session or an HTTP round-trip.
+    """
+
+    def __init__(self, board: LeaderboardIndex):
+        self.board = board
+        self.version = 0
+        self._entries: List[HighScoreSchema] = []
+        self._rows: List[LeaderboardRow] = []
+        self._lock = threading.Lock()
+
+    @property
+    def is_warm(self) -> bool:
+        return self.board.is_warm
+
+    def refresh(self) -> Tuple[int, List[Tuple[int, Optional[LeaderboardRow]]]]:
+        """Re-read the board; returns the new version and the changed ``(rank, row)`` pairs"""
+        with self._lock:
+            entries = self.board.top(self.board.size)
+            rows = self._rows[:len(entries)]
+            changes: List[Tuple[int, Optional[LeaderboardRow]]] = []
+            for rank, entry in enumerate(entries, 1):
+                if rank > len(self._entries) or self._entries[rank - 1].id != entry.id:
+                    row = leaderboard_row(rank, entry)
+                    if rank > len(rows):
+                        rows.append(row)
+                    else:
+                        rows[rank - 1] = row
+                    changes.append((rank, row))
+            changes.extend((rank, None) for rank in range(len(entries) + 1, len(self._entries) + 1))
+            if changes:
+                self._entries = entries
+                self._rows = rows
+                self.version += 1
+            return self.version, changes
+
+    def top(self, limit: int = 10) -> List[HighScoreSchema]:
+        """Best ``limit`` high scores, highest first"""
+        with self._lock:
+            return self._entries[:max(limit, 0)]
+
+    def rows(self) -> Tuple[int, List[LeaderboardRow]]:
+        """Current version and display rows"""
+        with self._lock:
+            return self.version, self._rows
+
+leaderboard_read_model = LeaderboardReadModel(leaderboard)
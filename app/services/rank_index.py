@@ -0,0 +1,121 @@
+"""Order-statistic index over every game session score"""
+import threading
+from array import array
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from app.core.config import settings
+from app.models.game import GameSession, DailyPlayerRollup, ArchivedScoreCount
+from app.core.logging import app_logger
+
+class ScoreRankIndex:
+    """Fenwick tree over fixed-width score buckets.
+
+    ``count_above`` and ``add`` are O(log B) for B buckets. Ranks are exact
+    when the bucket width is 1; wider buckets treat scores in the same
+    bucket as ties. The tree doubles in size when a score lands past the
+    last bucket, up to ``max_buckets``; higher scores share the top bucket.
+    """
+
+    def __init__(self, bucket_width: int = 1, max_buckets: int = 1 << 20, initial_buckets: int = 1024):
+        self.bucket_width = max(bucket_width, 1)
+        self.max_buckets = max(max_buckets, initial_buckets)
+        self._counts = array('q', [0]) * initial_buckets
+        self._tree = array('q', [0]) * (initial_buckets + 1)
+        self._player_best: Dict[str, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self.is_warm = False
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def _bucket(self, score: int) -> int:
+        return min(max(score, 0) // self.bucket_width, self.max_buckets - 1)
+
+    def _grow(self, bucket: int) -> None:
+        size = len(self._counts)
+        while size <= bucket:
+            size = min(size * 2, self.max_buckets)
+        self._counts.extend(array('q', [0]) * (size - len(self._counts)))
+        # Rebuild the tree in O(size) from the bucket counts
+        tree = array('q', [0]) * (size + 1)
+        for i in range(1, size + 1):
+            tree[i] += self._counts[i - 1]
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add_bucket(self, bucket: int, count: int) -> None:
+        if bucket >= len(self._counts):
+            self._grow(bucket)
+        self._counts[bucket] += count
+        self._total += count
+        i = bucket + 1
+        size = len(self._tree) - 1
+        while i <= size:
+            self._tree[i] += count
+            i += i & -i
+
+    def _prefix(self, bucket: int) -> int:
+        """Number of scores in buckets 0..bucket inclusive"""
+        i = min(bucket + 1, len(self._tree) - 1)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def warm(self, db: Session) -> None:
+        """Load score counts and per-player bests from game_sessions and the retention rollups"""
+        score_counts = db.execute(
+            select(GameSession.score, func.count(GameSession.id)).group_by(GameSession.score)
+        ).all() + db.execute(
+            select(ArchivedScoreCount.score, ArchivedScoreCount.sessions)
+        ).all()
+        player_best = db.execute(
+            select(DailyPlayerRollup.player_name, func.max(DailyPlayerRollup.best_score))
+            .group_by(DailyPlayerRollup.player_name)
+        ).all() + db.execute(
+            select(GameSession.player_name, func.max(GameSession.score)).group_by(GameSession.player_name)
+        ).all()
+        with self._lock:
+            self._counts = array('q', [0]) * len(self._counts)
+            self._tree = array('q', [0]) * len(self._tree)
+            self._total = 0
+            for score, count in score_counts:
+                self._add_bucket(self._bucket(score), count)
+            self._player_best = {}
+            for name, best in player_best:
+                if best > self._player_best.get(name, -1):
+                    self._player_best[name] = best
+            self.is_warm = True
+        app_logger.info(f"Rank index warmed with {self._total} sessions in {len(self._counts)} buckets")
+
+    def add(self, player_name: str, score: int) -> None:
+        """Record one committed session"""
+        with self._lock:
+            self._add_bucket(self._bucket(score), 1)
+            if score > self._player_best.get(player_name, -1):
+                self._player_best[player_name] = score
+
+    def count_above(self, score: int) -> int:
+        """Number of sessions that scored strictly higher than ``score``"""
+        with self._lock:
+            return self._total - self._prefix(self._bucket(score))
+
+    def rank(self, score: int) -> int:
+        """1-based position ``score`` would take among all sessions"""
+        return self.count_above(score) + 1
+
+    def player_best(self, player_name: str) -> Optional[int]:
+        """Best score recorded for a player, if any"""
+        with self._lock:
+            return self._player_best.get(player_name)
+
+rank_index = ScoreRankIndex(
+    bucket_width=settings.RANK_BUCKET_WIDTH,
+    max_buckets=settings.RANK_MAX_BUCKETS
+)
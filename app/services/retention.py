@@ -0,0 +1,276 @@
+"""Retention: roll old game sessions into daily per-player rollups"""
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import Row, Select, select, delete, func, desc
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, AsyncWriteSessionLocal
+from app.core.workers import is_primary_worker
+from app.models.game import GameSession, DailyPlayerRollup, ArchivedScoreCount
+from app.schemas.game import ExportFormat, LeaderboardWindow, PlayerDayStats
+from app.services.export import ExportEncoder, ExportRange
+from app.services.windowed_leaderboard import window_start, utc_now
+from app.core.logging import app_logger
+
+def retention_cutoff(days: int, now: Optional[datetime] = None) -> datetime:
+    """Sessions created before this are rolled up.
+
+    Never later than the start of the current week, so the daily and
+    weekly leaderboards can always be rebuilt from raw sessions.
+    """
+    now = now or utc_now()
+    return min(now - timedelta(days=days), window_start(LeaderboardWindow.WEEKLY, now))
+
+def rollup_history_statement(player_name: str, since: date) -> Select:
+    return (
+        select(DailyPlayerRollup)
+        .where(DailyPlayerRollup.player_name == player_name, DailyPlayerRollup.day >= since)
+    )
+
+def raw_history_statement(player_name: str, since: date) -> Select:
+    day = func.date(GameSession.created_at, type_=DailyPlayerRollup.day.type)
+    return (
+        select(
+            day,
+            func.count(GameSession.id),
+            func.sum(GameSession.score),
+            func.sum(GameSession.coins_collected),
+            func.sum(GameSession.distance),
+            func.max(GameSession.score)
+        )
+        .where(
+            GameSession.player_name == player_name,
+            GameSession.created_at >= datetime.combine(since, datetime.min.time())
+        )
+        .group_by(day)
+    )
+
+def merge_history(rollups: Sequence[DailyPlayerRollup], raw_days: Sequence[Row]) -> List[PlayerDayStats]:
+    """Combine rollups with the raw tail, newest day first"""
+    days: Dict[date, PlayerDayStats] = {
+        r.day: PlayerDayStats(
+            day=r.day,
+            games=r.games,
+            total_score=r.total_score,
+            total_coins=r.total_coins,
+            total_distance=r.total_distance,
+            best_score=r.best_score
+        )
+        for r in rollups
+    }
+    for day, games, total_score, total_coins, total_distance, best_score in raw_days:
+        entry = days.get(day)
+        if entry is None:
+            days[day] = PlayerDayStats(
+                day=day,
+                games=games,
+                total_score=total_score or 0,
+                total_coins=total_coins or 0,
+                total_distance=total_distance or 0.0,
+                best_score=best_score or 0
+            )
+        else:
+            # A day can be split when protected sessions stay raw
+            entry.games += games
+            entry.total_score += total_score or 0
+            entry.total_coins += total_coins or 0
+            entry.total_distance += total_distance or 0.0
+            entry.best_score = max(entry.best_score, best_score or 0)
+    return sorted(days.values(), key=lambda d: d.day, reverse=True)
+
+def write_archive(archive_dir: str, rows: Sequence[Row]) -> None:
+    """Write a batch to its own gzip NDJSON file before it is deleted"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"game_sessions-{rows[0].id:012d}-{rows[-1].id:012d}.ndjson.gz")
+    encoder = ExportEncoder(ExportFormat.NDJSON, compress=True)
+    with open(f"{path}.tmp", "wb") as archive:
+        archive.write(encoder.header() + encoder.encode(rows) + encoder.finish())
+        archive.flush()
+        os.fsync(archive.fileno())
+    os.replace(f"{path}.tmp", path)
+
+class RetentionService:
+    """Moves game sessions past the retention age out of the hot table.
+
+    Each batch is optionally archived to a gzip NDJSON file, then folded
+    into daily per-player rollups and per-score counts and deleted in one
+    transaction. Sessions on the all-time leaderboard are kept raw so it
+    can still be rebuilt from game_sessions.
+    """
+
+    def __init__(self, db: Session, archive_dir: str = settings.RETENTION_ARCHIVE_DIR):
+        self.db = db
+        self.archive_dir = archive_dir
+
+    def protected_ids(self) -> Set[int]:
+        """Sessions kept raw: the best LEADERBOARD_WINDOW_SIZE of all time"""
+        return set(self.db.execute(
+            select(GameSession.id)
+            .order_by(desc(GameSession.score), GameSession.id)
+            .limit(settings.LEADERBOARD_WINDOW_SIZE)
+        ).scalars())
+
+    def batch(self, cutoff: datetime, protected: Set[int], after_id: int, batch_size: int) -> Sequence[Row]:
+        """Next sessions created before ``cutoff`` to roll up, in id order after ``after_id``"""
+        return self.db.execute(
+            ExportRange(end=cutoff).statement(after_id, batch_size).where(GameSession.id.not_in(protected))
+        ).all()
+
+    def compact(self, cutoff: datetime, batch_size: int = settings.RETENTION_BATCH_SIZE) -> int:
+        """Roll up every session created before ``cutoff``; returns how many"""
+        protected = self.protected_ids()
+        after_id = 0
+        compacted = 0
+        while True:
+            rows = self.batch(cutoff, protected, after_id, batch_size)
+            if not rows:
+                break
+            if self.archive_dir:
+                write_archive(self.archive_dir, rows)
+            self.roll_up(rows)
+            compacted += len(rows)
+            after_id = rows[-1][0]
+            if len(rows) < batch_size:
+                break
+        if compacted:
+            app_logger.info(f"Retention rolled up {compacted} game sessions created before {cutoff}")
+        return compacted
+
+    def roll_up(self, rows: Sequence[Row]) -> None:
+        """Fold a batch into the rollup tables and delete it, in one transaction"""
+        try:
+            self._roll_up(rows)
+            self.db.execute(
+                delete(GameSession)
+                .where(GameSession.id.in_([row.id for row in rows]))
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        except Exception as e:
+            app_logger.error(f"Error rolling up game sessions {rows[0].id}..{rows[-1].id}: {e}")
+            self.db.rollback()
+            raise
+
+    def _roll_up(self, rows: Sequence[Row]) -> None:
+        """Add the batch to the rollup tables (caller commits)"""
+        day_totals: Dict[Tuple[date, str], List] = {}
+        score_counts: Dict[int, int] = {}
+        for row in rows:
+            totals = day_totals.setdefault((row.created_at.date(), row.player_name), [0, 0, 0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += row.score
+            totals[2] += row.coins_collected
+            totals[3] += row.distance
+            totals[4] = max(totals[4], row.score)
+            score_counts[row.score] = score_counts.get(row.score, 0) + 1
+
+        days: Set[date] = {day for day, _ in day_totals}
+        players: Set[str] = {player for _, player in day_totals}
+        existing = {
+            (r.day, r.player_name): r
+            for r in self.db.execute(
+                select(DailyPlayerRollup).where(
+                    DailyPlayerRollup.day.in_(days), DailyPlayerRollup.player_name.in_(players)
+                )
+            ).scalars()
+        }
+        for (day, player_name), (games, total_score, total_coins, total_distance, best_score) in day_totals.items():
+            rollup = existing.get((day, player_name))
+            if rollup is None:
+                self.db.add(DailyPlayerRollup(
+                    day=day,
+                    player_name=player_name,
+                    games=games,
+                    total_score=total_score,
+                    total_coins=total_coins,
+                    total_distance=total_distance,
+                    best_score=best_score
+                ))
+                continue
+            rollup.games += games
+            rollup.total_score += total_score
+            rollup.total_coins += total_coins
+            rollup.total_distance += total_distance
+            rollup.best_score = max(rollup.best_score, best_score)
+
+        existing_counts = {
+            c.score: c
+            for c in self.db.execute(
+                select(ArchivedScoreCount).where(ArchivedScoreCount.score.in_(score_counts))
+            ).scalars()
+        }
+        for score, count in score_counts.items():
+            if score in existing_counts:
+                existing_counts[score].sessions += count
+            else:
+                self.db.add(ArchivedScoreCount(score=score, sessions=count))
+        self.db.flush()
+
+class RetentionWorker:
+    """Background task that runs retention every ``interval`` seconds"""
+
+    def __init__(self, days: int, interval: float, archive_dir: str = settings.RETENTION_ARCHIVE_DIR):
+        self.days = days
+        self.interval = interval
+        self.archive_dir = archive_dir
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the retention job on the running event loop"""
+        if self._task is None and self.days > 0 and self.interval > 0 and is_primary_worker():
+            self._task = asyncio.create_task(self._run(), name="game-session-retention")
+            app_logger.info(f"Retention: rolling up sessions older than {self.days} days every {self.interval:.0f}s")
+
+    async def stop(self) -> None:
+        """Stop the retention job"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self, batch_size: int = settings.RETENTION_BATCH_SIZE) -> int:
+        """Roll up everything past the retention age; returns how many sessions.
+
+        Batches are read on a reader connection and written on the shared
+        writer connection, one transaction each, so API writes queue behind
+        one batch at most. Archives are gzipped and fsynced in a worker thread.
+        """
+        cutoff = retention_cutoff(self.days)
+        async with AsyncSessionLocal() as db:
+            protected = await db.run_sync(lambda session: RetentionService(session).protected_ids())
+        after_id = 0
+        compacted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                rows = await db.run_sync(
+                    lambda session: RetentionService(session).batch(cutoff, protected, after_id, batch_size)
+                )
+            if not rows:
+                break
+            if self.archive_dir:
+                await asyncio.to_thread(write_archive, self.archive_dir, rows)
+            async with AsyncWriteSessionLocal() as db:
+                await db.run_sync(lambda session: RetentionService(session).roll_up(rows))
+            compacted += len(rows)
+            after_id = rows[-1][0]
+            if len(rows) < batch_size:
+                break
+        if compacted:
+            app_logger.info(f"Retention rolled up {compacted} game sessions created before {cutoff}")
+        return compacted
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                app_logger.error(f"Retention run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+retention_worker = RetentionWorker(days=settings.RETENTION_DAYS, interval=settings.RETENTION_INTERVAL_S)
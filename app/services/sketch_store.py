@@ -0,0 +1,171 @@
+"""Persistence of in-memory sketches to the stats_sketches table"""
+import asyncio
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import AsyncWriteSessionLocal
+from app.core.workers import is_primary_worker
+from app.models.game import GameSession, StatsSketch
+from app.core.logging import app_logger
+
+class SketchStore(ABC):
+    """Base for summaries fed by committed sessions and saved as one JSON row.
+
+    Sessions are not folded in id order: other workers' sessions arrive
+    through the change feed and the ingest paths commit concurrently. So
+    ``through_id`` is a low-water mark, below which every session is
+    included, and the ids included above it are kept and saved with the
+    state. A restart loads the row and replays the other sessions above
+    ``through_id``. Subclasses implement ``_state()`` (called with the lock
+    held) and ``warm()``.
+    """
+
+    name = ""
+
+    def __init__(self):
+        self.through_id = 0
+        self._ahead: Set[int] = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.is_warm = False
+
+    @abstractmethod
+    def _state(self) -> Dict[str, Any]:
+        """JSON-serializable state to save"""
+
+    @abstractmethod
+    def warm(self, db: Session) -> None:
+        """Load the saved state and replay the sessions it does not include"""
+
+    def _include(self, session_id: int) -> bool:
+        """Mark a session as folded in (lock held); False if it already was"""
+        if session_id <= self.through_id or session_id in self._ahead:
+            return False
+        self._ahead.add(session_id)
+        while self.through_id + 1 in self._ahead:
+            self.through_id += 1
+            self._ahead.discard(self.through_id)
+        return True
+
+    def _close_gaps(self, db: Session) -> None:
+        """Move ``through_id`` past ids that no stored session has.
+
+        SQLite hands out ids under its single write lock, so once a session
+        is committed, a lower id without a row (rolled back or deleted) will
+        never get one. Ids that are stored but not folded in yet stop it.
+        """
+        with self._lock:
+            if not self._ahead:
+                return
+            low, high = self.through_id, max(self._ahead)
+        stored = set(db.execute(
+            select(GameSession.id).where(GameSession.id > low, GameSession.id < high)
+        ).scalars())
+        with self._lock:
+            while self.through_id < high:
+                next_id = self.through_id + 1
+                if next_id in self._ahead:
+                    self._ahead.discard(next_id)
+                elif next_id in stored:
+                    break
+                self.through_id = next_id
+
+    def _saved(self, db: Session) -> Tuple[Optional[Dict[str, Any]], int, Set[int]]:
+        """Saved state, its through_id and the ids it includes above that, or (None, 0, set())"""
+        saved = db.get(StatsSketch, self.name)
+        if saved is None:
+            return None, 0, set()
+        state = json.loads(saved.state)
+        return state, saved.through_id, set(state.pop("ahead", ()))
+
+    def _replay(self, db: Session, columns: Sequence, through_id: int, ahead: Set[int]) -> Iterator[Row]:
+        """Stored sessions the saved state does not include, in id order"""
+        stmt = (
+            select(GameSession.id, *columns)
+            .where(GameSession.id > through_id)
+            .order_by(GameSession.id)
+            .execution_options(yield_per=settings.EXPORT_YIELD_PER)
+        )
+        for row in db.execute(stmt):
+            if row.id not in ahead:
+                yield row
+
+    def _warmed(self, through_id: int, ahead: Set[int], last_id: int, replayed: int, saved: bool) -> None:
+        """Set the checkpoint after a replay (lock held): everything stored is now included"""
+        self.through_id = max(through_id, last_id, max(ahead, default=0))
+        self._ahead = set()
+        self._dirty = replayed > 0 or not saved
+        self.is_warm = True
+
+    def persist(self, db: Session) -> bool:
+        """Save the state if it changed since the last save; returns whether it did"""
+        self._close_gaps(db)
+        with self._lock:
+            if not self._dirty:
+                return False
+            state = json.dumps({**self._state(), "ahead": sorted(self._ahead)}, separators=(",", ":"))
+            through_id = self.through_id
+            self._dirty = False
+        try:
+            saved = db.get(StatsSketch, self.name)
+            if saved is None:
+                db.add(StatsSketch(name=self.name, state=state, through_id=through_id))
+            else:
+                saved.state = state
+                saved.through_id = through_id
+            db.commit()
+            return True
+        except Exception as e:
+            app_logger.error(f"Error saving {self.name}: {e}")
+            db.rollback()
+            with self._lock:
+                self._dirty = True
+            raise
+
+class SketchPersister:
+    """Background task saving every registered store every ``interval`` seconds"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stores: List[SketchStore] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, store: SketchStore) -> SketchStore:
+        self.stores.append(store)
+        return store
+
+    async def start(self) -> None:
+        """Start saving on the running event loop (primary worker only)"""
+        if self._task is None and self.interval > 0 and is_primary_worker():
+            self._task = asyncio.create_task(self._run(), name="sketch-persist")
+
+    async def stop(self) -> None:
+        """Stop the task and save one last time"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.persist()
+
+    async def persist(self) -> None:
+        for store in self.stores:
+            try:
+                async with AsyncWriteSessionLocal() as db:
+                    await db.run_sync(store.persist)
+            except Exception as e:
+                app_logger.error(f"Saving {store.name} failed: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.persist()
+
+sketch_persister = SketchPersister(settings.SKETCH_PERSIST_INTERVAL_S)
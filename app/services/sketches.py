@@ -0,0 +1,170 @@
+"""Mergeable, bounded-memory summaries of streams of values"""
+import base64
+import hashlib
+import math
+import zlib
+from typing import Any, Dict, List, Optional
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch (DDSketch).
+
+    A value v lands in bucket ceil(log_gamma(v)), so every quantile is
+    returned within ``relative_accuracy`` of the true value. Two sketches
+    with the same accuracy merge exactly by adding bucket counts. When
+    there are more than ``max_bins`` buckets the lowest ones are folded
+    together, which only affects the lowest quantiles.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._bins: Dict[int, int] = {}
+        self.zero_count = 0  # Values too small to take a log of (0 scores, 0 s durations)
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 1e-9:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self._bins[key] = self._bins.get(key, 0) + count
+            if len(self._bins) > self.max_bins:
+                self._collapse()
+        self.count += count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Fold another sketch with the same accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracies")
+        for key, count in other._bins.items():
+            self._bins[key] = self._bins.get(key, 0) + count
+        if len(self._bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def _collapse(self) -> None:
+        keys = sorted(self._bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        folded = sum(self._bins.pop(key) for key in excess)
+        self._bins[excess[-1]] = folded
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate value at quantile ``q`` (0..1), or None if empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self._bins):
+            seen += self._bins[key]
+            if rank < seen:
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": [[key, count] for key, count in sorted(self._bins.items())],
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any], max_bins: int = 2048) -> "QuantileSketch":
+        sketch = cls(state["relative_accuracy"], max_bins)
+        sketch._bins = {key: count for key, count in state["bins"]}
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        return sketch
+
+class FixedHistogram:
+    """Counts per fixed-width bucket from 0; the last bucket is open-ended"""
+
+    def __init__(self, bucket_width: float, buckets: int):
+        self.bucket_width = bucket_width
+        self.counts: List[int] = [0] * buckets
+
+    def add(self, value: float, count: int = 1) -> None:
+        index = min(max(int(value // self.bucket_width), 0), len(self.counts) - 1)
+        self.counts[index] += count
+
+    def merge(self, other: "FixedHistogram") -> None:
+        if other.bucket_width != self.bucket_width or len(other.counts) != len(self.counts):
+            raise ValueError("Cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"bucket_width": self.bucket_width, "counts": list(self.counts)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "FixedHistogram":
+        histogram = cls(state["bucket_width"], len(state["counts"]))
+        histogram.counts = list(state["counts"])
+        return histogram
+
+class HyperLogLog:
+    """Approximate distinct count in 2**precision one-byte registers.
+
+    The standard error is about 1.04 / sqrt(2**precision), 1.6% at the
+    default precision of 12 (4 KB). Sketches of the same precision merge
+    by taking the register-wise maximum, giving the count of the union.
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self._count: Optional[int] = None
+
+    def add(self, item: str) -> None:
+        hashed = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), "big")
+        index = hashed >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rank = rest_bits - (hashed & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            self._count = None
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs with different precisions")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        self._count = None
+
+    def count(self) -> int:
+        if self._count is None:
+            m = len(self.registers)
+            alpha = 0.7213 / (1 + 1.079 / m)
+            estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+            zeros = self.registers.count(0)
+            if estimate <= 2.5 * m and zeros:
+                # Small range correction (linear counting)
+                estimate = m * math.log(m / zeros)
+            self._count = round(estimate)
+        return self._count
+
+    def to_str(self) -> str:
+        """Compressed, base64-encoded registers"""
+        return base64.b64encode(zlib.compress(bytes(self.registers))).decode()
+
+    @classmethod
+    def from_str(cls, data: str) -> "HyperLogLog":
+        registers = zlib.decompress(base64.b64decode(data))
+        sketch = cls(len(registers).bit_length() - 1)
+        sketch.registers = bytearray(registers)
+        return sketch
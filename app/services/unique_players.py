@@ -0,0 +1,131 @@
+"""Approximate unique-player counts per time window (HyperLogLog)"""
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.game import GameSession, DailyPlayerRollup
+from app.schemas.game import LeaderboardWindow
+from app.services.sketches import HyperLogLog
+from app.services.sketch_store import SketchStore, sketch_persister
+from app.services.windowed_leaderboard import window_start, utc_now
+from app.core.logging import app_logger
+
+class UniquePlayerCounters(SketchStore):
+    """One HyperLogLog per day of the current week plus one for all time.
+
+    The weekly count is the union of the daily sketches, so every window
+    costs a few KB whatever the number of players, and sketches saved by
+    other processes can be merged in.
+    """
+
+    name = "unique_players"
+
+    def __init__(self, precision: int):
+        super().__init__()
+        self.precision = precision
+        self._days: Dict[date, HyperLogLog] = {}
+        self._all_time = HyperLogLog(precision)
+        self._counts: Optional[Tuple[date, Dict[str, int]]] = None
+
+    def _week_start(self, now: datetime) -> date:
+        return window_start(LeaderboardWindow.WEEKLY, now).date()
+
+    def _add(
+        self, days: Dict[date, HyperLogLog], all_time: HyperLogLog,
+        player_name: str, created_at: Optional[datetime], week_start: date
+    ) -> None:
+        all_time.add(player_name)
+        day = (created_at or utc_now()).date()
+        if day >= week_start:
+            if day not in days:
+                days[day] = HyperLogLog(self.precision)
+            days[day].add(player_name)
+
+    def add(self, db_session: GameSession) -> None:
+        """Record one committed session"""
+        with self._lock:
+            if not self._include(db_session.id):
+                return
+            self._counts = None
+            self._add(self._days, self._all_time, db_session.player_name, db_session.created_at,
+                      self._week_start(utc_now()))
+            self._dirty = True
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "all_time": self._all_time.to_str(),
+            "days": {day.isoformat(): sketch.to_str() for day, sketch in self._days.items()},
+        }
+
+    def _merge(
+        self, days: Dict[date, HyperLogLog], all_time: HyperLogLog, state: Dict[str, Any], week_start: date
+    ) -> None:
+        all_time.merge(HyperLogLog.from_str(state["all_time"]))
+        for day_str, data in state["days"].items():
+            day = date.fromisoformat(day_str)
+            if day < week_start:
+                continue
+            if day not in days:
+                days[day] = HyperLogLog(self.precision)
+            days[day].merge(HyperLogLog.from_str(data))
+
+    def merge_state(self, state: Dict[str, Any]) -> None:
+        """Merge sketches saved by another process"""
+        week_start = self._week_start(utc_now())
+        with self._lock:
+            self._counts = None
+            self._merge(self._days, self._all_time, state, week_start)
+
+    def warm(self, db: Session) -> None:
+        """Load the saved sketches and replay game sessions stored after them.
+
+        The sketches are rebuilt without the lock and swapped in at the end:
+        under ``run_sync`` every fetch yields to the event loop, where
+        ``add()`` must not find the lock held.
+        """
+        week_start = self._week_start(utc_now())
+        saved, through_id, ahead = self._saved(db)
+        days: Dict[date, HyperLogLog] = {}
+        all_time = HyperLogLog(self.precision)
+        if saved is not None and HyperLogLog.from_str(saved["all_time"]).precision == self.precision:
+            self._merge(days, all_time, saved, week_start)
+        else:
+            saved, through_id, ahead = None, 0, set()
+            # First build: players whose sessions were rolled up still count
+            for day, player_name in db.execute(select(DailyPlayerRollup.day, DailyPlayerRollup.player_name)):
+                self._add(days, all_time, player_name, datetime.combine(day, datetime.min.time()), week_start)
+        columns = (GameSession.player_name, GameSession.created_at)
+        last_id = replayed = 0
+        for row in self._replay(db, columns, through_id, ahead):
+            self._add(days, all_time, row.player_name, row.created_at, week_start)
+            last_id = row.id
+            replayed += 1
+        with self._lock:
+            self._days = days
+            self._all_time = all_time
+            self._counts = None
+            self._warmed(through_id, ahead, last_id, replayed, saved is not None)
+        app_logger.info(f"Unique player counters warmed ({replayed} sessions replayed)")
+
+    def counts(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Approximate unique players today, this week and all time (UTC)"""
+        now = now or utc_now()
+        today, week_start = now.date(), self._week_start(now)
+        with self._lock:
+            if self._counts is not None and self._counts[0] == today:
+                return self._counts[1]
+            for day in [day for day in self._days if day < week_start]:
+                del self._days[day]
+            week = HyperLogLog(self.precision)
+            for sketch in self._days.values():
+                week.merge(sketch)
+            counts = {
+                "unique_players_today": self._days[today].count() if today in self._days else 0,
+                "unique_players_week": week.count(),
+                "unique_players_all_time": self._all_time.count(),
+            }
+            self._counts = (today, counts)
+            return counts
+
+unique_players = sketch_persister.register(UniquePlayerCounters(settings.UNIQUE_PLAYERS_PRECISION))
@@ -0,0 +1,129 @@
+"""Rolling daily / weekly / all-time leaderboards kept in memory"""
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import select, desc
+from app.core.config import settings
+from app.models.game import GameSession
+from app.schemas.game import GameSession as GameSessionSchema, LeaderboardWindow
+from app.core.logging import app_logger
+
+# Earliest possible window start, used for the all-time board
+EPOCH = datetime(1970, 1, 1)
+
+def utc_now() -> datetime:
+    """Naive UTC timestamp, matching what SQLite stores for created_at"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def as_naive_utc(moment: datetime) -> datetime:
+    """Convert an aware timestamp to naive UTC; naive ones are taken to be UTC already"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+def window_start(window: LeaderboardWindow, moment: datetime) -> datetime:
+    """Start of the window containing ``moment`` (UTC, weeks start on Monday)"""
+    if window == LeaderboardWindow.DAILY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if window == LeaderboardWindow.WEEKLY:
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day - timedelta(days=day.weekday())
+    return EPOCH
+
+def seconds_until_rollover(window: LeaderboardWindow, now: Optional[datetime] = None) -> float:
+    """Seconds until the current window of ``window`` ends (inf for all-time)"""
+    now = now or utc_now()
+    if window == LeaderboardWindow.DAILY:
+        end = window_start(window, now) + timedelta(days=1)
+    elif window == LeaderboardWindow.WEEKLY:
+        end = window_start(window, now) + timedelta(weeks=1)
+    else:
+        return float("inf")
+    return (end - now).total_seconds()
+
+class WindowBoard:
+    """Top-N sessions for one window instance, best first"""
+
+    __slots__ = ("start", "keys", "entries")
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self.keys: List[Tuple[int, int]] = []
+        self.entries: List[GameSessionSchema] = []
+
+class WindowedLeaderboards:
+    """One bounded board per window, rolled over when its window ends.
+
+    Boards only ever hold ``size`` entries, so inserts and reads cost the
+    same however many sessions arrive. When a session (or a read) falls in
+    a newer window than a board's, the old board is dropped.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._boards: Dict[LeaderboardWindow, WindowBoard] = {}
+        self._lock = threading.Lock()
+        self.is_warm = False
+
+    def _board(self, window: LeaderboardWindow, moment: datetime) -> Optional[WindowBoard]:
+        """Board for the window containing ``moment``; None if that window has expired"""
+        start = window_start(window, moment)
+        board = self._boards.get(window)
+        if board is None or board.start < start:
+            board = WindowBoard(start)
+            self._boards[window] = board
+        elif board.start > start:
+            return None
+        return board
+
+    def _insert(self, board: WindowBoard, entry: GameSessionSchema) -> None:
+        key = (-entry.score, entry.id)
+        index = bisect_right(board.keys, key)
+        if index >= self.size:
+            return
+        board.keys.insert(index, key)
+        board.entries.insert(index, entry)
+        if len(board.entries) > self.size:
+            board.keys.pop()
+            board.entries.pop()
+
+    def warm(self, db: Session, now: Optional[datetime] = None) -> None:
+        """Load the current window of every board from game_sessions"""
+        now = now or utc_now()
+        boards = {}
+        for window in LeaderboardWindow:
+            board = WindowBoard(window_start(window, now))
+            stmt = select(GameSession).order_by(desc(GameSession.score), GameSession.id).limit(self.size)
+            if window != LeaderboardWindow.ALL_TIME:
+                stmt = stmt.where(GameSession.created_at >= board.start)
+            for row in db.execute(stmt).scalars():
+                entry = GameSessionSchema.model_validate(row)
+                board.keys.append((-entry.score, entry.id))
+                board.entries.append(entry)
+            boards[window] = board
+        with self._lock:
+            self._boards = boards
+            self.is_warm = True
+        app_logger.info(
+            "Windowed leaderboards warmed: "
+            + ", ".join(f"{w.value}={len(b.entries)}" for w, b in boards.items())
+        )
+
+    def add(self, db_session: GameSession) -> None:
+        """Offer a committed session to every board whose window contains it"""
+        entry = GameSessionSchema.model_validate(db_session)
+        with self._lock:
+            for window in LeaderboardWindow:
+                board = self._board(window, entry.created_at)
+                if board is not None:
+                    self._insert(board, entry)
+
+    def top(self, window: LeaderboardWindow, limit: int, now: Optional[datetime] = None) -> List[GameSessionSchema]:
+        """Best ``limit`` sessions of the current window"""
+        with self._lock:
+            board = self._board(window, now or utc_now())
+            return board.entries[:max(limit, 0)] if board is not None else []
+
+windowed_leaderboards = WindowedLeaderboards(size=settings.LEADERBOARD_WINDOW_SIZE)
@@ -0,0 +1,575 @@
+// Logical stage size; the canvases' pixel size depends on the quality tier
+const WIDTH = 800;
+const HEIGHT = 600;
+
+// Simulation runs at a fixed rate whatever the display refresh rate
+const TICKS_PER_SECOND = 60;
+const TICK_MS = 1000 / TICKS_PER_SECOND;
+const MAX_TICKS_PER_FRAME = 5; // Drop time rather than spiral after a stall
+const SLIDE_TICKS = 30;
+const LANES = 3;
+const LANE_POOL_SIZE = 64;
+const MAX_DIRTY_RECTS = 64; // More than this and the whole entity layer is cleared
+
+// Score/coins/distance reach the page's stats panel at most this often
+const DEFAULT_SCORE_RATE_HZ = 4;
+
+// Render quality adapts to the measured frame time
+const TARGET_FRAME_MS = 1000 / 60;
+const QUALITY_WINDOW_MS = 1000;
+const QUALITY_TIERS = [
+    { name: 'low', resolution: 0.5, roundCoins: false },
+    { name: 'medium', resolution: 1, roundCoins: true },
+    { name: 'high', resolution: Math.min(window.devicePixelRatio || 1, 2), roundCoins: true }
+];
+
+// Game variables
+let canvas, ctx; // Entity layer, redrawn every frame
+let background, backgroundCtx; // Static layer under it, drawn once
+let lastFrameTime = 0;
+let accumulator = 0;
+let tick = 0;
+let scroll = 0; // How far the world has moved left; entity x is worldX - scroll
+let gameState = {
+    isPlaying: false,
+    isPaused: false,
+    score: 0,
+    coins: 0,
+    distance: 0,
+    speed: 5
+};
+
+let player = {
+    x: 100,
+    y: 400,
+    prevY: 400,
+    width: 40,
+    height: 60,
+    velocityY: 0,
+    isJumping: false,
+    isSliding: false,
+    slideTicks: 0,
+    lane: 1 // 0=left, 1=center, 2=right
+};
+
+// Fixed-size ring buffers, one per lane: everything moves at the same speed,
+// so each queue stays ordered by x from the front and only the front is released
+function createPool(capacity, width, height) {
+    let items = new Array(capacity);
+    for (let i = 0; i < capacity; i++) {
+        items[i] = { worldX: 0, y: 0, width: width, height: height, active: false };
+    }
+    return { items: items, capacity: capacity, head: 0, count: 0 };
+}
+
+function createLanes(width, height) {
+    let lanes = new Array(LANES);
+    for (let lane = 0; lane < LANES; lane++) {
+        lanes[lane] = createPool(LANE_POOL_SIZE, width, height);
+    }
+    return lanes;
+}
+
+function poolSpawn(pool) {
+    if (pool.count === pool.capacity) return null;
+    let item = pool.items[(pool.head + pool.count) % pool.capacity];
+    pool.count++;
+    item.active = true;
+    return item;
+}
+
+function poolAt(pool, i) {
+    return pool.items[(pool.head + i) % pool.capacity];
+}
+
+function poolReleaseFront(pool) {
+    // Drop entities that scrolled off or were collected once they reach the front
+    while (pool.count > 0) {
+        let item = pool.items[pool.head];
+        if (item.active && item.worldX - scroll > -item.width) break;
+        item.active = false;
+        pool.head = (pool.head + 1) % pool.capacity;
+        pool.count--;
+    }
+}
+
+function poolClear(pool) {
+    for (let i = 0; i < pool.count; i++) poolAt(pool, i).active = false;
+    pool.head = 0;
+    pool.count = 0;
+}
+
+// Regions drawn on the entity layer last frame; only these are cleared
+let dirtyCount = 0;
+let dirtyAll = true;
+let dirtyRects = new Float32Array(MAX_DIRTY_RECTS * 4);
+let overlay = -1; // Overlay flags drawn last frame (1 = idle, 2 = paused), -1 = none drawn yet
+
+// Last progress sent to the server; sends are coalesced to one per interval
+let progress = {
+    everyTicks: TICKS_PER_SECOND / DEFAULT_SCORE_RATE_HZ,
+    lastTick: 0,
+    score: 0,
+    coins: 0,
+    distance: 0,
+    playing: false
+};
+
+let quality = {
+    tier: QUALITY_TIERS.length - 1,
+    windowMs: 0,
+    windowFrames: 0,
+    averageMs: 0,
+    slowWindows: 0,
+    fastWindows: 0,
+    upgradeAfter: 5, // Fast windows needed to step up; doubles after every step down
+    holdWindows: 0 // Windows ignored after a change while the new tier settles
+};
+
+let obstacles = createLanes(40, 80);
+let coins = createLanes(20, 20);
+let keys = {};
+
+// Initialize game
+function initGame() {
+    canvas = document.getElementById('gameCanvas');
+    background = document.getElementById('gameBackground');
+    if (!canvas || !background) {
+        // The page markup may mount after this script runs
+        requestAnimationFrame(initGame);
+        return;
+    }
+
+    ctx = canvas.getContext('2d');
+    let scoreRate = Number(canvas.parentElement && canvas.parentElement.dataset.scoreRate) || DEFAULT_SCORE_RATE_HZ;
+    progress.everyTicks = Math.max(1, Math.round(TICKS_PER_SECOND / scoreRate));
+    backgroundCtx = background.getContext('2d');
+    setQualityTier(quality.tier);
+
+    // Event listeners
+    document.addEventListener('keydown', handleKeyDown);
+    document.addEventListener('keyup', handleKeyUp);
+
+    // Start game loop
+    requestAnimationFrame(gameLoop);
+}
+
+function handleKeyDown(e) {
+    keys[e.code] = true;
+
+    if (!gameState.isPlaying || gameState.isPaused) return;
+
+    switch(e.code) {
+        case 'ArrowLeft':
+            if (player.lane > 0) {
+                player.lane--;
+                player.x = 100 + player.lane * 200;
+            }
+            break;
+        case 'ArrowRight':
+            if (player.lane < 2) {
+                player.lane++;
+                player.x = 100 + player.lane * 200;
+            }
+            break;
+        case 'ArrowUp':
+        case 'Space':
+            if (!player.isJumping && !player.isSliding) {
+                player.isJumping = true;
+                player.velocityY = -15;
+            }
+            break;
+        case 'ArrowDown':
+            if (!player.isJumping) {
+                player.isSliding = true;
+                player.slideTicks = SLIDE_TICKS;
+            }
+            break;
+    }
+    e.preventDefault();
+}
+
+function handleKeyUp(e) {
+    keys[e.code] = false;
+}
+
+function startGame() {
+    gameState.isPlaying = true;
+    gameState.isPaused = false;
+    gameState.score = 0;
+    gameState.coins = 0;
+    gameState.distance = 0;
+    gameState.speed = 5;
+
+    // Reset player
+    player.x = 300;
+    player.y = 400;
+    player.prevY = 400;
+    player.lane = 1;
+    player.velocityY = 0;
+    player.isJumping = false;
+    player.isSliding = false;
+    player.slideTicks = 0;
+    tick = 0;
+    scroll = 0;
+    progress.lastTick = 0;
+
+    // Empty the pools
+    for (let lane = 0; lane < LANES; lane++) {
+        poolClear(obstacles[lane]);
+        poolClear(coins[lane]);
+    }
+}
+
+function pauseGame(paused) {
+    gameState.isPaused = paused;
+}
+
+function restartGame() {
+    startGame();
+}
+
+function gameLoop(now) {
+    if (lastFrameTime === 0) lastFrameTime = now;
+    monitorFrame(now - lastFrameTime);
+    accumulator += Math.min(now - lastFrameTime, TICK_MS * MAX_TICKS_PER_FRAME);
+    lastFrameTime = now;
+    while (accumulator >= TICK_MS) {
+        update();
+        accumulator -= TICK_MS;
+    }
+    // Draw between the last two ticks so motion stays smooth at any refresh rate
+    render(accumulator / TICK_MS);
+    requestAnimationFrame(gameLoop);
+}
+
+// One simulation tick
+function update() {
+    player.prevY = player.y;
+    if (!gameState.isPlaying || gameState.isPaused) return;
+    tick++;
+
+    // Update distance and score
+    gameState.distance += gameState.speed * 0.1;
+    gameState.score += Math.floor(gameState.speed);
+
+    // Increase speed gradually
+    gameState.speed += 0.001;
+
+    // Update player physics
+    if (player.isJumping) {
+        player.velocityY += 0.8; // gravity
+        player.y += player.velocityY;
+
+        if (player.y >= 400) {
+            player.y = 400;
+            player.isJumping = false;
+            player.velocityY = 0;
+        }
+    }
+    if (player.isSliding && --player.slideTicks <= 0) {
+        player.isSliding = false;
+    }
+
+    // Move the world; entities keep their world position
+    scroll += gameState.speed;
+
+    // Spawn obstacles
+    if (Math.random() < 0.02) {
+        let obstacle = poolSpawn(obstacles[Math.floor(Math.random() * LANES)]);
+        if (obstacle) {
+            obstacle.worldX = scroll + WIDTH;
+            obstacle.y = 420;
+        }
+    }
+
+    // Spawn coins
+    if (Math.random() < 0.03) {
+        let coin = poolSpawn(coins[Math.floor(Math.random() * LANES)]);
+        if (coin) {
+            coin.worldX = scroll + WIDTH;
+            coin.y = 350 + Math.random() * 100;
+        }
+    }
+
+    for (let lane = 0; lane < LANES; lane++) {
+        poolReleaseFront(obstacles[lane]);
+        poolReleaseFront(coins[lane]);
+    }
+
+    // Check collisions
+    checkCollisions();
+
+    // Update UI
+    updateGameUI();
+}
+
+// First active entity of a lane queue overlapping the player, or null.
+// The queue is ordered by x, so the scan stops at the first entity ahead of the player.
+function firstHit(pool) {
+    for (let i = 0; i < pool.count; i++) {
+        let item = poolAt(pool, i);
+        let x = item.worldX - scroll;
+        if (x >= player.x + player.width) return null;
+        if (!item.active || x + item.width <= player.x) continue;
+        if (player.y < item.y + item.height && player.y + player.height > item.y) return item;
+    }
+    return null;
+}
+
+function checkCollisions() {
+    // Only the player's lane can collide
+    if (!player.isSliding && firstHit(obstacles[player.lane])) {
+        gameOver();
+        return;
+    }
+
+    let coin;
+    while ((coin = firstHit(coins[player.lane])) !== null) {
+        gameState.coins++;
+        gameState.score += 10;
+        coin.active = false;
+    }
+}
+
+function gameOver() {
+    gameState.isPlaying = false;
+    updateGameUI(true);
+
+    // Save game session
+    fetch('/api/game/session', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            player_name: 'Anonymous',
+            score: gameState.score,
+            coins_collected: gameState.coins,
+            distance: gameState.distance,
+            duration: tick / TICKS_PER_SECOND
+        })
+    }).catch(console.error);
+
+    alert(`Game Over!\nScore: ${gameState.score}\nCoins: ${gameState.coins}\nDistance: ${gameState.distance.toFixed(1)}m`);
+}
+
+// Average the frame time over one-second windows while playing and step
+// the tier down after two slow windows or up after a run of fast ones
+function monitorFrame(delta) {
+    if (!gameState.isPlaying || gameState.isPaused || delta > 250) {
+        // Idle frames, pauses and hidden tabs say nothing about render cost
+        quality.windowMs = 0;
+        quality.windowFrames = 0;
+        return;
+    }
+    quality.windowMs += delta;
+    quality.windowFrames++;
+    if (quality.windowMs < QUALITY_WINDOW_MS) return;
+
+    quality.averageMs = quality.windowMs / quality.windowFrames;
+    quality.windowMs = 0;
+    quality.windowFrames = 0;
+    if (quality.holdWindows > 0) {
+        quality.holdWindows--;
+        return;
+    }
+    if (quality.averageMs > TARGET_FRAME_MS * 1.25) {
+        quality.fastWindows = 0;
+        if (++quality.slowWindows >= 2 && quality.tier > 0) {
+            quality.upgradeAfter = Math.min(quality.upgradeAfter * 2, 60);
+            setQualityTier(quality.tier - 1);
+        }
+    } else if (quality.averageMs < TARGET_FRAME_MS * 1.1) {
+        quality.slowWindows = 0;
+        if (++quality.fastWindows >= quality.upgradeAfter && quality.tier < QUALITY_TIERS.length - 1) {
+            setQualityTier(quality.tier + 1);
+        }
+    } else {
+        quality.slowWindows = 0;
+        quality.fastWindows = 0;
+    }
+}
+
+function setQualityTier(tier) {
+    let settings = QUALITY_TIERS[tier];
+    quality.tier = tier;
+    quality.slowWindows = 0;
+    quality.fastWindows = 0;
+    quality.holdWindows = 2;
+
+    // Resizing a canvas clears it and resets its transform
+    let pixelWidth = Math.round(WIDTH * settings.resolution);
+    let pixelHeight = Math.round(HEIGHT * settings.resolution);
+    for (let layer of [background, canvas]) {
+        layer.width = pixelWidth;
+        layer.height = pixelHeight;
+    }
+    backgroundCtx.setTransform(settings.resolution, 0, 0, settings.resolution, 0, 0);
+    ctx.setTransform(settings.resolution, 0, 0, settings.resolution, 0, 0);
+    drawBackground();
+    dirtyAll = true;
+    overlay = -1;
+
+    if (typeof emitEvent === 'function') {
+        emitEvent('render_quality', {
+            tier: settings.name,
+            resolution: settings.resolution,
+            frame_ms: Math.round(quality.averageMs * 10) / 10
+        });
+    }
+}
+
+// Sky, ground and lane markings never change: draw them once on their own canvas
+function drawBackground() {
+    let bg = backgroundCtx;
+    bg.fillStyle = '#87CEEB';
+    bg.fillRect(0, 0, WIDTH, HEIGHT);
+
+    bg.fillStyle = '#90EE90';
+    bg.fillRect(0, 500, WIDTH, 100);
+
+    bg.strokeStyle = '#fff';
+    bg.lineWidth = 2;
+    bg.setLineDash([10, 10]);
+    bg.beginPath();
+    for (let i = 1; i < 3; i++) {
+        bg.moveTo(100 + i * 200, 0);
+        bg.lineTo(100 + i * 200, HEIGHT);
+    }
+    bg.stroke();
+    bg.setLineDash([]);
+}
+
+function markDirty(x, y, width, height) {
+    if (dirtyCount === MAX_DIRTY_RECTS) {
+        dirtyAll = true;
+        return;
+    }
+    // Pad for anti-aliased edges
+    let i = dirtyCount * 4;
+    dirtyRects[i] = x - 2;
+    dirtyRects[i + 1] = y - 2;
+    dirtyRects[i + 2] = width + 4;
+    dirtyRects[i + 3] = height + 4;
+    dirtyCount++;
+}
+
+function clearDirty() {
+    if (dirtyAll) {
+        ctx.clearRect(0, 0, WIDTH, HEIGHT);
+    } else {
+        for (let i = 0; i < dirtyCount * 4; i += 4) {
+            ctx.clearRect(dirtyRects[i], dirtyRects[i + 1], dirtyRects[i + 2], dirtyRects[i + 3]);
+        }
+    }
+    dirtyCount = 0;
+    dirtyAll = false;
+}
+
+function render(alpha) {
+    if (!ctx) return;
+
+    // Nothing moves under the idle and pause overlays: draw them once
+    let overlayFlags = (gameState.isPlaying ? 0 : 1) | (gameState.isPaused ? 2 : 0);
+    if (overlayFlags !== 0 && overlayFlags === overlay) return;
+
+    clearDirty();
+
+    // Obstacles share one colour: one fillStyle for all lanes
+    ctx.fillStyle = '#FF4444';
+    for (let lane = 0; lane < LANES; lane++) {
+        let obstacleX = 100 + lane * 200;
+        for (let i = 0; i < obstacles[lane].count; i++) {
+            let obstacle = poolAt(obstacles[lane], i);
+            ctx.fillRect(obstacleX, obstacle.y, obstacle.width, obstacle.height);
+            markDirty(obstacleX, obstacle.y, obstacle.width, obstacle.height);
+        }
+    }
+
+    // Coins: every coin goes into one path and one fill; squares on the low tier
+    ctx.fillStyle = '#FFD700';
+    ctx.beginPath();
+    for (let lane = 0; lane < LANES; lane++) {
+        let coinX = 100 + lane * 200 + 10;
+        for (let i = 0; i < coins[lane].count; i++) {
+            let coin = poolAt(coins[lane], i);
+            if (!coin.active) continue;
+            if (QUALITY_TIERS[quality.tier].roundCoins) {
+                let radius = coin.width/2;
+                ctx.moveTo(coinX + coin.width, coin.y + radius);
+                ctx.arc(coinX + radius, coin.y + radius, radius, 0, Math.PI * 2);
+            } else {
+                ctx.rect(coinX, coin.y, coin.width, coin.height);
+            }
+            markDirty(coinX, coin.y, coin.width, coin.height);
+        }
+    }
+    ctx.fill();
+
+    // Draw player
+    ctx.fillStyle = player.isSliding ? '#FF6B6B' : '#4ECDC4';
+    let playerHeight = player.isSliding ? 30 : 60;
+    let y = player.prevY + (player.y - player.prevY) * alpha;
+    let playerY = player.isSliding ? y + 30 : y;
+    ctx.fillRect(player.x, playerY, player.width, playerHeight);
+    markDirty(player.x, playerY, player.width, playerHeight);
+
+    // Draw game info
+    if (overlayFlags & 1) {
+        ctx.fillStyle = 'rgba(0,0,0,0.7)';
+        ctx.fillRect(0, 0, WIDTH, HEIGHT);
+
+        ctx.fillStyle = '#fff';
+        ctx.font = '48px Arial';
+        ctx.textAlign = 'center';
+        ctx.fillText('Subway Surfers', WIDTH/2, HEIGHT/2 - 50);
+
+        ctx.font = '24px Arial';
+        ctx.fillText('Press Start Game to begin!', WIDTH/2, HEIGHT/2 + 20);
+        ctx.fillText('Use arrow keys to move and jump', WIDTH/2, HEIGHT/2 + 60);
+    }
+
+    if (overlayFlags & 2) {
+        ctx.fillStyle = 'rgba(0,0,0,0.5)';
+        ctx.fillRect(0, 0, WIDTH, HEIGHT);
+
+        ctx.fillStyle = '#fff';
+        ctx.font = '48px Arial';
+        ctx.textAlign = 'center';
+        ctx.fillText('PAUSED', WIDTH/2, HEIGHT/2);
+    }
+
+    if (overlayFlags !== 0) dirtyAll = true;
+    overlay = overlayFlags;
+}
+
+// Send score, coins and distance to the page's stats panel over the NiceGUI
+// websocket: at most once per interval, only when something changed
+function updateGameUI(force) {
+    if (!force && tick - progress.lastTick < progress.everyTicks) return;
+    let distance = Math.round(gameState.distance * 10) / 10;
+    if (gameState.score === progress.score && gameState.coins === progress.coins &&
+        distance === progress.distance && gameState.isPlaying === progress.playing) return;
+
+    progress.lastTick = tick;
+    progress.score = gameState.score;
+    progress.coins = gameState.coins;
+    progress.distance = distance;
+    progress.playing = gameState.isPlaying;
+    if (typeof emitEvent === 'function') {
+        emitEvent('game_progress', {
+            score: progress.score,
+            coins: progress.coins,
+            distance: progress.distance,
+            playing: progress.playing
+        });
+    }
+}
+
+// Initialize when DOM is loaded
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', initGame);
+} else {
+    initGame();
+}
@@ -16,7 +16,8 @@ except ImportError as e:
 
 # Create FastAPI app for API endpoints
 from fastapi import FastAPI
-from app.core import settings, app_logger, setup_middleware, setup_routers, setup_error_handlers
+from app.core import settings, app_logger, setup_middleware, setup_routers, setup_static_bundle, setup_error_handlers
+from app.core.lifecycle import setup_lifecycle
 
 app = FastAPI(
     title="Subway Surfers Game",
@@ -30,16 +31,29 @@ app = FastAPI(
 setup_error_handlers(app)
 setup_middleware(app)
 setup_routers(app, api_prefix="/api")
+setup_static_bundle(app)
+setup_lifecycle(app)
 
 # Setup database
 try:
-    from app.core.database import create_tables
+    from sqlalchemy.orm import Session
+    from app.core.database import create_tables, write_engine
+    from app.services.game_service import GameService
+    from app.services.change_feed import change_feed_tailer
     create_tables()
     app_logger.info("Database tables created successfully")
+    with Session(write_engine) as db:
+        GameService(db).ensure_game_stats()
+    with Session(write_engine) as db:
+        change_feed_tailer.warm(db)
 except Exception as e:
     app_logger.error(f"Database setup error: {e}")
 
-if __name__ in {"__main__", "__mp_main__"}:
+if __name__ == "__main__" and settings.WORKERS > 1:
+    from app.core.workers import run_workers
+    app_logger.info(f"Starting {settings.WORKERS} workers from port {settings.WORKER_BASE_PORT}")
+    run_workers(app)
+elif __name__ in {"__main__", "__mp_main__"}:
     try:
         # Setup NiceGUI integration
         from app.core.nicegui_setup import setup_nicegui
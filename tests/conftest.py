@@ -0,0 +1,74 @@
+"""Shared fixtures: a throwaway SQLite database and an API client over it"""
+import os
+import tempfile
+
+# Settings are read at import time, so point them at a scratch database first
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='game-tests-')}/game.db"
+os.environ["DEBUG"] = "false"
+
+import asyncio
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core import setup_middleware, setup_routers
+from app.core.database import Base, async_engine, create_tables, write_engine
+from app.core.response_cache import response_cache, HIGH_SCORES_TAG, STATS_TAG, WINDOWS_TAG
+from app.models.game import GameSession
+from app.services.game_service import GameService, warm_indexes
+
+@pytest.fixture
+def db():
+    """Session on a freshly created schema, dropped after the test"""
+    create_tables()
+    with Session(write_engine) as session:
+        yield session
+    Base.metadata.drop_all(bind=write_engine)
+
+@pytest.fixture
+def add_sessions(db):
+    """Insert game sessions from (player_name, score[, created_at]) tuples"""
+    def add(*rows):
+        sessions = [
+            GameSession(
+                player_name=row[0],
+                score=row[1],
+                coins_collected=row[1] // 10,
+                distance=float(row[1]),
+                duration=1.0,
+                created_at=row[2] if len(row) > 2 else datetime(2026, 1, 1)
+            )
+            for row in rows
+        ]
+        db.add_all(sessions)
+        db.commit()
+        return sessions
+    return add
+
+@pytest.fixture
+def client(db):
+    """API client with the in-memory indexes warmed from ``db``"""
+    app = FastAPI()
+    setup_middleware(app)
+    setup_routers(app, api_prefix="/api")
+    GameService(db).ensure_game_stats()
+    warm_indexes(db)
+    # Cached responses from earlier tests belong to another database
+    response_cache.bump(HIGH_SCORES_TAG, STATS_TAG, WINDOWS_TAG)
+    with TestClient(app) as test_client:
+        yield test_client
+    # Pooled aiosqlite connections are bound to the client's event loop
+    asyncio.run(async_engine.dispose())
+
+@pytest.fixture
+def run(db):
+    """Run a coroutine on a new event loop against ``db``'s schema"""
+    def run_coroutine(coroutine):
+        async def main():
+            try:
+                return await coroutine
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return run_coroutine
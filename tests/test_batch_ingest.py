@@ -0,0 +1,43 @@
+"""Batch (JSON array and NDJSON) session ingest"""
+import json
+import pytest
+from app.services.batch_ingest import batch_ingestor
+
+def row(score, player="batch"):
+    return {"player_name": player, "score": score, "coins_collected": 1, "distance": 5.0, "duration": 2.0}
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(batch_ingestor, "chunk_size", 2)
+
+def test_json_array_reports_every_row(client, small_chunks):
+    rows = [row(10), row(-1), row(30), {"score": "lots"}, row(50)]
+    result = client.post("/api/game/sessions/batch", json=rows).json()
+    assert (result["created"], result["invalid"], result["failed"], result["truncated"]) == (3, 2, 0, False)
+    assert [r["index"] for r in result["results"]] == [0, 1, 2, 3, 4]
+    assert [r["status"] for r in result["results"]] == ["created", "invalid", "created", "invalid", "created"]
+    assert result["results"][1]["errors"] and result["results"][1]["id"] is None
+    assert client.get("/api/game/stats").json()["total_games"] == 3
+    assert client.get("/api/game/high-scores").json()[0]["score"] == 50
+
+def test_ndjson_stream(client, small_chunks):
+    body = "\n".join(json.dumps(row(score)) for score in (1, 2, 3)) + "\n\n{not json}\n" + json.dumps(row(4))
+    result = client.post(
+        "/api/game/sessions/batch",
+        content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"}
+    ).json()
+    assert (result["created"], result["invalid"]) == (4, 1)
+    assert result["results"][3]["status"] == "invalid"
+    created_ids = [r["id"] for r in result["results"] if r["status"] == "created"]
+    assert created_ids == sorted(created_ids)
+
+def test_rows_past_the_limit_are_truncated(client, monkeypatch):
+    monkeypatch.setattr(batch_ingestor, "max_rows", 3)
+    result = client.post("/api/game/sessions/batch", json=[row(i) for i in range(5)]).json()
+    assert (result["created"], result["truncated"]) == (3, True)
+
+@pytest.mark.parametrize("body", [b'{"score": 1}', b"[1, 2", b""])
+def test_body_that_is_not_an_array_is_rejected(client, body):
+    response = client.post("/api/game/sessions/batch", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
@@ -0,0 +1,121 @@
+"""Change feed between worker processes"""
+from datetime import timedelta
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import write_engine
+from app.core.workers import worker_id
+from app.models.game import ChangeFeedEntry, HighScore
+from app.services import change_feed
+from app.services.change_feed import ChangeFeedTailer
+from app.services.game_service import change_feed_entry, decode_id_runs, encode_id_runs, warm_indexes
+from app.services.leaderboard import leaderboard
+from app.services.rank_index import rank_index
+from app.services.windowed_leaderboard import utc_now
+
+@pytest.fixture
+def tailer(db, monkeypatch):
+    """A tailer positioned at the end of the feed, with the indexes warmed"""
+    monkeypatch.setattr(settings, "WORKERS", 2)
+    warm_indexes(db)
+    feed_tailer = ChangeFeedTailer(poll_interval=1.0, retention=60.0)
+    feed_tailer.mark(db)
+    db.commit()
+    return feed_tailer
+
+def commit_elsewhere(db, add_sessions, origin, *scores):
+    """Store sessions and high scores as another worker would, with their feed entry"""
+    sessions = add_sessions(*[("elsewhere", score, utc_now()) for score in scores])
+    high_scores = [HighScore(player_name="elsewhere", score=score) for score in scores]
+    db.add_all(high_scores)
+    db.flush()
+    db.add(ChangeFeedEntry(
+        origin=origin,
+        kind="sessions",
+        session_ids=encode_id_runs(s.id for s in sessions),
+        high_score_ids=encode_id_runs(h.id for h in high_scores)
+    ))
+    db.commit()
+
+def test_id_runs_round_trip():
+    ids = [1, 2, 3, 7, 9, 10]
+    assert encode_id_runs(ids) == "[[1,3],[7,7],[9,10]]"
+    assert decode_id_runs(encode_id_runs(reversed(ids))) == ids
+    assert decode_id_runs(encode_id_runs([])) == []
+
+def test_single_worker_mode_writes_no_feed():
+    assert settings.WORKERS == 1
+    assert change_feed_entry("sessions") is None
+
+def test_other_workers_commits_are_applied(db, add_sessions, run, tailer):
+    sessions_before = rank_index.total
+    commit_elsewhere(db, add_sessions, "other-host:1", 400, 600)
+    assert run(tailer.poll()) == 1
+    assert rank_index.total == sessions_before + 2
+    assert rank_index.player_best("elsewhere") == 600
+    assert [entry.score for entry in leaderboard.top(2)] == [600, 400]
+    assert run(tailer.poll()) == 0
+
+def test_own_commits_are_not_applied_twice(db, add_sessions, run, tailer):
+    sessions_before = rank_index.total
+    commit_elsewhere(db, add_sessions, worker_id(), 500)
+    assert run(tailer.poll()) == 1
+    assert rank_index.total == sessions_before
+    assert tailer.cursor == db.execute(select(func.max(ChangeFeedEntry.id))).scalar_one()
+
+def test_falling_behind_the_pruned_feed_rewarms(db, add_sessions, run, tailer):
+    commit_elsewhere(db, add_sessions, "other-host:1", 100)
+    commit_elsewhere(db, add_sessions, "other-host:1", 200)
+    # The first entry is pruned before this worker reads it
+    db.delete(db.execute(select(ChangeFeedEntry).order_by(ChangeFeedEntry.id)).scalars().first())
+    db.commit()
+    run(tailer.poll())
+    assert rank_index.player_best("elsewhere") == 200
+    assert rank_index.total == 2
+    assert [entry.score for entry in leaderboard.top(2)] == [200, 100]
+
+def test_reload_from_another_worker_rewarms_once(db, add_sessions, run, tailer):
+    db.add(ChangeFeedEntry(origin="other-host:1", kind="reload"))
+    db.commit()
+    commit_elsewhere(db, add_sessions, "other-host:1", 300)
+    run(tailer.poll())
+    # The re-warm already read the later entry's session; it is not applied again
+    assert rank_index.total == 1
+    assert [entry.score for entry in leaderboard.top(2)] == [300]
+    assert tailer.cursor == db.execute(select(func.max(ChangeFeedEntry.id))).scalar_one()
+    assert run(tailer.poll()) == 0
+
+def test_warm_reads_indexes_and_cursor_from_one_snapshot(db, add_sessions, run, monkeypatch):
+    # A reader's snapshot only coexists with a concurrent commit under WAL
+    db.execute(text("PRAGMA journal_mode=WAL"))
+    warm_indexes = change_feed.warm_indexes
+
+    def warm_after_another_commit(warm_db):
+        commit_elsewhere(db, add_sessions, "other-host:1", 700)
+        warm_indexes(warm_db)
+
+    monkeypatch.setattr(change_feed, "warm_indexes", warm_after_another_commit)
+    feed_tailer = ChangeFeedTailer(poll_interval=1.0, retention=60.0)
+    try:
+        with Session(write_engine) as warm_db:
+            feed_tailer.warm(warm_db)
+        assert (feed_tailer.cursor, rank_index.total) == (0, 0)
+        assert run(feed_tailer.poll()) == 1
+        assert rank_index.total == 1
+        assert [entry.score for entry in leaderboard.top(2)] == [700]
+    finally:
+        # Leaving WAL needs the only connection to the file
+        db.close()
+        write_engine.dispose()
+        with write_engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA journal_mode=DELETE")
+
+def test_prune_removes_entries_past_retention(db, add_sessions, run, tailer):
+    commit_elsewhere(db, add_sessions, "other-host:1", 100)
+    old = db.execute(select(ChangeFeedEntry)).scalars().one()
+    old.created_at = utc_now() - timedelta(seconds=120)
+    commit_elsewhere(db, add_sessions, "other-host:1", 200)
+    run(tailer.prune())
+    db.expire_all()
+    assert db.execute(select(func.count(ChangeFeedEntry.id))).scalar_one() == 1
@@ -0,0 +1,37 @@
+"""Per-tab game state and its eviction"""
+from app.services.client_state import ClientStateStore
+
+def test_each_client_gets_its_own_state():
+    store = ClientStateStore()
+    first, second = store.get("tab-1"), store.get("tab-2")
+    first.score = 120
+    assert store.get("tab-1") is first
+    assert second.score == 0
+    assert len(store) == 2
+
+def test_retain_evicts_clients_that_are_gone():
+    store = ClientStateStore()
+    for client_id in ("a", "b", "c"):
+        store.get(client_id)
+    assert store.retain(["b", "unknown"]) == 2
+    assert len(store) == 1
+    assert store.retain(["b"]) == 0
+    assert store.evict("b") is True
+    assert store.evict("b") is False
+    metrics = store.metrics()
+    assert (metrics.clients, metrics.peak_clients, metrics.created, metrics.evicted) == (0, 3, 3, 3)
+
+def test_reconnect_after_eviction_starts_over():
+    store = ClientStateStore()
+    store.get("tab").player_name = "alice"
+    store.retain([])
+    assert store.get("tab").player_name == "Anonymous"
+
+def test_metrics_count_memory_and_render_quality():
+    store = ClientStateStore()
+    for i, tier in enumerate(["high", "low", "high", None]):
+        store.get(f"tab-{i}").render_quality = tier
+    metrics = store.metrics()
+    assert metrics.render_quality == {"high": 2, "low": 1}
+    assert metrics.total_bytes >= 4 * metrics.record_bytes
+    assert metrics.bytes_per_client == metrics.total_bytes / 4
@@ -0,0 +1,97 @@
+"""Quantile sketches and their persisted checkpoint"""
+import json
+import random
+from datetime import datetime
+import pytest
+from sqlalchemy import delete
+from app.models.game import GameSession
+from app.services.distribution import SessionDistributions
+from app.services.sketches import FixedHistogram, QuantileSketch
+
+def distributions():
+    return SessionDistributions(0.01, 512, 10, {"score": 100.0, "distance": 100.0, "duration": 10.0})
+
+def exact_quantile(values, q):
+    return sorted(values)[int(q * (len(values) - 1))]
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_quantiles_are_within_the_relative_accuracy(seed):
+    rng = random.Random(seed)
+    values = [rng.lognormvariate(5, 1.5) for _ in range(5000)] + [0.0] * 100
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    for q in (0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 1.0):
+        exact = exact_quantile(values, q)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.0101, abs=1e-9)
+    assert (sketch.count, sketch.min, sketch.max) == (len(values), 0.0, max(values))
+
+def test_merge_equals_one_sketch_over_all_values():
+    rng = random.Random(7)
+    values = [rng.uniform(0, 10_000) for _ in range(3000)]
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 3 else right).add(value)
+    left.merge(right)
+    assert left.to_dict() == whole.to_dict()
+    with pytest.raises(ValueError):
+        left.merge(QuantileSketch(relative_accuracy=0.05))
+
+def test_serialized_sketches_round_trip():
+    sketch, histogram = QuantileSketch(), FixedHistogram(10.0, 5)
+    for value in (0, 3, 14, 15, 999):
+        sketch.add(value)
+        histogram.add(value)
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.to_dict() == sketch.to_dict()
+    assert [restored.quantile(q) for q in (0.1, 0.5, 0.9)] == [sketch.quantile(q) for q in (0.1, 0.5, 0.9)]
+    assert FixedHistogram.from_dict(histogram.to_dict()).counts == histogram.counts == [2, 2, 0, 0, 1]
+
+def test_bin_limit_only_affects_the_lowest_quantiles():
+    sketch = QuantileSketch(relative_accuracy=0.01, max_bins=64)
+    values = [1.05 ** i for i in range(400)]
+    for value in values:
+        sketch.add(value)
+    assert len(sketch.to_dict()["bins"]) <= 64
+    assert sketch.quantile(0.99) == pytest.approx(exact_quantile(values, 0.99), rel=0.0101)
+
+def new_sessions(add_sessions, count):
+    return add_sessions(*[(f"p{i}", 10 * (i + 1), datetime(2026, 1, 1)) for i in range(count)])
+
+def test_restart_replays_sessions_folded_out_of_order(db, add_sessions):
+    new_sessions(add_sessions, 5)
+    live = distributions()
+    live.warm(db)
+    lagging = new_sessions(add_sessions, 5)
+    # Sessions 7, 9 and 10 arrive first; 6 and 8 are still in the change feed
+    for db_session in (lagging[1], lagging[3], lagging[4], lagging[1]):
+        live.add(db_session)
+    assert live.summary().score.count == 8
+    assert live.through_id == 5
+    live.persist(db)
+
+    restarted = distributions()
+    restarted.warm(db)
+    expected = QuantileSketch(relative_accuracy=0.01)
+    for score in [10 * (i + 1) for i in range(5)] * 2:
+        expected.add(score)
+    score = restarted.summary().score
+    assert score.count == 10
+    assert (score.p50, score.p90, score.max) == (expected.quantile(0.5), expected.quantile(0.9), expected.max)
+    assert restarted.through_id == 10
+
+def test_persist_closes_gaps_left_by_missing_sessions(db, add_sessions):
+    live = distributions()
+    live.warm(db)
+    sessions = new_sessions(add_sessions, 4)
+    db.execute(delete(GameSession).where(GameSession.id == sessions[1].id))
+    db.commit()
+    for db_session in (sessions[0], sessions[2], sessions[3]):
+        live.add(db_session)
+    assert live.through_id == 1
+    live.persist(db)
+    assert live.through_id == 4
+    restarted = distributions()
+    restarted.warm(db)
+    assert restarted.summary().score.count == 3
@@ -0,0 +1,61 @@
+"""Streaming, resumable game session export"""
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+import pytest
+from app.core.config import settings
+from app.schemas.game import ExportFormat
+from app.services.export import ExportEncoder, ExportRange, write_export
+
+@pytest.fixture
+def sessions(add_sessions, monkeypatch):
+    # Several keyset pages per export
+    monkeypatch.setattr(settings, "EXPORT_PAGE_SIZE", 3)
+    return add_sessions(*[(f"p{i}", i, datetime(2026, 1, 1, i)) for i in range(10)])
+
+def ndjson_ids(body):
+    return [json.loads(line)["id"] for line in body.splitlines()]
+
+def test_export_streams_every_session_in_id_order(sessions, client):
+    response = client.get("/api/game/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert ndjson_ids(response.content) == [s.id for s in sessions]
+    assert response.headers["x-export-until-id"] == str(sessions[-1].id)
+
+def test_interrupted_export_resumes_without_gaps_or_new_rows(sessions, client, add_sessions):
+    first = client.get("/api/game/export")
+    until_id = first.headers["x-export-until-id"]
+    received = ndjson_ids(first.content)[:4]
+    # Rows committed after the export started are not part of it
+    add_sessions(("late", 1))
+    rest = client.get("/api/game/export", params={"after_id": received[-1], "until_id": until_id})
+    assert received + ndjson_ids(rest.content) == [s.id for s in sessions]
+
+def test_csv_export(sessions, client):
+    response = client.get("/api/game/export", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == [s.id for s in sessions]
+    assert rows[2]["created_at"] == "2026-01-01T02:00:00"
+
+def test_gzip_export_is_compressed_once(sessions, client):
+    response = client.get("/api/game/export", params={"gzip": True}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "identity"
+    assert response.headers["content-type"] == "application/gzip"
+    assert ndjson_ids(gzip.decompress(response.content)) == [s.id for s in sessions]
+
+def test_time_range_accepts_offsets(sessions, client):
+    response = client.get("/api/game/export", params={
+        "start": "2026-01-01T05:00:00+02:00",  # 03:00 UTC
+        "end": "2026-01-01T06:00:00",          # Naive: UTC
+    })
+    assert [json.loads(line)["score"] for line in response.content.splitlines()] == [3, 4, 5]
+
+def test_file_export_matches_the_stream(db, sessions, client):
+    output = io.BytesIO()
+    written = write_export(db, ExportRange(after_id=sessions[1].id), ExportEncoder(ExportFormat.NDJSON), output)
+    assert written == 8
+    streamed = client.get("/api/game/export", params={"after_id": sessions[1].id}).content
+    assert output.getvalue() == streamed
@@ -0,0 +1,75 @@
+"""Running game stats kept in the one-row game_stats table"""
+from sqlalchemy import delete
+from app.cli import main
+from app.core.database import AsyncWriteSessionLocal
+from app.models.game import GameStatsTotals
+from app.schemas.game import GameSessionCreate
+from app.services.async_game_service import AsyncGameService
+from app.services.game_service import GameService, STATS_ROW_ID
+
+def sessions(*scores):
+    return [
+        GameSessionCreate(player_name="p", score=score, coins_collected=score // 10, distance=2.5)
+        for score in scores
+    ]
+
+def totals(db):
+    db.expire_all()
+    row = db.get(GameStatsTotals, STATS_ROW_ID)
+    return row and (row.total_games, row.total_score, row.total_coins, row.total_distance, row.best_score)
+
+def test_rebuild_scans_the_sessions(db, add_sessions):
+    add_sessions(("a", 10), ("b", 40), ("a", 25))
+    stats = GameService(db).rebuild_game_stats()
+    assert (stats.total_games, stats.total_score, stats.best_score, stats.average_score) == (3, 75, 40, 25.0)
+    assert (stats.total_coins, stats.total_distance) == (7, 75.0)
+    assert totals(db) == (3, 75, 7, 75.0, 40)
+
+def test_writes_update_the_row_incrementally(db, add_sessions):
+    add_sessions(("a", 10))
+    service = GameService(db)
+    service.ensure_game_stats()
+    service.create_game_sessions(sessions(30, 5))
+    assert totals(db) == (3, 45, 4, 15.0, 30)
+    assert service.verify_game_stats() == {}
+
+def test_missing_row_is_seeded_by_the_next_write(db, add_sessions):
+    add_sessions(("a", 10), ("b", 20))
+    assert totals(db) is None
+    GameService(db).create_game_session(sessions(50)[0])
+    # Seeded from the table, which already holds the new session
+    assert totals(db) == (3, 80, 8, 32.5, 50)
+
+def test_missing_row_is_seeded_by_the_next_async_write(db, add_sessions, run):
+    add_sessions(("a", 10))
+
+    async def create():
+        async with AsyncWriteSessionLocal() as write_db:
+            await AsyncGameService(write_db).create_game_sessions(sessions(70, 20))
+
+    run(create())
+    assert totals(db) == (3, 100, 10, 15.0, 70)
+
+def test_stats_verify_exit_code(db, add_sessions, capsys):
+    add_sessions(("a", 10), ("b", 20))
+    GameService(db).ensure_game_stats()
+    assert main(["stats", "verify"]) == 0
+    assert "Game stats OK" in capsys.readouterr().out
+    # A session written behind the service's back
+    add_sessions(("c", 90))
+    assert main(["stats", "verify"]) == 1
+    out = capsys.readouterr().out
+    assert "total_games: expected 3, stored 2" in out
+    assert "best_score: expected 90, stored 20" in out
+    assert main(["stats", "rebuild"]) == 0
+    capsys.readouterr()
+    assert main(["stats", "verify"]) == 0
+
+def test_get_game_stats_rebuilds_a_deleted_row(db, add_sessions):
+    add_sessions(("a", 15))
+    service = GameService(db)
+    service.ensure_game_stats()
+    db.execute(delete(GameStatsTotals))
+    db.commit()
+    assert service.get_game_stats().total_games == 1
+    assert totals(db) == (1, 15, 1, 15.0, 15)
@@ -0,0 +1,73 @@
+"""Trimming high_scores to the board size"""
+import pytest
+from sqlalchemy import select
+from app.cli import main
+from app.core.database import AsyncWriteSessionLocal
+from app.models.game import HighScore
+from app.schemas.game import GameSessionCreate, HighScoreCreate
+from app.services.async_game_service import AsyncGameService
+from app.services.game_service import GameService, warm_indexes
+from app.services.leaderboard import leaderboard
+
+@pytest.fixture
+def board(db, monkeypatch):
+    """A three-entry board holding ``scores``, warmed into memory"""
+    monkeypatch.setattr(leaderboard, "size", 3)
+
+    def fill(*scores):
+        db.add_all(HighScore(player_name=f"p{i}", score=score) for i, score in enumerate(scores))
+        db.commit()
+        warm_indexes(db)
+    return fill
+
+def stored(db):
+    db.expire_all()
+    return [
+        tuple(row) for row in
+        db.execute(select(HighScore.player_name, HighScore.score).order_by(HighScore.score.desc(), HighScore.id))
+    ]
+
+def in_memory():
+    return [(entry.player_name, entry.score) for entry in leaderboard.top(10)]
+
+def sessions(*scores):
+    return [GameSessionCreate(player_name=f"s{score}", score=score) for score in scores]
+
+def test_ties_at_the_cutoff_keep_the_earlier_high_score(db, board):
+    board(50, 30, 30)
+    returned = GameService(db).create_high_score(HighScoreCreate(player_name="late", score=30))
+    # Equal scores rank by id, so the newcomer is the one pushed off
+    assert (returned.player_name, returned.score) == ("late", 30)
+    assert stored(db) == in_memory() == [("p0", 50), ("p1", 30), ("p2", 30)]
+
+def test_created_high_score_evicts_the_lowest(db, board):
+    board(50, 30, 30)
+    GameService(db).create_high_score(HighScoreCreate(player_name="new", score=40))
+    assert stored(db) == in_memory() == [("p0", 50), ("new", 40), ("p1", 30)]
+
+def test_several_high_scores_from_one_batch(db, board):
+    board(50, 30, 20)
+    GameService(db).create_game_sessions(sessions(60, 45, 10, 35))
+    # 35 is ranked behind 60, 50 and 45 of the same transaction
+    assert stored(db) == in_memory() == [("s60", 60), ("p0", 50), ("s45", 45)]
+
+def test_bulk_insert_evicts_in_the_same_transaction(db, board, run):
+    board(50, 30, 30)
+
+    async def bulk_insert():
+        async with AsyncWriteSessionLocal() as write_db:
+            return await AsyncGameService(write_db).bulk_create_game_sessions(sessions(30, 45, 35, 60))
+
+    assert len(run(bulk_insert())) == 4
+    assert stored(db) == in_memory() == [("s60", 60), ("p0", 50), ("s45", 45)]
+
+def test_compact_trims_an_oversized_table_and_rewarms_the_board(db, board, capsys):
+    board()
+    # Rows written before the board size was lowered
+    db.add_all(HighScore(player_name=f"old{score}", score=score) for score in (10, 40, 90, 40, 70, 40))
+    db.commit()
+    assert main(["high-scores", "compact"]) == 0
+    assert "Removed 3 high scores" in capsys.readouterr().out
+    assert stored(db) == in_memory() == [("old90", 90), ("old70", 70), ("old40", 40)]
+    assert main(["high-scores", "compact"]) == 0
+    assert "Removed 0 high scores" in capsys.readouterr().out
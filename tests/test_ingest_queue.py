@@ -0,0 +1,65 @@
+"""Group-commit session ingest queue"""
+import asyncio
+from sqlalchemy import func, select
+from app.models.game import GameSession
+from app.schemas.game import GameSessionCreate
+from app.services.ingest import SessionIngestQueue
+
+def payload(score, player="queued"):
+    return GameSessionCreate(player_name=player, score=score, coins_collected=1, distance=3.0, duration=2.0)
+
+def test_concurrent_submits_share_batches(db, run):
+    queue = SessionIngestQueue(batch_size=8, max_latency=0.05, max_queue=100)
+
+    async def submit_all():
+        await queue.start()
+        results = await asyncio.gather(*(queue.submit(payload(i)) for i in range(20)))
+        await queue.stop()
+        return results
+
+    results = run(submit_all())
+    assert [r.score for r in results] == list(range(20))
+    assert len({r.id for r in results}) == 20
+    assert db.execute(select(func.count(GameSession.id))).scalar_one() == 20
+    metrics = queue.metrics()
+    assert (metrics.submitted, metrics.committed, metrics.failed) == (20, 20, 0)
+    assert metrics.batches == 3
+    assert not metrics.running
+
+def test_a_failing_row_does_not_fail_its_batch(db, run, monkeypatch):
+    queue = SessionIngestQueue(batch_size=8, max_latency=0.05, max_queue=100)
+    write = SessionIngestQueue._write
+
+    async def write_rejecting_bad_rows(payloads):
+        if any(p.player_name == "bad" for p in payloads):
+            raise RuntimeError("constraint failed")
+        return await write(payloads)
+
+    monkeypatch.setattr(queue, "_write", write_rejecting_bad_rows)
+
+    async def submit_all():
+        await queue.start()
+        results = await asyncio.gather(
+            *(queue.submit(payload(i, "bad" if i == 2 else "good")) for i in range(5)),
+            return_exceptions=True
+        )
+        await queue.stop()
+        return results
+
+    results = run(submit_all())
+    assert isinstance(results[2], RuntimeError)
+    assert [r.score for i, r in enumerate(results) if i != 2] == [0, 1, 3, 4]
+    assert (queue.metrics().committed, queue.metrics().failed) == (4, 1)
+
+def test_stop_flushes_queued_sessions(db, run):
+    queue = SessionIngestQueue(batch_size=64, max_latency=0.2, max_queue=100)
+
+    async def submit_and_stop():
+        await queue.start()
+        pending = [asyncio.create_task(queue.submit(payload(i))) for i in range(3)]
+        await asyncio.sleep(0)
+        await queue.stop()
+        return await asyncio.gather(*pending)
+
+    assert len(run(submit_and_stop())) == 3
+    assert db.execute(select(func.count(GameSession.id))).scalar_one() == 3
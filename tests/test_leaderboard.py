@@ -0,0 +1,77 @@
+"""In-memory high score board"""
+from datetime import datetime
+from app.models.game import HighScore
+from app.services.leaderboard import LeaderboardIndex
+
+def high_score(high_score_id, score):
+    return HighScore(
+        id=high_score_id, player_name=f"p{high_score_id}", score=score,
+        coins_collected=0, distance=0.0, created_at=datetime(2026, 1, 1)
+    )
+
+def board_of(*scores, size=3):
+    board = LeaderboardIndex(size=size)
+    for i, score in enumerate(scores, start=1):
+        board.add(high_score(i, score))
+    return board
+
+def ids(entries):
+    return [entry.id for entry in entries]
+
+def test_entries_are_ordered_by_score_then_id():
+    board = board_of(20, 50, 20, 40, size=10)
+    assert ids(board.top(10)) == [2, 4, 1, 3]
+    assert ids(board.top(2)) == [2, 4]
+    assert board.top(0) == board.top(-1) == []
+
+def test_add_trims_to_size():
+    board = board_of(10, 30, 20)
+    board.add(high_score(4, 25))
+    assert ids(board.top(10)) == [2, 4, 3]
+    # A score below the last entry is not kept
+    board.add(high_score(5, 5))
+    assert ids(board.top(10)) == [2, 4, 3]
+    assert len(board) == 3
+
+def test_ties_rank_the_earlier_entry_first():
+    board = board_of(30, 20, 20)
+    board.add(high_score(4, 20))
+    assert ids(board.top(10)) == [1, 2, 3]
+    assert board.count_at_least(20) == 3
+    assert board.count_at_least(21) == 1
+
+def test_qualifies_until_the_board_is_full():
+    board = board_of(30, 20, size=3)
+    assert board.qualifies(0)
+    board.add(high_score(3, 10))
+    assert board.qualifies(11)
+    # Matching the last entry is not enough: it ranks behind it
+    assert not board.qualifies(10)
+    assert not board.qualifies(5)
+
+def test_qualifies_counts_pending_scores():
+    board = board_of(30, 10, size=3)
+    assert board.qualifies(20)
+    assert board.qualifies(20, pending_scores=[25])
+    # 30, 25 and an equal pending 20 fill the board ahead of it
+    assert not board.qualifies(20, pending_scores=[25, 20])
+    # Pending scores below the candidate rank behind it
+    assert board.qualifies(20, pending_scores=[15, 12])
+
+def test_pages_continue_after_the_last_entry_seen():
+    board = board_of(50, 40, 40, 30, 20, size=10)
+    first = board.page(None, 2)
+    assert ids(first) == [1, 2]
+    last = first[-1]
+    assert ids(board.page((last.score, last.id), 2)) == [3, 4]
+    assert ids(board.page((20, 5), 2)) == []
+    # A cursor between entries still continues in order
+    assert ids(board.page((35, 0), 10)) == [4, 5]
+
+def test_warm_loads_the_best_rows(db):
+    db.add_all(HighScore(player_name=f"p{score}", score=score) for score in (10, 50, 30, 40))
+    db.commit()
+    board = LeaderboardIndex(size=3)
+    board.warm(db)
+    assert board.is_warm
+    assert [entry.score for entry in board.top(10)] == [50, 40, 30]
@@ -0,0 +1,76 @@
+"""Leaderboard diffs pushed to subscribed pages"""
+import asyncio
+import threading
+from datetime import datetime
+from app.models.game import HighScore
+from app.services.leaderboard import LeaderboardIndex
+from app.services.leaderboard_hub import LeaderboardHub
+from app.services.leaderboard_read_model import LeaderboardReadModel
+
+def hub_with(*scores):
+    board = LeaderboardIndex(size=5)
+    hub = LeaderboardHub(LeaderboardReadModel(board))
+    for score in scores:
+        add(board, score)
+    hub.publish()
+    return board, hub
+
+def add(board, score):
+    board.add(HighScore(
+        id=len(board) + 1, player_name=f"s{score}", score=score,
+        coins_collected=0, distance=0.0, created_at=datetime(2026, 1, 1)
+    ))
+
+def test_subscribe_starts_from_the_whole_board():
+    _, hub = hub_with(30, 10)
+    snapshot = hub.subscribe(lambda diff: None)
+    assert [(c.rank, c.row.player_name) for c in snapshot.changes] == [(1, "s30"), (2, "s10")]
+    assert len(hub) == 1
+
+def test_publish_pushes_changed_ranks_on_the_event_loop():
+    board, hub = hub_with(30, 10)
+
+    async def scenario():
+        await hub.start()
+        received = []
+        hub.subscribe(received.append)
+        add(board, 20)
+        # Writers publish from worker threads
+        writer = threading.Thread(target=hub.publish)
+        writer.start()
+        writer.join()
+        await asyncio.sleep(0)
+        assert hub.publish() is None
+        await asyncio.sleep(0)
+        await hub.stop()
+        return received
+
+    received = asyncio.run(scenario())
+    assert len(received) == 1
+    assert [(c.rank, c.row.player_name) for c in received[0].changes] == [(2, "s20"), (3, "s10")]
+
+def test_unsubscribed_and_failing_subscribers_stop_receiving():
+    board, hub = hub_with(30)
+
+    async def scenario():
+        await hub.start()
+        kept, dropped = [], []
+
+        def failing(diff):
+            raise RuntimeError("page is gone")
+
+        hub.subscribe(kept.append)
+        hub.subscribe(dropped.append)
+        hub.subscribe(failing)
+        hub.unsubscribe(dropped.append)
+        add(board, 50)
+        hub.publish()
+        await asyncio.sleep(0)
+        assert len(hub) == 1
+        add(board, 40)
+        hub.publish()
+        await asyncio.sleep(0)
+        return kept, dropped, len(hub)
+
+    kept, dropped, subscribers = asyncio.run(scenario())
+    assert (len(kept), len(dropped), subscribers) == (2, 0, 1)
@@ -0,0 +1,54 @@
+"""Versioned leaderboard snapshot served to the API and the UI"""
+from datetime import datetime
+from app.models.game import HighScore
+from app.services.leaderboard import LeaderboardIndex
+from app.services.leaderboard_read_model import LeaderboardReadModel
+
+def high_score(high_score_id, score, player=None):
+    return HighScore(
+        id=high_score_id, player_name=player or f"p{high_score_id}", score=score,
+        coins_collected=1234, distance=56.78, created_at=datetime(2026, 3, 11, 12)
+    )
+
+def board_of(*scores, size=3):
+    board = LeaderboardIndex(size=size)
+    for i, score in enumerate(scores, start=1):
+        board.add(high_score(i, score))
+    return board
+
+def test_first_refresh_formats_every_rank():
+    model = LeaderboardReadModel(board_of(100, 300, 200))
+    version, changes = model.refresh()
+    assert version == 1
+    assert [(rank, row.player_name) for rank, row in changes] == [(1, "p2"), (2, "p3"), (3, "p1")]
+    row = changes[0][1]
+    assert (row.score, row.coins, row.distance, row.date) == ("300", "1,234", "56.8m", "2026-03-11")
+    assert [entry.score for entry in model.top(2)] == [300, 200]
+
+def test_refresh_reports_only_the_ranks_that_moved():
+    board = board_of(300, 200, 100)
+    model = LeaderboardReadModel(board)
+    model.refresh()
+    board.add(high_score(4, 250))
+    version, changes = model.refresh()
+    assert version == 2
+    assert [(rank, row.player_name) for rank, row in changes] == [(2, "p4"), (3, "p2")]
+    assert [row.player_name for row in model.rows()[1]] == ["p1", "p4", "p2"]
+
+def test_unchanged_board_keeps_its_version():
+    model = LeaderboardReadModel(board_of(300))
+    model.refresh()
+    board_rows = model.rows()
+    assert model.refresh() == (1, [])
+    assert model.rows() == board_rows
+
+def test_ranks_that_empty_are_reported_as_none(db):
+    board = board_of(300, 200, 100)
+    model = LeaderboardReadModel(board)
+    model.refresh()
+    db.add(high_score(1, 300))
+    db.commit()
+    board.warm(db)
+    version, changes = model.refresh()
+    assert changes == [(2, None), (3, None)]
+    assert len(model.rows()[1]) == 1
@@ -0,0 +1,52 @@
+"""Batched stats panel updates from game client progress"""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.frontend.live_scores import LiveScoreFlusher, update_labels
+from app.services.client_state import ClientStateStore, client_states
+
+@pytest.fixture
+def tab():
+    """A registered client state with stand-in labels"""
+    state = client_states.get("live-scores-test")
+    state.labels = (SimpleNamespace(text=""), SimpleNamespace(text=""), SimpleNamespace(text=""))
+    yield state
+    client_states.evict(state.client_id)
+
+def test_dirty_states_are_taken_once_and_dropped_with_their_client():
+    store = ClientStateStore()
+    a, b, c = store.get("a"), store.get("b"), store.get("c")
+    for state in (a, b, a, c):
+        store.mark_dirty(state)
+    store.evict("c")
+    assert {state.client_id for state in store.take_dirty()} == {"a", "b"}
+    assert store.take_dirty() == []
+    store.mark_dirty(c)
+    assert store.take_dirty() == []
+
+def test_update_labels_formats_the_state(tab):
+    tab.score, tab.coins, tab.distance = 12345, 7, 81.26
+    update_labels(tab)
+    assert [label.text for label in tab.labels] == ["Score: 12,345", "Coins: 7", "Distance: 81.3m"]
+
+def test_flush_applies_the_latest_progress_once(tab):
+    flusher = LiveScoreFlusher(interval=1.0)
+    for score in (10, 20, 30):
+        tab.score = score
+        client_states.mark_dirty(tab)
+    assert flusher.flush() == 1
+    assert tab.labels[0].text == "Score: 30"
+    tab.labels[0].text = "untouched"
+    assert flusher.flush() == 0
+    assert tab.labels[0].text == "untouched"
+
+def test_flusher_task_runs_until_stopped(tab):
+    async def run():
+        flusher = LiveScoreFlusher(interval=0.01)
+        await flusher.start()
+        tab.coins = 3
+        client_states.mark_dirty(tab)
+        await asyncio.sleep(0.05)
+        await flusher.stop()
+    asyncio.run(run())
+    assert tab.labels[1].text == "Coins: 3"
@@ -0,0 +1,65 @@
+"""Cursor-paginated leaderboard"""
+import pytest
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.game import HighScore
+from app.services.leaderboard import leaderboard
+
+# Ties on 50 and 30 so pages must break them by id
+SCORES = [90, 50, 50, 50, 30, 30, 10, 5]
+
+@pytest.fixture
+def high_scores(db):
+    rows = [HighScore(player_name=f"p{i}", score=score, coins_collected=0, distance=0.0) for i, score in enumerate(SCORES)]
+    db.add_all(rows)
+    db.commit()
+    return sorted(rows, key=lambda row: (-row.score, row.id))
+
+def walk(client, limit):
+    """Follow next_cursor from the first page; returns the ids in order and the page count"""
+    ids, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/game/high-scores/page", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        pages += 1
+        assert len(page["items"]) <= limit
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(50, 12), 2) == [50, 12]
+    assert "=" not in encode_cursor(1, 2)
+
+@pytest.mark.parametrize("limit", [1, 3, len(SCORES), len(SCORES) + 5])
+def test_pages_cover_the_board_once_in_order(high_scores, client, limit):
+    ids, pages = walk(client, limit)
+    assert ids == [row.id for row in high_scores]
+    assert pages == max(1, -(-len(SCORES) // limit))
+
+@pytest.mark.parametrize("limit", [2, 3])
+def test_database_path_pages_the_same_way(high_scores, client, monkeypatch, limit):
+    monkeypatch.setattr(leaderboard, "is_warm", False)
+    ids, _ = walk(client, limit)
+    assert ids == [row.id for row in high_scores]
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!!",
+    encode_cursor(50),
+    encode_cursor(50, 1, 2),
+    encode_cursor("fifty", 1),
+    encode_cursor(None, 1),
+    "eyJhIjoxfQ",  # {"a":1}
+])
+def test_invalid_cursor_is_rejected(high_scores, client, cursor):
+    response = client.get("/api/game/high-scores/page", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.text
+
+def test_page_size_is_bounded(client):
+    response = client.get("/api/game/high-scores/page", params={"limit": 10_000})
+    assert response.status_code == 422
@@ -0,0 +1,60 @@
+"""Global rank index against a brute-force count"""
+import random
+import pytest
+from app.services.rank_index import ScoreRankIndex
+
+def brute_force_above(scores, score):
+    return sum(1 for s in scores if s > score)
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_count_above_matches_brute_force(seed):
+    rng = random.Random(seed)
+    index = ScoreRankIndex(bucket_width=1, initial_buckets=16)
+    scores = [rng.randint(0, 5000) for _ in range(2000)]
+    for i, score in enumerate(scores):
+        index.add(f"p{i % 50}", score)
+    assert index.total == len(scores)
+    for probe in [0, 1, 17, 2500, 4999, 5000, 5001] + rng.sample(scores, 50):
+        assert index.count_above(probe) == brute_force_above(scores, probe)
+        assert index.rank(probe) == brute_force_above(scores, probe) + 1
+
+def test_wide_buckets_rank_scores_in_a_bucket_as_ties():
+    index = ScoreRankIndex(bucket_width=10)
+    for score in (11, 15, 19, 25):
+        index.add("p", score)
+    assert index.count_above(11) == index.count_above(19) == 1
+    assert index.count_above(20) == 0
+
+def test_scores_past_max_buckets_share_the_top_bucket():
+    index = ScoreRankIndex(bucket_width=1, max_buckets=1024, initial_buckets=1024)
+    for score in (5000, 6000, 100):
+        index.add("p", score)
+    assert index.count_above(100) == 2
+    assert index.count_above(5000) == 0
+
+def test_player_best_keeps_the_highest_score():
+    index = ScoreRankIndex()
+    for score in (30, 80, 50):
+        index.add("alice", score)
+    assert index.player_best("alice") == 80
+    assert index.player_best("bob") is None
+
+def test_warm_loads_every_session(db, add_sessions):
+    scores = [40, 10, 40, 90, 0, 65]
+    add_sessions(*[(f"p{i}", score) for i, score in enumerate(scores)])
+    index = ScoreRankIndex(initial_buckets=4)
+    index.warm(db)
+    assert index.is_warm
+    for probe in range(100):
+        assert index.count_above(probe) == brute_force_above(scores, probe)
+
+def test_rank_endpoint_agrees_with_high_scores(client):
+    for player, score in [("a", 120), ("b", 121), ("c", 125), ("d", 90)]:
+        response = client.post("/api/game/session", json={
+            "player_name": player, "score": score, "coins_collected": 1, "distance": 10.0, "duration": 5.0
+        })
+        assert response.status_code == 201
+    board = client.get("/api/game/high-scores", params={"limit": 10}).json()
+    for position, entry in enumerate(board, start=1):
+        rank = client.get(f"/api/game/rank/player/{entry['player_name']}").json()
+        assert rank["rank"] == position
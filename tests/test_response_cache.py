@@ -0,0 +1,60 @@
+"""ETag revalidation and invalidation of cached API responses"""
+import pytest
+from app.core.response_cache import response_cache, HIGH_SCORES_TAG
+
+def play(client, score, player="tester"):
+    response = client.post("/api/game/session", json={
+        "player_name": player, "score": score, "coins_collected": 3, "distance": 42.0, "duration": 9.0
+    })
+    assert response.status_code == 201
+
+@pytest.mark.parametrize("path", ["/api/game/high-scores", "/api/game/stats", "/api/game/high-scores/daily"])
+def test_unchanged_response_revalidates_with_304(client, path):
+    play(client, 100)
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    again = client.get(path, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert again.headers["vary"] == "Accept-Encoding"
+
+@pytest.mark.parametrize("path", ["/api/game/high-scores", "/api/game/stats", "/api/game/high-scores/daily"])
+def test_write_invalidates_the_cached_response(client, path):
+    play(client, 100)
+    etag = client.get(path).headers["etag"]
+    play(client, 500, player="newcomer")
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    if path == "/api/game/stats":
+        assert response.json()["best_score"] == 500
+    else:
+        assert response.json()[0]["player_name"] == "newcomer"
+
+def test_bump_without_changes_keeps_the_etag(client):
+    play(client, 100)
+    etag = client.get("/api/game/high-scores").headers["etag"]
+    response_cache.bump(HIGH_SCORES_TAG)
+    assert client.get("/api/game/high-scores", headers={"If-None-Match": etag}).status_code == 304
+
+def test_weak_and_listed_etags_match(client):
+    etag = client.get("/api/game/stats").headers["etag"]
+    strong = etag.removeprefix("W/")
+    assert client.get("/api/game/stats", headers={"If-None-Match": strong}).status_code == 304
+    assert client.get("/api/game/stats", headers={"If-None-Match": f'"other", {etag}'}).status_code == 304
+    assert client.get("/api/game/stats", headers={"If-None-Match": '"other"'}).status_code == 200
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("gzip", "gzip"),
+    ("br, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+])
+def test_gzip_variant_follows_accept_encoding(client, accept_encoding, encoding):
+    client.get("/api/game/stats")
+    response = client.get("/api/game/stats", headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == encoding
+    assert response.json()["total_games"] == 0
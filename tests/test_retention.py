@@ -0,0 +1,108 @@
+"""Retention rollups"""
+import gzip
+import json
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.models.game import ArchivedScoreCount, DailyPlayerRollup, GameSession
+from app.schemas.game import LeaderboardWindow
+from app.services.game_service import GameService
+from app.services.rank_index import ScoreRankIndex
+from app.services.retention import RetentionService, RetentionWorker, merge_history, raw_history_statement, retention_cutoff, rollup_history_statement
+from app.services.windowed_leaderboard import window_start
+
+CUTOFF = datetime(2026, 2, 1)
+DAY_1, DAY_2 = datetime(2026, 1, 10, 9), datetime(2026, 1, 11, 18)
+RECENT = datetime(2026, 2, 5)
+
+@pytest.fixture
+def history(db, add_sessions, monkeypatch):
+    # Keep only the best session raw so most of the old ones are rolled up
+    monkeypatch.setattr(settings, "LEADERBOARD_WINDOW_SIZE", 1)
+    sessions = add_sessions(
+        ("alice", 10, DAY_1), ("alice", 30, DAY_1 + timedelta(hours=2)), ("bob", 30, DAY_1),
+        ("alice", 20, DAY_2), ("bob", 50, DAY_2), ("bob", 5, DAY_2),
+        ("carol", 999, DAY_1),   # Best overall: stays raw
+        ("alice", 70, RECENT),   # After the cutoff: stays raw
+    )
+    GameService(db).ensure_game_stats()
+    return sessions
+
+def rollups(db):
+    return {
+        (r.day, r.player_name): (r.games, r.total_score, r.total_coins, r.total_distance, r.best_score)
+        for r in db.execute(select(DailyPlayerRollup)).scalars()
+    }
+
+def test_cutoff_never_passes_the_start_of_the_week():
+    now = datetime(2026, 3, 11, 12)
+    assert retention_cutoff(30, now) == now - timedelta(days=30)
+    assert retention_cutoff(1, now) == window_start(LeaderboardWindow.WEEKLY, now)
+
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+def test_rollup_totals(db, history, batch_size):
+    assert RetentionService(db, archive_dir="").compact(CUTOFF, batch_size=batch_size) == 6
+    # Coins are score // 10 and distance equals the score (see add_sessions)
+    assert rollups(db) == {
+        (DAY_1.date(), "alice"): (2, 40, 4, 40.0, 30),
+        (DAY_1.date(), "bob"): (1, 30, 3, 30.0, 30),
+        (DAY_2.date(), "alice"): (1, 20, 2, 20.0, 20),
+        (DAY_2.date(), "bob"): (2, 55, 5, 55.0, 50),
+    }
+    assert dict(db.execute(select(ArchivedScoreCount.score, ArchivedScoreCount.sessions)).all()) == {
+        5: 1, 10: 1, 20: 1, 30: 2, 50: 1
+    }
+    remaining = db.execute(select(GameSession.player_name, GameSession.score).order_by(GameSession.id)).all()
+    assert [tuple(row) for row in remaining] == [("carol", 999), ("alice", 70)]
+
+def test_rolled_up_sessions_still_count(db, history):
+    before = ScoreRankIndex()
+    before.warm(db)
+    RetentionService(db, archive_dir="").compact(CUTOFF)
+    assert GameService(db).verify_game_stats() == {}
+    after = ScoreRankIndex()
+    after.warm(db)
+    assert after.total == before.total == len(history)
+    for score in (0, 5, 29, 30, 70, 999):
+        assert after.count_above(score) == before.count_above(score)
+    assert after.player_best("bob") == 50
+
+def test_history_merges_rollups_with_the_raw_tail(db, history):
+    RetentionService(db, archive_dir="").compact(CUTOFF)
+    since = date(2026, 1, 1)
+    days = merge_history(
+        db.execute(rollup_history_statement("alice", since)).scalars().all(),
+        db.execute(raw_history_statement("alice", since)).all()
+    )
+    assert [(d.day, d.games, d.total_score, d.best_score) for d in days] == [
+        (RECENT.date(), 1, 70, 70),
+        (DAY_2.date(), 1, 20, 20),
+        (DAY_1.date(), 2, 40, 30),
+    ]
+
+def test_second_run_is_a_no_op(db, history):
+    RetentionService(db, archive_dir="").compact(CUTOFF)
+    totals = rollups(db)
+    assert RetentionService(db, archive_dir="").compact(CUTOFF) == 0
+    assert rollups(db) == totals
+
+def test_archive_holds_every_rolled_up_session(db, history, tmp_path):
+    RetentionService(db, archive_dir=str(tmp_path)).compact(CUTOFF, batch_size=4)
+    files = sorted(tmp_path.glob("game_sessions-*.ndjson.gz"))
+    assert len(files) == 2
+    archived = [json.loads(line) for path in files for line in gzip.decompress(path.read_bytes()).splitlines()]
+    assert sorted(row["score"] for row in archived) == [5, 10, 20, 30, 30, 50]
+    assert not list(tmp_path.glob("*.tmp"))
+    assert db.execute(select(func.count(GameSession.id))).scalar_one() == 2
+
+def test_worker_rolls_up_batches_through_the_writer(db, history, run, tmp_path):
+    # One day of retention reaches back to the start of this week, past every session
+    worker = RetentionWorker(days=1, interval=0, archive_dir=str(tmp_path))
+    assert run(worker.run_once(batch_size=3)) == 7
+    db.expire_all()
+    assert rollups(db)[(RECENT.date(), "alice")] == (1, 70, 7, 70.0, 70)
+    assert len(list(tmp_path.glob("game_sessions-*.ndjson.gz"))) == 3
+    remaining = db.execute(select(GameSession.player_name, GameSession.score)).all()
+    assert [tuple(row) for row in remaining] == [("carol", 999)]
+    assert GameService(db).verify_game_stats() == {}
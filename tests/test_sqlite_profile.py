@@ -0,0 +1,67 @@
+"""SQLite high-concurrency profile: pragmas and WAL checkpoints"""
+import asyncio
+import os
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+from app.core.sqlite import WalCheckpointer, high_concurrency_enabled, install_pragmas
+
+def test_profile_applies_to_sqlite_only(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_PROFILE", "high_concurrency")
+    assert high_concurrency_enabled("sqlite:///./game.db")
+    assert not high_concurrency_enabled("postgresql://user@localhost/game")
+    monkeypatch.setattr(settings, "DATABASE_PROFILE", "fast")
+    assert not high_concurrency_enabled("sqlite:///./game.db")
+
+def test_every_new_connection_gets_the_pragmas(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/game.db")
+    install_pragmas(engine)
+    try:
+        for _ in range(2):
+            with engine.connect() as connection:
+                values = {
+                    name: connection.execute(text(f"PRAGMA {name}")).scalar_one()
+                    for name in ("journal_mode", "busy_timeout", "synchronous", "temp_store")
+                }
+            # NORMAL and MEMORY read back as 1 and 2
+            assert values == {
+                "journal_mode": "wal", "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+                "synchronous": 1, "temp_store": 2,
+            }
+            # The second round runs on a new connection
+            engine.dispose()
+    finally:
+        engine.dispose()
+
+def test_checkpointer_runs_on_its_interval_and_truncates_on_stop(tmp_path):
+    path = f"{tmp_path}/game.db"
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        install_pragmas(engine.sync_engine)
+        checkpointer = WalCheckpointer(engine, interval=0.01)
+        modes = []
+        checkpoint = checkpointer.checkpoint
+
+        async def counted(mode="PASSIVE"):
+            modes.append(mode)
+            await checkpoint(mode)
+
+        checkpointer.checkpoint = counted
+        try:
+            async with engine.begin() as connection:
+                await connection.exec_driver_sql("CREATE TABLE t (value INTEGER)")
+                await connection.exec_driver_sql("INSERT INTO t VALUES (1)")
+            await checkpointer.start()
+            await asyncio.sleep(0.1)
+            assert os.path.getsize(f"{path}-wal") > 0
+            await checkpointer.stop()
+            # The last connection deletes the WAL on close, so check before disposing
+            assert os.path.getsize(f"{path}-wal") == 0
+        finally:
+            await engine.dispose()
+        return modes
+
+    modes = asyncio.run(scenario())
+    assert modes.count("PASSIVE") >= 2
+    assert modes[-1] == "TRUNCATE"
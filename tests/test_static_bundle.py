@@ -0,0 +1,83 @@
+"""Content-hashed, precompressed static bundle"""
+import gzip
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.core.static_bundle import IMMUTABLE, StaticBundle, accepted_encodings, brotli
+
+CSS = b"body { margin: 0; }\n" * 50
+
+@pytest.fixture
+def bundle(tmp_path):
+    (tmp_path / "game.css").write_bytes(CSS)
+    (tmp_path / "game.js").write_bytes(b"console.log('run');\n")
+    static_bundle = StaticBundle(str(tmp_path))
+    static_bundle.build()
+    return static_bundle
+
+@pytest.fixture
+def client(bundle):
+    app = FastAPI()
+
+    @app.get("/static/{name}")
+    async def get_static_asset(name: str, request: Request):
+        return bundle.response(name, request)
+
+    return TestClient(app)
+
+def css_path(bundle):
+    return bundle.url("game.css")
+
+def test_accepted_encodings_skip_q0():
+    assert accepted_encodings("gzip, deflate, br") == ["gzip", "deflate", "br"]
+    assert accepted_encodings("GZIP;q=0.8, br;q=0") == ["gzip"]
+    assert accepted_encodings("gzip; q=0.0, identity") == ["identity"]
+    assert accepted_encodings("gzip;q=0.001") == ["gzip"]
+    assert accepted_encodings("") == []
+
+def test_gzip_variant_is_served_to_clients_that_accept_it(bundle, client):
+    response = client.get(css_path(bundle), headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == CSS  # Decoded by the client
+    assert response.headers["content-type"] == "text/css; charset=utf-8"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_identity_when_gzip_is_refused(bundle, client):
+    for accept_encoding in ("identity", "gzip;q=0", "deflate"):
+        response = client.get(css_path(bundle), headers={"Accept-Encoding": accept_encoding})
+        assert "content-encoding" not in response.headers
+        assert response.content == CSS
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+def test_brotli_is_preferred_over_gzip(bundle, client):
+    response = client.get(css_path(bundle), headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    response = client.get(css_path(bundle), headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert response.headers["content-encoding"] == "gzip"
+
+def test_responses_are_immutable_and_revalidate_to_304(bundle, client):
+    response = client.get(css_path(bundle))
+    assert response.headers["cache-control"] == IMMUTABLE
+    etag = response.headers["etag"]
+    revalidated = client.get(css_path(bundle), headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["cache-control"] == IMMUTABLE
+    assert client.get(css_path(bundle), headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_unknown_names_are_not_found(client):
+    assert client.get("/static/game.0000000000000000.css").status_code == 404
+
+def test_hashed_name_changes_with_the_content(bundle, tmp_path):
+    old_url = bundle.url("game.css")
+    assert bundle.url("game.js") == StaticBundle(str(tmp_path)).url("game.js")
+    (tmp_path / "game.css").write_bytes(CSS + b"p { color: red; }\n")
+    bundle.build()
+    new_url = bundle.url("game.css")
+    assert new_url != old_url
+    assert new_url.startswith("/static/game.") and new_url.endswith(".css")
+    # Only the current version is left in dist/, with its gzip variant
+    name = new_url.rsplit("/", 1)[1]
+    css_files = sorted(path.name for path in (tmp_path / "dist").glob("game.*.css*"))
+    assert css_files == [name, f"{name}.gz"]
+    assert gzip.decompress((tmp_path / "dist" / f"{name}.gz").read_bytes()) == CSS + b"p { color: red; }\n"
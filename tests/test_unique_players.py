@@ -0,0 +1,92 @@
+"""HyperLogLog unique-player counts"""
+import asyncio
+import threading
+from datetime import datetime, timedelta
+import pytest
+from app.core.database import AsyncSessionLocal
+from app.models.game import GameSession
+from app.services.sketches import HyperLogLog
+from app.services.unique_players import UniquePlayerCounters
+from app.services.windowed_leaderboard import utc_now
+
+def test_count_is_within_the_standard_error():
+    sketch = HyperLogLog(precision=12)
+    for i in range(20_000):
+        sketch.add(f"player-{i}")
+        sketch.add(f"player-{i}")
+    # 1.6% standard error at precision 12; allow four of them
+    assert sketch.count() == pytest.approx(20_000, rel=0.065)
+
+def test_small_counts_are_exact_enough():
+    sketch = HyperLogLog(precision=12)
+    for name in ("a", "b", "c", "a"):
+        sketch.add(name)
+    assert sketch.count() == 3
+
+def test_merge_counts_the_union():
+    left, right, union = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    for i in range(3000):
+        (left if i < 2000 else right).add(str(i))
+        union.add(str(i))
+    for i in range(1000, 2000):
+        right.add(str(i))
+    left.merge(right)
+    assert left.registers == union.registers
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(11))
+
+def test_serialized_registers_round_trip():
+    sketch = HyperLogLog(8)
+    for i in range(500):
+        sketch.add(str(i))
+    restored = HyperLogLog.from_str(sketch.to_str())
+    assert (restored.precision, restored.registers) == (8, sketch.registers)
+
+def test_windows_count_today_this_week_and_all_time(db, add_sessions):
+    now = utc_now()
+    add_sessions(
+        ("alice", 1, now), ("bob", 1, now), ("alice", 1, now),
+        ("carol", 1, now - timedelta(days=now.weekday() + 1)),  # Last week
+    )
+    counters = UniquePlayerCounters(12)
+    counters.warm(db)
+    assert counters.counts(now) == {
+        "unique_players_today": 2, "unique_players_week": 2, "unique_players_all_time": 3
+    }
+
+def test_restart_keeps_players_folded_out_of_order(db, add_sessions):
+    add_sessions(("early", 1))
+    live = UniquePlayerCounters(12)
+    live.warm(db)
+    lagging = add_sessions(("from-worker-2", 1), ("from-worker-1", 1))
+    # The later session is folded first; the earlier one is still in the change feed
+    live.add(lagging[1])
+    live.persist(db)
+    restarted = UniquePlayerCounters(12)
+    restarted.warm(db)
+    assert restarted.counts()["unique_players_all_time"] == 3
+    assert restarted.through_id == lagging[1].id
+
+def test_adds_during_a_warm_do_not_block_the_event_loop(db, add_sessions, run):
+    add_sessions(*((f"player-{i}", 1) for i in range(5000)))
+    counters = UniquePlayerCounters(12)
+    late = GameSession(id=10_000, player_name="late", created_at=datetime(2026, 1, 1))
+    adds = 0
+
+    async def scenario():
+        nonlocal adds
+        async with AsyncSessionLocal() as session:
+            warming = asyncio.create_task(session.run_sync(counters.warm))
+            # Each fetch of the replay yields here, as an ingest commit would
+            while not warming.done():
+                counters.add(late)
+                adds += 1
+                await asyncio.sleep(0)
+            await warming
+
+    worker = threading.Thread(target=run, args=(scenario(),), daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive()
+    assert adds > 1
+    assert counters.is_warm
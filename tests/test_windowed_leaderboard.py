@@ -0,0 +1,77 @@
+"""Rolling daily / weekly / all-time leaderboards"""
+from datetime import datetime, timedelta
+from app.models.game import GameSession
+from app.schemas.game import LeaderboardWindow
+from app.services.windowed_leaderboard import WindowedLeaderboards, seconds_until_rollover, window_start
+
+DAILY, WEEKLY, ALL_TIME = LeaderboardWindow.DAILY, LeaderboardWindow.WEEKLY, LeaderboardWindow.ALL_TIME
+# A Wednesday
+WEDNESDAY = datetime(2026, 3, 11, 15, 30)
+
+def session(session_id, score, created_at):
+    return GameSession(
+        id=session_id, player_name=f"p{session_id}", score=score,
+        coins_collected=0, distance=0.0, duration=1.0, created_at=created_at
+    )
+
+def scores(boards, window, now):
+    return [entry.score for entry in boards.top(window, 10, now=now)]
+
+def test_window_starts():
+    assert window_start(DAILY, WEDNESDAY) == datetime(2026, 3, 11)
+    assert window_start(WEEKLY, WEDNESDAY) == datetime(2026, 3, 9)
+    assert window_start(WEEKLY, datetime(2026, 3, 9)) == datetime(2026, 3, 9)
+    assert seconds_until_rollover(DAILY, WEDNESDAY) == 8.5 * 3600
+    assert seconds_until_rollover(ALL_TIME, WEDNESDAY) == float("inf")
+
+def test_daily_board_rolls_over_at_midnight():
+    boards = WindowedLeaderboards(size=10)
+    boards.add(session(1, 40, WEDNESDAY))
+    boards.add(session(2, 70, WEDNESDAY + timedelta(hours=1)))
+    assert scores(boards, DAILY, WEDNESDAY + timedelta(hours=2)) == [70, 40]
+
+    midnight = datetime(2026, 3, 12)
+    assert scores(boards, DAILY, midnight) == []
+    boards.add(session(3, 10, midnight + timedelta(minutes=5)))
+    assert scores(boards, DAILY, midnight + timedelta(minutes=6)) == [10]
+    # Yesterday's weekly and all-time entries are unaffected
+    assert scores(boards, WEEKLY, midnight) == [70, 40, 10]
+    assert scores(boards, ALL_TIME, midnight) == [70, 40, 10]
+
+def test_late_session_from_an_expired_window_is_not_resurrected():
+    boards = WindowedLeaderboards(size=10)
+    thursday = datetime(2026, 3, 12, 1)
+    boards.add(session(1, 20, thursday))
+    boards.add(session(2, 99, WEDNESDAY))
+    assert scores(boards, DAILY, thursday) == [20]
+    assert scores(boards, ALL_TIME, thursday) == [99, 20]
+
+def test_weekly_board_rolls_over_on_monday():
+    boards = WindowedLeaderboards(size=10)
+    sunday = datetime(2026, 3, 15, 23, 59)
+    boards.add(session(1, 50, sunday))
+    assert scores(boards, WEEKLY, sunday) == [50]
+    monday = datetime(2026, 3, 16)
+    assert scores(boards, WEEKLY, monday) == []
+    assert scores(boards, ALL_TIME, monday) == [50]
+
+def test_boards_keep_only_the_best_entries():
+    boards = WindowedLeaderboards(size=3)
+    for i, score in enumerate([5, 80, 20, 80, 60, 1]):
+        boards.add(session(i + 1, score, WEDNESDAY))
+    top = boards.top(DAILY, 10, now=WEDNESDAY)
+    # Ties keep the earlier session first
+    assert [(entry.score, entry.id) for entry in top] == [(80, 2), (80, 4), (60, 5)]
+
+def test_warm_loads_only_the_current_windows(db, add_sessions):
+    add_sessions(
+        ("old", 90, WEDNESDAY - timedelta(days=10)),
+        ("monday", 60, datetime(2026, 3, 9, 8)),
+        ("today", 30, WEDNESDAY - timedelta(hours=1)),
+    )
+    boards = WindowedLeaderboards(size=10)
+    boards.warm(db, now=WEDNESDAY)
+    assert scores(boards, DAILY, WEDNESDAY) == [30]
+    assert scores(boards, WEEKLY, WEDNESDAY) == [60, 30]
+    assert scores(boards, ALL_TIME, WEDNESDAY) == [90, 60, 30]
+    assert scores(boards, DAILY, WEDNESDAY + timedelta(days=1)) == []